@@ -0,0 +1,114 @@
+"""
+Executor agent, pulls sweep chunks from the job broker and runs them against its local databases.
+
+Start one or more agents from the repository root, next to the UI running with executor.mode "broker":
+    python -m app.agent --engines MySQL Postgres
+    python -m app.agent --engines DuckDB --broker-url http://ui-host:8082
+"""
+import argparse
+import asyncio
+import os
+import socket
+import time
+from typing import List
+
+from app.backend_service import BackendService
+from app.broker.http_broker import HttpJobBroker
+from app.broker.sqlite_broker import SqliteJobBroker
+from app.config import load_config, resolve_app_path
+from app.types import BenchmarkQuery, QueryBatch, ReadyQuery
+
+config = load_config()
+
+
+class ExecutorAgent:
+    def __init__(self, broker: SqliteJobBroker | HttpJobBroker, engines: List[str], agent_id: str,
+                 max_outstanding: int = 2, poll_interval: float = 0.5):
+        self.broker = broker
+        self.engines = engines
+        self.agent_id = agent_id
+        self.max_outstanding = max_outstanding
+        self.poll_interval = poll_interval
+        # Claimed chunks that are queued or running on this agent
+        self.outstanding = 0
+        self.backend_service = BackendService(executor_mode="local")
+        self.backend_service.batch_sink = self.publish_batch
+
+    async def run(self):
+        await self.backend_service.initialize_queue_worker(error_callback=self.on_batch_error)
+        print(f"Agent {self.agent_id} serving {', '.join(self.engines)}")
+        while True:
+            if self.outstanding < self.max_outstanding:
+                try:
+                    job = await asyncio.to_thread(self.broker.claim, self.agent_id, self.engines)
+                except Exception as e:
+                    print("[Agent] Claim failed:", e)
+                    job = None
+                if job is not None:
+                    self.outstanding += 1
+                    self.backend_service.queue_worker.schedule_batch(self._job_to_batch(job))
+                    continue
+            await asyncio.sleep(self.poll_interval)
+
+    @staticmethod
+    def _job_to_batch(job: dict) -> QueryBatch:
+        # Broker timestamps are wall clock, map the wait so far onto this process' perf counter
+        waited_ns = int((time.time() - job['enqueued_at']) * 1e9)
+        return QueryBatch(
+            queries=[ReadyQuery(q['query'], q['variables']) for q in job['queries']],
+            benchmark_query=BenchmarkQuery.from_dict(job['benchmark_query']),
+            enqueued_ns=time.perf_counter_ns() - max(waited_ns, 0),
+            job_id=job['job_id'],
+            mode=job.get('mode', "analyze"),
+            cache_policy=job.get('cache_policy', "as_is"),
+        )
+
+    async def publish_batch(self, batch: QueryBatch, parsed_result_list: list, result_list: list):
+        """
+        Batch sink of the agent, posts results of a finished chunk back to the broker
+        """
+        # Storing happens in the UI process, which fills in store_ns
+        batch_timing = BackendService.finalize_timings(batch, parsed_result_list, 0)
+        try:
+            accepted = await asyncio.to_thread(self.broker.complete, batch.job_id, self.agent_id, {
+                'parsed': parsed_result_list,
+                'raw': result_list,
+                'batch_timing': batch_timing,
+            })
+            if not accepted:
+                print(f"[Agent] Job {batch.job_id} was requeued to another agent, result dropped")
+        except Exception as e:
+            # The broker puts the chunk back into the queue once job_timeout passes
+            print(f"[Agent] Publishing job {batch.job_id} failed:", e)
+        finally:
+            self.outstanding -= 1
+
+    async def on_batch_error(self, batch: QueryBatch, error: Exception):
+        try:
+            if not await asyncio.to_thread(self.broker.fail, batch.job_id, self.agent_id, repr(error)):
+                print(f"[Agent] Job {batch.job_id} was requeued to another agent, error dropped")
+        finally:
+            self.outstanding -= 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a query executor agent")
+    parser.add_argument("--engines", nargs="+", required=True, choices=["MySQL", "Postgres", "DuckDB"])
+    parser.add_argument("--broker-url", help="URL of the UI process serving the broker, e.g. http://host:8082")
+    parser.add_argument("--broker-path", default=resolve_app_path(config.broker.path),
+                        help="SQLite broker file for local agents")
+    parser.add_argument("--agent-id", default=f"{socket.gethostname()}-{os.getpid()}")
+    parser.add_argument("--max-outstanding", type=int, default=2, help="Chunks claimed at the same time")
+    args = parser.parse_args()
+
+    if args.broker_url:
+        broker = HttpJobBroker(args.broker_url)
+    else:
+        broker = SqliteJobBroker(args.broker_path)
+    agent = ExecutorAgent(broker, args.engines, args.agent_id, max_outstanding=args.max_outstanding,
+                          poll_interval=config.broker.poll_interval)
+    asyncio.run(agent.run())
+
+
+if __name__ == "__main__":
+    main()
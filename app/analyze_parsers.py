@@ -3,7 +3,10 @@
 
 import json
 import re
-from typing import Dict, Any, List
+import time
+from typing import Dict, Any, List, Optional
+
+from app.plan_fingerprint import plan_fingerprint
 
 
 def parse_analyze_mysql(plan_text: str, filter_vars: list):
@@ -98,7 +101,7 @@ def extract_runtime_and_filter_scans_duckdb(profile_json: str, filters: List[str
 
 def extract_runtime_and_filter_scans_postgres(explain_text: str, filters: List[str]) -> Dict[str, Any]:
     """
-    explain_text: the raw text output of EXPLAIN ANALYZE (BUFFERS) from PostgreSQL
+    explain_text: the raw text output of EXPLAIN ANALYZE (BUFFERS) from PostgreSQL, TIMING OFF plans work as well
     filters: list of substrings to search for inside lines like: 'Filter: (<expr>)'
              e.g., ["o_orderdate", "r_name"]
 
@@ -122,8 +125,10 @@ def extract_runtime_and_filter_scans_postgres(explain_text: str, filters: List[s
     norm_filters = [f.lower() for f in filters]
 
     # Regexes for parsing key lines
-    re_node_header = re.compile(r"\(actual time=\s*[\d.]+\s*\.\.\s*[\d.]+\s*rows=(\d+)\s+loops=(\d+)\)")
-    re_filter_line = re.compile(r"\bFilter:\s*(.+)")
+    # "actual time=... rows=... loops=..." or "actual rows=... loops=..." with TIMING OFF
+    re_node_header = re.compile(r"\(actual(?: time=\s*[\d.]+\s*\.\.\s*[\d.]+)?\s*rows=(\d+)\s+loops=(\d+)\)")
+    # not "Rows Removed by Filter: N", which is handled separately below
+    re_filter_line = re.compile(r"(?<!by )\bFilter:\s*(.+)")
     re_rows_removed = re.compile(r"\bRows Removed by Filter:\s*(\d+)")
 
     # State while streaming lines
@@ -194,3 +199,378 @@ def extract_runtime_and_filter_scans_postgres(explain_text: str, filters: List[s
 
     filters_list = [{"variable": k, "total_rows": v} for k, v in scans.items()]
     return {"total_runtime": total_runtime, "filters": filters_list}
+
+
+# Plan nodes of Postgres JSON plans whose conditions are matched against the filter variables
+_POSTGRES_CONDITION_KEYS = ("Filter", "Index Cond")
+
+
+def _estimate_filters(filters: List[str], nodes, node_conditions, node_rows, node_cost) -> List[Dict[str, Any]]:
+    """
+    Sum estimated rows and cost of the plan nodes whose conditions mention each filter variable
+    """
+    estimates = {f: {"variable": f, "total_rows": 0, "estimated_cost": 0.0} for f in filters}
+    norm_filters = [f.lower() for f in filters]
+    for node in nodes:
+        conditions = node_conditions(node).lower()
+        if not conditions:
+            continue
+        for f_in, f_raw in zip(norm_filters, filters):
+            if f_in in conditions:
+                estimates[f_raw]["total_rows"] += int(float(node_rows(node) or 0))
+                estimates[f_raw]["estimated_cost"] += float(node_cost(node) or 0.0)
+    return list(estimates.values())
+
+
+def _walk_json(node) -> List[dict]:
+    """
+    All dicts of a JSON plan in depth first order
+    """
+    nodes = []
+    if isinstance(node, dict):
+        nodes.append(node)
+        for value in node.values():
+            nodes.extend(_walk_json(value))
+    elif isinstance(node, list):
+        for value in node:
+            nodes.extend(_walk_json(value))
+    return nodes
+
+
+def extract_estimates_postgres(plan_json: str, filters: List[str]) -> Dict[str, Any]:
+    """
+    plan_json: output of EXPLAIN (FORMAT JSON) from PostgreSQL
+
+    Returns:
+        {
+          "total_cost": <float>,   # root node Total Cost, in planner cost units
+          "filters": [
+            {"variable": "<filter>", "total_rows": <int>, "estimated_cost": <float>}, ...
+          ]
+        }
+    total_rows is the planner's estimated output rows (Plan Rows) of the nodes filtering on the variable.
+    """
+    plan = json.loads(plan_json)
+    if isinstance(plan, list):
+        plan = plan[0]
+    root = plan.get("Plan", {})
+    nodes = [node for node in _walk_json(root) if "Node Type" in node]
+    return {
+        "total_cost": float(root.get("Total Cost", 0.0)),
+        "filters": _estimate_filters(
+            filters, nodes,
+            node_conditions=lambda n: " ".join(str(n[k]) for k in _POSTGRES_CONDITION_KEYS if k in n),
+            node_rows=lambda n: n.get("Plan Rows"),
+            node_cost=lambda n: n.get("Total Cost"),
+        ),
+    }
+
+
+def extract_estimates_mysql(plan_json: str, filters: List[str]) -> Dict[str, Any]:
+    """
+    plan_json: output of EXPLAIN FORMAT=JSON from MySQL, both the classic format (query_block/table)
+    and explain_json_format_version=2 (operation/inputs) are understood
+
+    Returns the same structure as extract_estimates_postgres, total_rows is rows_produced_per_join
+    (estimated_rows in version 2), which corresponds to rows * loops of a Filter in EXPLAIN ANALYZE.
+    """
+    plan = json.loads(plan_json)
+    query_block = plan.get("query_block", {})
+    if query_block:
+        total_cost = float(query_block.get("cost_info", {}).get("query_cost", 0.0))
+    else:
+        total_cost = float(plan.get("estimated_total_cost", 0.0))
+
+    def node_cost(node):
+        if "estimated_total_cost" in node:
+            return node["estimated_total_cost"]
+        cost_info = node.get("cost_info", {})
+        return float(cost_info.get("read_cost", 0.0)) + float(cost_info.get("eval_cost", 0.0))
+
+    nodes = [node for node in _walk_json(plan) if "table_name" in node or "operation" in node]
+    return {
+        "total_cost": total_cost,
+        "filters": _estimate_filters(
+            filters, nodes,
+            node_conditions=lambda n: " ".join(
+                str(n[k]) for k in ("attached_condition", "index_condition", "condition") if k in n),
+            node_rows=lambda n: n.get("rows_produced_per_join", n.get("estimated_rows")),
+            node_cost=node_cost,
+        ),
+    }
+
+
+def extract_estimates_duckdb(plan_json: str, filters: List[str]) -> Dict[str, Any]:
+    """
+    plan_json: output of EXPLAIN (FORMAT JSON) from DuckDB
+
+    Returns the same structure as extract_estimates_postgres. DuckDB does not expose plan costs,
+    total_cost and estimated_cost are None, total_rows is the node's "Estimated Cardinality".
+    """
+    plan = json.loads(plan_json)
+    nodes = [node for node in _walk_json(plan) if "extra_info" in node]
+
+    def node_filters(node):
+        filt = (node.get("extra_info") or {}).get("Filters", "")
+        return " ".join(filt) if isinstance(filt, list) else str(filt)
+
+    filters_list = _estimate_filters(
+        filters, nodes,
+        node_conditions=node_filters,
+        node_rows=lambda n: (n.get("extra_info") or {}).get("Estimated Cardinality"),
+        node_cost=lambda n: 0.0,
+    )
+    for entry in filters_list:
+        entry["estimated_cost"] = None
+    return {"total_cost": None, "filters": filters_list}
+
+
+def cardinality_qerror(estimated_rows: float, actual_rows: float) -> float:
+    """
+    Symmetric q-error of a cardinality estimate, both sides clamped to at least one row
+    so empty results and never executed nodes stay finite
+    """
+    estimated_rows = max(float(estimated_rows), 1.0)
+    actual_rows = max(float(actual_rows), 1.0)
+    return max(estimated_rows / actual_rows, actual_rows / estimated_rows)
+
+
+def _summarize_cardinalities(nodes: List[Dict[str, Any]], filters: List[str]) -> Dict[str, Any]:
+    """
+    Add q-error to every node and aggregate estimated / actual rows of the nodes matching each filter
+    """
+    per_filter = {f: {"variable": f, "estimated_rows": 0.0, "actual_rows": 0.0} for f in filters}
+    for node in nodes:
+        node["q_error"] = cardinality_qerror(node["estimated_rows"], node["actual_rows"])
+        for f in node.pop("variables"):
+            per_filter[f]["estimated_rows"] += node["estimated_rows"]
+            per_filter[f]["actual_rows"] += node["actual_rows"]
+    for entry in per_filter.values():
+        matched = entry["estimated_rows"] or entry["actual_rows"]
+        entry["q_error"] = cardinality_qerror(entry["estimated_rows"], entry["actual_rows"]) if matched else None
+    return {
+        "nodes": nodes,
+        "filters": list(per_filter.values()),
+        "max_q_error": max((n["q_error"] for n in nodes), default=None),
+    }
+
+
+def _matching_filters(text: str, filters: List[str]) -> List[str]:
+    text = text.lower()
+    return [f for f in filters if f.lower() in text]
+
+
+# "->  Seq Scan on orders  (cost=0.00..1.00 rows=100 width=8) (actual time=0.01..0.50 rows=90 loops=1)"
+_RE_POSTGRES_NODE = re.compile(
+    r"^(\s*)(?:->\s*)?(.+?)\s+\(cost=[\d.]+\.\.[\d.]+\s+rows=([\d.]+)\s+width=\d+\)"
+    r"(?:\s*\(actual(?: time=[\d.]+\.\.[\d.]+)?\s+rows=([\d.]+)\s+loops=(\d+)\)|\s*\(never executed\))?"
+)
+
+
+def extract_node_cardinalities_postgres(explain_text: str, filters: List[str]) -> Dict[str, Any]:
+    """
+    explain_text: the raw text output of EXPLAIN ANALYZE from PostgreSQL
+
+    Returns:
+        {
+          "nodes": [
+            {"node": "<label>", "depth": <int>, "estimated_rows": <float>, "actual_rows": <float>, "q_error": <float>}, ...
+          ],
+          "filters": [
+            {"variable": "<filter>", "estimated_rows": <float>, "actual_rows": <float>, "q_error": <float|None>}, ...
+          ],
+          "max_q_error": <float|None>
+        }
+    Rows are totals over all loops (rows * loops) for both the estimate and the actual count,
+    never executed nodes are skipped. A node matches a filter when its Filter / Index Cond lines mention the variable.
+    """
+    nodes: List[Dict[str, Any]] = []
+    current = None
+    for line in explain_text.splitlines():
+        m_node = _RE_POSTGRES_NODE.search(line)
+        if m_node:
+            current = None
+            if m_node.group(5) is None:
+                # never executed, there is no actual count to compare with
+                continue
+            loops = int(m_node.group(5))
+            current = {
+                "node": m_node.group(2).strip(),
+                "depth": len(m_node.group(1)),
+                "estimated_rows": float(m_node.group(3)) * loops,
+                "actual_rows": float(m_node.group(4)) * loops,
+                "variables": [],
+            }
+            nodes.append(current)
+            continue
+        stripped = line.strip()
+        if current is not None and stripped.startswith(("Filter:", "Index Cond:")):
+            for f in _matching_filters(stripped, filters):
+                if f not in current["variables"]:
+                    current["variables"].append(f)
+    return _summarize_cardinalities(nodes, filters)
+
+
+# "-> Filter: (o.x < 5)  (cost=10.5 rows=33) (actual time=0.1..0.5 rows=30 loops=1)"
+_RE_MYSQL_NODE = re.compile(
+    r"^(\s*)->\s*(.+?)\s+(?:\(cost=[\d.e+-]+(?:\.\.[\d.e+-]+)?\s+rows=([\d.e+-]+)\)\s*)?"
+    r"(?:\(actual time=[\d.e+-]+\.\.[\d.e+-]+\s+rows=([\d.e+-]+)\s+loops=(\d+)\)|\(never executed\))"
+)
+
+
+def extract_node_cardinalities_mysql(plan_text: str, filters: List[str]) -> Dict[str, Any]:
+    """
+    plan_text: EXPLAIN ANALYZE tree output from MySQL
+
+    Returns the same structure as extract_node_cardinalities_postgres. Nodes without an optimizer
+    estimate (e.g. aggregates, materialization) or that never executed are skipped. A node matches a filter when its
+    label (Filter, Index range scan, Index lookup ...) mentions the variable.
+    """
+    nodes: List[Dict[str, Any]] = []
+    for line in plan_text.splitlines():
+        m_node = _RE_MYSQL_NODE.search(line)
+        if not m_node or m_node.group(3) is None or m_node.group(5) is None:
+            continue
+        loops = int(m_node.group(5))
+        label = m_node.group(2).strip()
+        nodes.append({
+            "node": label,
+            "depth": len(m_node.group(1)),
+            "estimated_rows": float(m_node.group(3)) * loops,
+            "actual_rows": float(m_node.group(4)) * loops,
+            "variables": _matching_filters(label, filters),
+        })
+    return _summarize_cardinalities(nodes, filters)
+
+
+def extract_node_cardinalities_duckdb(profile_json: str, filters: List[str]) -> Dict[str, Any]:
+    """
+    profile_json: JSON string of the DuckDB profile
+
+    Returns the same structure as extract_node_cardinalities_postgres. Estimates come from
+    extra_info["Estimated Cardinality"], actual rows from operator_cardinality; operators
+    without an estimate are skipped. DuckDB has no loops, counts are already totals.
+    """
+    profile: Dict[str, Any] = json.loads(profile_json)
+    nodes: List[Dict[str, Any]] = []
+
+    def walk(node: Dict[str, Any], depth: int):
+        extra = node.get("extra_info") or {}
+        estimate = extra.get("Estimated Cardinality") if isinstance(extra, dict) else None
+        if estimate is not None:
+            filt = extra.get("Filters", "")
+            filt = " ".join(filt) if isinstance(filt, list) else str(filt)
+            nodes.append({
+                "node": str(node.get("operator_name") or node.get("operator_type") or node.get("name")).strip(),
+                "depth": depth,
+                "estimated_rows": float(estimate),
+                "actual_rows": float(node.get("operator_cardinality", node.get("cardinality", 0))),
+                "variables": _matching_filters(filt, filters),
+            })
+        for child in (node.get("children") or []):
+            walk(child, depth + 1)
+
+    walk(profile, 0)
+    return _summarize_cardinalities(nodes, filters)
+
+
+_RE_POSTGRES_BUFFERS = re.compile(r"\b(shared|local|temp)\s+((?:(?:hit|read|dirtied|written)=\d+\s*)+)")
+
+
+def extract_buffers_postgres(explain_text: str) -> Dict[str, int]:
+    """
+    explain_text: EXPLAIN (ANALYZE, BUFFERS) text from PostgreSQL
+
+    Returns the buffer counters of the root node, which include all of its children, e.g.
+        {"shared_hit": 120, "shared_read": 45, "temp_read": 0, ...}
+    The "Buffers:" line under "Planning:" is not part of execution and is ignored.
+    """
+    counters: Dict[str, int] = {}
+    for line in explain_text.splitlines():
+        stripped = line.strip()
+        if stripped.startswith("Planning"):
+            break
+        if not stripped.startswith("Buffers:"):
+            continue
+        for scope, values in _RE_POSTGRES_BUFFERS.findall(stripped):
+            for name, value in re.findall(r"(hit|read|dirtied|written)=(\d+)", values):
+                counters[f"{scope}_{name}"] = int(value)
+        break
+    return counters
+
+
+# Profile metrics describing I/O and memory, present depending on the DuckDB version and profiling settings
+_DUCKDB_IO_METRICS = ("total_bytes_read", "total_bytes_written", "cumulative_rows_scanned",
+                      "system_peak_buffer_memory", "system_peak_temp_dir_size")
+
+
+def extract_io_duckdb(profile_json: str) -> Dict[str, float]:
+    """
+    profile_json: JSON string of the DuckDB profile
+
+    Returns the I/O related top level metrics that are present in the profile
+    """
+    profile: Dict[str, Any] = json.loads(profile_json)
+    return {name: profile[name] for name in _DUCKDB_IO_METRICS if name in profile}
+
+
+def _extract_node_cardinalities(db_type: str, plan: str, filters: List[str]) -> Optional[Dict[str, Any]]:
+    try:
+        if db_type == "MySQL":
+            return extract_node_cardinalities_mysql(plan, filters)
+        if db_type == "Postgres":
+            return extract_node_cardinalities_postgres(plan, filters)
+        if db_type == "DuckDB":
+            return extract_node_cardinalities_duckdb(plan, filters)
+    except Exception as e:
+        print("[Cardinality] Error:", e)
+    return None
+
+
+def parse_plan(db_type: str, plan: Optional[str], filters: List[str], mode: str = "analyze") -> Dict[str, Any]:
+    """
+    db_type: "MySQL", "Postgres" or "DuckDB"
+    plan: EXPLAIN ANALYZE output (mode "analyze") or JSON EXPLAIN output (mode "estimate"), None for
+          timed runs without a plan
+
+    Everything the backend extracts from one plan, in a single picklable call so that it can run in a
+    process pool. Returns
+        {"total_runtime": ..., "total_cost": ... (estimate) or None, "filters": [...],
+         "fingerprint": ..., "cardinalities": {...} or None, "io": {...} or None, "parse_ns": ...}
+    """
+    start_ns = time.perf_counter_ns()
+    parsed = {"total_runtime": 0, "total_cost": None, "filters": [], "fingerprint": None,
+              "cardinalities": None, "io": None}
+    if plan is not None:
+        if mode == "estimate":
+            if db_type == "MySQL":
+                estimates = extract_estimates_mysql(plan, filters)
+            elif db_type == "Postgres":
+                estimates = extract_estimates_postgres(plan, filters)
+            elif db_type == "DuckDB":
+                estimates = extract_estimates_duckdb(plan, filters)
+            else:
+                estimates = {"total_cost": None, "filters": []}
+            parsed["total_cost"] = estimates["total_cost"]
+            parsed["total_runtime"] = estimates["total_cost"] if estimates["total_cost"] is not None else 0.0
+            parsed["filters"] = estimates["filters"]
+        elif db_type == "MySQL":
+            parsed["filters"] = parse_analyze_mysql(plan, filters)
+            parsed["total_runtime"] = extract_total_runtime(plan)
+        elif db_type == "Postgres":
+            postgres_parsed = extract_runtime_and_filter_scans_postgres(plan, filters)
+            parsed["total_runtime"] = postgres_parsed["total_runtime"]
+            parsed["filters"] = postgres_parsed["filters"]
+        elif db_type == "DuckDB":
+            duck_parsed = extract_runtime_and_filter_scans_duckdb(plan, filters)
+            parsed["total_runtime"] = duck_parsed["total_runtime"]
+            parsed["filters"] = duck_parsed["filters"]
+        parsed["fingerprint"] = plan_fingerprint(db_type, plan, mode)
+        if mode == "analyze":
+            parsed["cardinalities"] = _extract_node_cardinalities(db_type, plan, filters)
+            if db_type == "Postgres":
+                parsed["io"] = extract_buffers_postgres(plan)
+            elif db_type == "DuckDB":
+                parsed["io"] = extract_io_duckdb(plan)
+    parsed["parse_ns"] = time.perf_counter_ns() - start_ns
+    return parsed
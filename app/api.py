@@ -0,0 +1,84 @@
+from fastapi import APIRouter, Body, HTTPException
+
+from app.backend_service import BackendService, CACHE_POLICIES, SWEEP_MODES
+from app.helpers import parse_sweep_spec, SAMPLING_DESIGNS, SWEEP_DESIGNS
+
+
+def create_api_router(backend_service: BackendService) -> APIRouter:
+    """
+    REST endpoints to submit sweeps, poll their status and fetch results without the UI
+    """
+    router = APIRouter(prefix="/api")
+
+    @router.post("/sweeps")
+    async def submit_sweep(spec: dict = Body(...)):
+        try:
+            benchmark_query, range_values = parse_sweep_spec(spec)
+            mode = spec.get('mode', "analyze")
+            if mode not in SWEEP_MODES:
+                raise ValueError(f"Unknown sweep mode: {mode}")
+            cache_policy = spec.get('cache_policy', "as_is")
+            if cache_policy not in CACHE_POLICIES:
+                raise ValueError(f"Unknown cache policy: {cache_policy}")
+            design = spec.get('design', "grid")
+            if design not in SWEEP_DESIGNS:
+                raise ValueError(f"Unknown sweep design: {design}")
+            budget = int(spec['budget']) if spec.get('budget') is not None else None
+            if design in SAMPLING_DESIGNS and not budget:
+                raise ValueError(f"Sweep design {design} needs a budget")
+            seed = int(spec['seed']) if spec.get('seed') is not None else None
+            min_step = int(spec['min_step']) if spec.get('min_step') is not None else None
+            threshold = float(spec['threshold']) if spec.get('threshold') is not None else None
+            index_variants = [list(variant) for variant in spec['index_variants']] \
+                if spec.get('index_variants') is not None else None
+            use_cache = bool(spec.get('use_cache', False))
+        except (KeyError, ValueError, TypeError) as e:
+            raise HTTPException(status_code=400, detail=f"Invalid sweep spec: {e!r}")
+        await backend_service.initialize_queue_worker()
+        try:
+            sweep_id = await backend_service.schedule_query_exectution(benchmark_query, range_values, mode,
+                                                                       cache_policy, design, budget, seed, min_step,
+                                                                       threshold, index_variants, use_cache)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid sweep spec: {e!r}")
+        return {'sweep_id': sweep_id}
+
+    @router.get("/sweeps")
+    async def list_sweeps():
+        return [sweep.to_dict() for sweep in backend_service.sweeps.values()]
+
+    @router.get("/sweeps/{sweep_id}")
+    async def get_sweep(sweep_id: str):
+        sweep = backend_service.sweeps.get(sweep_id)
+        if sweep is None:
+            raise HTTPException(status_code=404, detail="Unknown sweep")
+        return sweep.to_dict()
+
+    @router.get("/sweeps/{sweep_id}/results")
+    async def get_sweep_results(sweep_id: str, raw: bool = False):
+        sweep = backend_service.sweeps.get(sweep_id)
+        if sweep is None:
+            raise HTTPException(status_code=404, detail="Unknown sweep")
+        if sweep.status == "failed":
+            raise HTTPException(status_code=500, detail=f"Sweep failed: {sweep.error}")
+        results = backend_service.get_sweep_results(sweep_id, include_raw=raw)
+        if results is None:
+            raise HTTPException(status_code=409, detail="Sweep has not finished yet")
+        parsed, raw_results = results
+        return {'parsed': parsed, 'raw': raw_results} if raw else {'parsed': parsed}
+
+    @router.get("/sweeps/{sweep_id}/comparison")
+    async def get_variant_comparison(sweep_id: str):
+        sweep = backend_service.sweeps.get(sweep_id)
+        if sweep is None:
+            raise HTTPException(status_code=404, detail="Unknown sweep")
+        if sweep.status == "failed":
+            raise HTTPException(status_code=500, detail=f"Sweep failed: {sweep.error}")
+        if not sweep.variants and sweep.done.is_set():
+            raise HTTPException(status_code=400, detail="Not an index variant sweep")
+        comparison = backend_service.get_variant_comparison(sweep_id)
+        if comparison is None:
+            raise HTTPException(status_code=409, detail="Sweep has not finished yet")
+        return {'variants': sweep.variants, 'comparison': comparison}
+
+    return router
@@ -1,40 +1,74 @@
 import asyncio
+import time
+import uuid
 from asyncio import Queue
-from typing import Dict, List, Callable
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Callable, Optional
 
-from psycopg_pool import AsyncConnectionPool
-
-from app.analyze_parsers import parse_analyze_mysql, extract_total_runtime, extract_runtime_and_filter_scans_duckdb, \
-    extract_runtime_and_filter_scans_postgres
-from app.config import load_config
+from app.broker.sqlite_broker import SqliteJobBroker
+from app.config import load_config, resolve_app_path
 from app.duckdb_client.duckdb_client import DuckDbClient
-from app.helpers import build_all_queries
+from app.helpers import build_all_queries, build_ready_queries, SWEEP_DESIGNS
+from app.index_variants import variant_name, variant_indexes, create_statements, drop_statements, \
+    compare_variants
+from app.metrics import metrics_registry, queue_depth, inflight_batches, queries_total, query_failures_total, \
+    batch_failures_total, query_latency_seconds, parse_seconds, pool_size, pool_in_use, pool_max_size, query_rate, \
+    raw_plan_bytes, stored_plan_bytes, checksum_mismatches_total, parse_queue_depth, result_cache_hits_total, \
+    result_cache_entries
 from app.mysql_client.async_mysql_client import AsyncMysqlClient
 from app.mysql_client.create_pool import create_mysql_pool
 from app.mysql_client.mysql_client import MysqlClient
+from app.parse_stage import ParseStage
+from app.plan_store import PlanStore
+from app.refinement import refinement_points
+from app.result_cache import ResultCache, point_key, template_hash
+from app.result_checksum import RowChecksum
+from app.simulated_client.simulated_client import SimulatedEngine, build_simulated_engines
+from app.sweep_result import SweepResult
 from app.postgres_client.async_postgres_client import AsyncPostgresClient
 from app.postgres_client.create_pool import create_postgres_pool
 from app.postgres_client.postgres_client import PostgresClient
-from app.types import BenchmarkQuery, ReadyQuery
+from app.tracing import tracer
+from app.types import BenchmarkQuery, ReadyQuery, QueryBatch, QueryTiming, SweepState, RefinementState
 
 config = load_config()
 
+# "analyze" executes every sweep point with EXPLAIN ANALYZE, "estimate" only asks the optimizer with EXPLAIN.
+# "timed" measures the runtime without per node instrumentation (plain execution, Postgres
+# EXPLAIN (ANALYZE, TIMING OFF)), "timed_analyze" adds a separate EXPLAIN ANALYZE run for row counts.
+SWEEP_MODES = ("analyze", "estimate", "timed", "timed_analyze")
+TIMED_MODES = ("timed", "timed_analyze")
+# Cache state before every measured query: left "as_is", "warm" after an unmeasured pre-run, or "cold"
+# after the engine's caches are reset (client.reset_cache and cache.drop_command)
+CACHE_POLICIES = ("as_is", "warm", "cold")
 
-def start_db_connections():
-    clients: Dict[str, MysqlClient | PostgresClient | DuckDbClient] = {}
 
+def enabled_databases() -> List[str]:
+    """
+    Names of the database servers enabled in config, without connecting to them
+    """
+    databases = []
     if config.database.mysql.enabled:
-        mysql_client = MysqlClient()
-        clients["MySQL"] = mysql_client
-
+        databases.append("MySQL")
     if config.database.postgres.enabled:
-        postgres_client = PostgresClient()
-        clients["Postgres"] = postgres_client
-
+        databases.append("Postgres")
     if config.database.duckdb.enabled:
-        duckdb_client = DuckDbClient()
-        clients["DuckDB"] = duckdb_client
+        databases.append("DuckDB")
+    return databases
+
 
+def start_db_connections():
+    """
+    Open blocking connections to every enabled database, in parallel
+    """
+    client_classes = {"MySQL": MysqlClient, "Postgres": PostgresClient, "DuckDB": DuckDbClient}
+    databases = enabled_databases()
+    if not databases:
+        return {}
+    with ThreadPoolExecutor(max_workers=len(databases)) as executor:
+        futures = {db: executor.submit(client_classes[db]) for db in databases}
+        clients: Dict[str, MysqlClient | PostgresClient | DuckDbClient] = {db: f.result() for db, f in futures.items()}
     return clients
 
 
@@ -56,8 +90,11 @@ class DatabaseQueueWorker:
     each using its own MysqlClient instance from a shared aiomysql pool.
     """
 
-    def __init__(self, callback: Callable, num_workers: int = 5):
+    def __init__(self, callback: Callable, num_workers: int = 5, error_callback: Optional[Callable] = None,
+                 duckdb_concurrency: int = 1, simulated_engines: Optional[Dict[str, SimulatedEngine]] = None):
         self.callback = callback
+        # Called with (batch, exception) when a whole batch fails
+        self.error_callback = error_callback
 
         self.mysql_queue = Queue()
         self.postgres_queue = Queue()
@@ -65,10 +102,14 @@ class DatabaseQueueWorker:
 
         self.mysql_pool = None
         self.postgres_pool = None
+        # Engines answered by in-process simulated clients instead of servers, see simulated_client
+        self.simulated_engines = simulated_engines or {}
 
         self.num_workers = num_workers
         self.postgres_in_progress = False
-        self.duckdb_in_progress = False
+        # DuckDB batches running at once, each one opens its own connection to the database file
+        self.duckdb_concurrency = duckdb_concurrency
+        self.duckdb_running = 0
 
         self.semaphore = asyncio.Semaphore(self.num_workers)
 
@@ -78,68 +119,155 @@ class DatabaseQueueWorker:
         """
         Initializes the async connection pools.
         """
-        self.mysql_pool = await create_mysql_pool()
-        self.postgres_pool = create_postgres_pool()
+        async def open_postgres_pool():
+            pool = create_postgres_pool()
+            await pool.open()
+            return pool
+
+        # Pools are opened concurrently, only for enabled engines
+        mysql_pool, postgres_pool = await asyncio.gather(
+            create_mysql_pool() if config.database.mysql.enabled and "MySQL" not in self.simulated_engines
+            else asyncio.sleep(0),
+            open_postgres_pool() if config.database.postgres.enabled and "Postgres" not in self.simulated_engines
+            else asyncio.sleep(0),
+        )
+        self.mysql_pool = mysql_pool
+        self.postgres_pool = postgres_pool
         return self
 
     async def dispatch_loop(self):
         while True:
             if not self.mysql_queue.empty():
-                queries, benchmark_query = await self.mysql_queue.get()
-                _ = asyncio.create_task(self.run_mysql_task(queries, benchmark_query))
+                with tracer.span("dispatch", engine="MySQL"):
+                    batch = await self.mysql_queue.get()
+                    _ = asyncio.create_task(self.run_mysql_task(batch))
 
             if not self.postgres_queue.empty() and not self.postgres_in_progress:
                 self.postgres_in_progress = True
-                queries, benchmark_query = await self.postgres_queue.get()
-                _ = asyncio.create_task(self.run_postgres_task(queries, benchmark_query))
+                with tracer.span("dispatch", engine="Postgres"):
+                    batch = await self.postgres_queue.get()
+                    _ = asyncio.create_task(self.run_postgres_task(batch))
 
-            if not self.duckdb_queue.empty() and not self.duckdb_in_progress:
-                self.duckdb_in_progress = True
-                queries, benchmark_query = await self.duckdb_queue.get()
-                _ = asyncio.create_task(self.run_duckdb_task(queries, benchmark_query))
+            if not self.duckdb_queue.empty() and self.duckdb_running < self.duckdb_concurrency:
+                self.duckdb_running += 1
+                with tracer.span("dispatch", engine="DuckDB"):
+                    batch = await self.duckdb_queue.get()
+                    _ = asyncio.create_task(self.run_duckdb_task(batch))
 
             await asyncio.sleep(0.05)  # Avoid busy loop
 
-    async def run_mysql_task(self, queries, benchmark_query):
+    def collect_metrics(self):
+        """
+        Refresh queue and pool gauges, called on every metrics scrape
+        """
+        queue_depth.set(self.mysql_queue.qsize(), engine="MySQL")
+        queue_depth.set(self.postgres_queue.qsize(), engine="Postgres")
+        queue_depth.set(self.duckdb_queue.qsize(), engine="DuckDB")
+        if self.mysql_pool is not None:
+            pool_size.set(self.mysql_pool.size, engine="MySQL")
+            pool_in_use.set(self.mysql_pool.size - self.mysql_pool.freesize, engine="MySQL")
+            pool_max_size.set(self.mysql_pool.maxsize, engine="MySQL")
+        if self.postgres_pool is not None:
+            stats = self.postgres_pool.get_stats()
+            pool_size.set(stats.get("pool_size", 0), engine="Postgres")
+            pool_in_use.set(stats.get("pool_size", 0) - stats.get("pool_available", 0), engine="Postgres")
+            pool_max_size.set(self.postgres_pool.max_size, engine="Postgres")
+        for engine, simulated in self.simulated_engines.items():
+            pool_size.set(simulated.max_connections, engine=engine)
+            pool_in_use.set(simulated.active_connections, engine=engine)
+            pool_max_size.set(simulated.max_connections, engine=engine)
+
+    @asynccontextmanager
+    async def connect(self, db_type: str):
+        """
+        Acquire an async client of the engine, from its pool or its simulation
+        """
+        if db_type in self.simulated_engines:
+            async with self.simulated_engines[db_type].connection() as client:
+                yield client
+        elif db_type == "MySQL":
+            async with self.mysql_pool.acquire() as conn:
+                yield await AsyncMysqlClient.create(conn)
+        elif db_type == "Postgres":
+            async with self.postgres_pool.connection() as conn:
+                yield AsyncPostgresClient(conn)
+        else:
+            yield DuckDbClient()
+
+    async def run_mysql_task(self, batch: QueryBatch):
         async with self.semaphore:
+            inflight_batches.inc(engine="MySQL")
             try:
-                async with self.mysql_pool.acquire() as conn:
-                    client = await AsyncMysqlClient.create(conn)
-                    await self.callback(queries, benchmark_query, client)
+                acquire_start_ns = time.perf_counter_ns()
+                async with self.connect("MySQL") as client:
+                    acquired_ns = time.perf_counter_ns()
+                    batch.acquire_ns = acquired_ns - acquire_start_ns
+                    tracer.record("pool_acquire", acquire_start_ns, acquired_ns, engine=batch.benchmark_query.database)
+                    batch.baseline_rtt_ns = await client.measure_round_trip()
+                    await self.callback(batch, client)
             except Exception as e:
+                batch_failures_total.inc(engine="MySQL")
                 print("[MySQL] Error:", e)
+                self.report_error(batch, e)
+            finally:
+                inflight_batches.dec(engine="MySQL")
 
-    async def run_postgres_task(self, queries, benchmark_query):
+    async def run_postgres_task(self, batch: QueryBatch):
         async with self.semaphore:
+            inflight_batches.inc(engine="Postgres")
             try:
-                async with self.postgres_pool.connection() as conn:
-                    client = AsyncPostgresClient(conn)
-                    await self.callback(queries, benchmark_query, client)
+                acquire_start_ns = time.perf_counter_ns()
+                async with self.connect("Postgres") as client:
+                    acquired_ns = time.perf_counter_ns()
+                    batch.acquire_ns = acquired_ns - acquire_start_ns
+                    tracer.record("pool_acquire", acquire_start_ns, acquired_ns, engine=batch.benchmark_query.database)
+                    batch.baseline_rtt_ns = await client.measure_round_trip()
+                    await self.callback(batch, client)
             except Exception as e:
+                batch_failures_total.inc(engine="Postgres")
                 print("[Postgres] Error:", e)
+                self.report_error(batch, e)
             finally:
+                inflight_batches.dec(engine="Postgres")
                 self.postgres_in_progress = False
 
-    async def run_duckdb_task(self, queries, benchmark_query):
+    async def run_duckdb_task(self, batch: QueryBatch):
         async with self.semaphore:
+            inflight_batches.inc(engine="DuckDB")
             try:
-                client = DuckDbClient()
-                await self.callback(queries, benchmark_query, client)
+                acquire_start_ns = time.perf_counter_ns()
+                async with self.connect("DuckDB") as client:
+                    acquired_ns = time.perf_counter_ns()
+                    batch.acquire_ns = acquired_ns - acquire_start_ns
+                    tracer.record("pool_acquire", acquire_start_ns, acquired_ns, engine="DuckDB")
+                    batch.baseline_rtt_ns = await client.measure_round_trip()
+                    await self.callback(batch, client)
             except Exception as e:
+                batch_failures_total.inc(engine="DuckDB")
                 print("[DuckDb] Error:", e)
+                self.report_error(batch, e)
             finally:
-                self.duckdb_in_progress = False
+                inflight_batches.dec(engine="DuckDB")
+                self.duckdb_running -= 1
+
+    def report_error(self, batch: QueryBatch, error: Exception):
+        if self.error_callback is not None:
+            _ = asyncio.create_task(self.error_callback(batch, error))
 
     def schedule_callback(self, queries, benchmark_query: BenchmarkQuery):
-        db_type = benchmark_query.database
+        self.schedule_batch(QueryBatch(queries, benchmark_query, enqueued_ns=time.perf_counter_ns()))
+
+    def schedule_batch(self, batch: QueryBatch):
+        db_type = batch.benchmark_query.database
         if db_type == "MySQL":
-            self.mysql_queue.put_nowait((queries, benchmark_query))
+            self.mysql_queue.put_nowait(batch)
         elif db_type == "Postgres":
-            self.postgres_queue.put_nowait((queries, benchmark_query))
+            self.postgres_queue.put_nowait(batch)
         elif db_type == "DuckDB":
-            self.duckdb_queue.put_nowait((queries, benchmark_query))
+            self.duckdb_queue.put_nowait(batch)
         else:
             print("Unknown database type:", db_type)
+            self.report_error(batch, ValueError(f"Unknown database type: {db_type}"))
 
 
 class ResultStorage:
@@ -147,100 +275,801 @@ class ResultStorage:
     In-memory storage for query results
     """
     def __init__(self):
+        # Raw plans are kept as PlanStore handles, use get_raw_results to rebuild the text
+        self.plan_store = PlanStore()
         self.raw_result_list = []
+        # One SweepResult (columnar) per stored batch, use get_parsed_results for the result dicts
         self.parsed_result_list = []
+        # Per batch timing summary, index aligned with parsed_result_list
+        self.batch_timing_list = []
+        # One row per stored batch for the result table, index aligned with parsed_result_list
+        self.batch_summary_list = []
+        # Result checksums of every sweep point by (benchmark, query, parameter values),
+        # each entry is a list of (server, checksum, batch index, row index)
+        self.checksum_index = {}
+        # Incremented on every write so UI clients can poll for changes cheaply
+        self.version = 0
         self.lock = asyncio.Lock()
 
+    def get_summary_page(self, page: int, rows_per_page: int):
+        """
+        Return one page (1-based) of batch summaries and the total row count
+        """
+        total = len(self.batch_summary_list)
+        if rows_per_page <= 0:
+            return list(self.batch_summary_list), total
+        start = (page - 1) * rows_per_page
+        return self.batch_summary_list[start:start + rows_per_page], total
+
+    def check_result_checksums(self, benchmark_query: BenchmarkQuery, parsed_result_list: list) -> int:
+        """
+        Compare result checksums with the same sweep point of other engines and flag disagreeing
+        results with checksum_mismatch. Points are matched by benchmark, query template and parameter values,
+        whatever name the query is saved under. Returns the number of newly flagged results of this batch.
+        """
+        mismatches = 0
+        batch_index = len(self.parsed_result_list)
+        digest = template_hash(benchmark_query.query)
+        for row, formatted_result in enumerate(parsed_result_list):
+            checksum = formatted_result.get('result_checksum')
+            if checksum is None:
+                continue
+            params = []
+            n = 1
+            while f'filter_{n}' in formatted_result:
+                params.append((formatted_result[f'filter_{n}'], str(formatted_result.get(f'val_{n}'))))
+                n += 1
+            key = (formatted_result['database'], digest, tuple(params))
+            seen = self.checksum_index.setdefault(key, [])
+            others = [other for other in seen if other[0] != formatted_result['server']]
+            if any(other[1] != checksum for other in others):
+                formatted_result['checksum_mismatch'] = True
+                for other in others:
+                    if other[2] == batch_index:
+                        parsed_result_list[other[3]]['checksum_mismatch'] = True
+                    else:
+                        self.parsed_result_list[other[2]].set_value('checksum_mismatch', other[3], True)
+                mismatches += 1
+                print(f"[Checksum] Mismatch for {key}:", {formatted_result['server']: checksum,
+                                                          **{other[0]: other[1] for other in others}})
+            else:
+                formatted_result['checksum_mismatch'] = False
+            seen.append((formatted_result['server'], checksum, batch_index, row))
+        return mismatches
+
+    def add_raw_results(self, result_list: list):
+        self.raw_result_list.append([self.plan_store.put(result) for result in result_list])
+
+    def get_raw_results(self, index: int) -> list:
+        """
+        Rebuild the exact raw results of a stored batch
+        """
+        return [self.plan_store.get(handle) for handle in self.raw_result_list[index]]
+
+    def get_raw_result(self, index: int, row: int):
+        return self.plan_store.get(self.raw_result_list[index][row])
+
+    def get_parsed_results(self, index: int) -> list:
+        """
+        Result dicts of a stored batch, one per query
+        """
+        return self.parsed_result_list[index].to_records()
+
 
 class BackendService:
     """
     Backend to handle query operations and result parsing
     """
-    def __init__(self, callback_table_update=None):
-        self.clients = start_db_connections()
+    def __init__(self, callback_table_update=None, executor_mode: Optional[str] = None):
+        # Blocking clients for metadata lookups, connected on first use
+        self._clients = None
+        self._clients_lock = asyncio.Lock()
         self.queue_worker = None
         self.result_storage = ResultStorage()
         self.callback_table_update = callback_table_update
+        # Where finished batches go, executor agents replace this to publish into the job broker
+        self.batch_sink = self.store_batch
+        # In broker mode this process only schedules sweeps and collects results, agents execute them
+        executor_mode = executor_mode or config.executor.mode
+        self.broker = SqliteJobBroker(resolve_app_path(config.broker.path)) if executor_mode == "broker" else None
+        self.broker_collector = None
+        # Scheduled sweeps by id, for status polling through the REST API and headless runs
+        self.sweeps: Dict[str, SweepState] = {}
+        # Refinement sweeps by the sweep id of their running round, see _refine_sweep
+        self.refinement_rounds: Dict[str, RefinementState] = {}
+        # Executed sweep points by engine, benchmark, template, parameter values and settings
+        self.result_cache = ResultCache(config.result_cache.ttl_seconds, config.result_cache.max_entries) \
+            if config.result_cache.enabled else None
+        # (parsed result, raw result) of cache hits by sweep id, merged into the sweep's batch when it is stored
+        self.cached_points: Dict[str, list] = {}
+        # Plans are parsed in worker processes while the executors go on with the next query
+        self.parse_stage = ParseStage(config.parsing.workers, config.parsing.queue_size)
+        metrics_registry.register_collector(self._collect_metrics)
+
+    @property
+    def clients(self) -> Dict[str, MysqlClient | PostgresClient | DuckDbClient]:
+        if self._clients is None:
+            self._clients = start_db_connections()
+        return self._clients
+
+    async def get_clients(self) -> Dict[str, MysqlClient | PostgresClient | DuckDbClient]:
+        """
+        Connect metadata clients without blocking the event loop
+        """
+        async with self._clients_lock:
+            if self._clients is None:
+                self._clients = await asyncio.to_thread(start_db_connections)
+        return self._clients
+
+    async def _collect_metrics(self):
+        raw_plan_bytes.set(self.result_storage.plan_store.raw_bytes)
+        stored_plan_bytes.set(self.result_storage.plan_store.stored_bytes)
+        parse_queue_depth.set(self.parse_stage.qsize())
+        if self.queue_worker is not None:
+            self.queue_worker.collect_metrics()
+        elif self.broker is not None:
+            for engine, depth in (await asyncio.to_thread(self.broker.queue_depth)).items():
+                queue_depth.set(depth, engine=engine)
 
-    async def initialize_queue_worker(self):
-        self.queue_worker = DatabaseQueueWorker(self.execute_query_batch)
+    async def initialize_queue_worker(self, error_callback: Optional[Callable] = None):
+        if self.broker is not None:
+            if self.broker_collector is None:
+                self.broker_collector = asyncio.create_task(self.collect_broker_results())
+            return
+        if self.queue_worker is not None:
+            return
+        self.queue_worker = DatabaseQueueWorker(self.execute_query_batch, num_workers=config.executor.workers,
+                                                error_callback=error_callback or self._on_batch_error,
+                                                duckdb_concurrency=config.executor.duckdb_concurrency,
+                                                simulated_engines=build_simulated_engines(config.simulation)
+                                                if config.simulation.enabled else None)
         await self.queue_worker.init()
 
     def set_table_update_callback(self, callback):
         self.callback_table_update = callback
 
-    async def execute_query_batch(self, queries: List[ReadyQuery], benchmark_query: BenchmarkQuery, client: AsyncMysqlClient):
+    async def _on_batch_error(self, batch: QueryBatch, error: Exception):
+        self._fail_sweep(batch.sweep_id, repr(error))
+
+    def _fail_sweep(self, sweep_id: Optional[str], error: str):
+        """
+        Mark a sweep (or the running round of a refinement sweep) failed, nothing of it is stored
+        """
+        self.cached_points.pop(sweep_id, None)
+        refinement = self.refinement_rounds.pop(sweep_id, None)
+        if refinement is not None:
+            refinement.error = error
+            refinement.round_done.set()
+            return
+        sweep = self.sweeps.get(sweep_id)
+        if sweep is not None:
+            sweep.status = "failed"
+            sweep.error = error
+            sweep.done.set()
+
+    def get_sweep_results(self, sweep_id: str, include_raw: bool = True):
+        """
+        Return (parsed results, raw results) of a finished sweep, None if it is not stored yet.
+        Raw plans are rebuilt from the plan store, skip that with include_raw=False.
+        """
+        sweep = self.sweeps.get(sweep_id)
+        if sweep is None or sweep.result_index is None:
+            return None
+        index = sweep.result_index
+        raw_results = self.result_storage.get_raw_results(index) if include_raw else None
+        return self.result_storage.get_parsed_results(index), raw_results
+
+    async def execute_query_batch(self, batch: QueryBatch, client: AsyncMysqlClient):
         # Execute prepared queries and write results into storage
         print("Starting query batch execution")
+        queries = batch.queries
+        benchmark_query = batch.benchmark_query
         db_type = benchmark_query.database
-        result_list = []
-        parsed_result_list = []
+        sweep = self._sweep_of(batch.sweep_id)
+        if sweep is not None:
+            sweep.status = "running"
+        # Time the batch spent queued, the same for all of its queries
+        queue_wait_ns = time.perf_counter_ns() - batch.enqueued_ns
+        # Executed queries waiting for their plans to be parsed
+        pending = []
         i = 1
         for ready_query in queries:
             try:
                 query = ready_query.query
-                result = await client.analyze_query(query)
-                formatted_result = await self._process_result(result, ready_query, benchmark_query)
-                result_list.append(result)
-                parsed_result_list.append(formatted_result)
-                print(f"{db_type} Query Completed {i}/{len(queries)}")
+                timing = QueryTiming(
+                    queue_wait_ns=queue_wait_ns,
+                    acquire_ns=batch.acquire_ns,
+                    baseline_rtt_ns=batch.baseline_rtt_ns,
+                )
+                io_before = None
+                if batch.mode != "estimate":
+                    with tracer.span("prepare_cache", engine=db_type, query_index=i, policy=batch.cache_policy):
+                        await self._prepare_cache(client, query, db_type, batch.cache_policy)
+                    if db_type == "MySQL":
+                        io_before = await client.io_counters()
+                checksum = None
+                timed_plan, timed_runtime = None, None
+                if batch.mode in TIMED_MODES:
+                    checksum = RowChecksum(config.execution.checksum_float_digits) \
+                        if config.execution.result_checksums else None
+                    with tracer.span("time_query", engine=db_type, query_index=i):
+                        timed_plan, timed_runtime = await client.time_query(query, checksum)
+                elif batch.mode == "estimate":
+                    with tracer.span("explain_query", engine=db_type, query_index=i):
+                        result = await client.explain_query(query)
+                else:
+                    with tracer.span("analyze_query", engine=db_type, query_index=i):
+                        result = await client.analyze_query(query)
+                timing.execute_ns = client.last_execute_ns
+                timing.fetch_ns = client.last_fetch_ns
+                io_after = await client.io_counters() if io_before is not None else None
+                instrumented_plan = None
+                if batch.mode in TIMED_MODES:
+                    if batch.mode == "timed_analyze":
+                        # Separate instrumented run for row counts, kept out of the measured runtime
+                        with tracer.span("analyze_query", engine=db_type, query_index=i):
+                            instrumented_plan = await client.analyze_query(query)
+                    result = instrumented_plan if instrumented_plan is not None else timed_plan
+                query_latency_seconds.observe((timing.execute_ns + timing.fetch_ns) / 1e9, engine=db_type)
+                # Parsing happens in the parse stage, the connection goes on with the next query
+                var_list = [var['name'] for var in ready_query.variables]
+                with tracer.span("submit_parse", engine=db_type, query_index=i):
+                    parsed = await self.parse_stage.submit(
+                        db_type, result, var_list, "estimate" if batch.mode == "estimate" else "analyze")
+                    # The TIMING OFF plan of Postgres is parsed on its own only next to an instrumented run
+                    parsed_timed = await self.parse_stage.submit(db_type, timed_plan, [], "analyze") \
+                        if db_type == "Postgres" and timed_plan is not None and instrumented_plan is not None else None
+                pending.append({
+                    'index': i, 'ready_query': ready_query, 'timing': timing, 'result': result,
+                    'parsed': parsed, 'parsed_timed': parsed_timed, 'timed_runtime': timed_runtime,
+                    'instrumented': instrumented_plan is not None, 'checksum': checksum,
+                    'timed_plan_only': db_type == "Postgres" and timed_plan is not None and instrumented_plan is None,
+                    'io': {name: io_after[name] - value for name, value in io_before.items()}
+                    if io_before is not None else None,
+                })
             except Exception as e:
+                query_failures_total.inc(engine=db_type)
                 print(f"Error: {db_type} Query {i}/{len(queries)}")
                 print("Error: ", e)
             finally:
                 i += 1
+
+        result_list = []
+        parsed_result_list = []
+        for entry in pending:
+            i = entry['index']
+            try:
+                with tracer.span("process_result", engine=db_type, query_index=i):
+                    parsed = await entry['parsed']
+                    if batch.mode in TIMED_MODES:
+                        if entry['parsed_timed'] is not None:
+                            parsed_timed = await entry['parsed_timed']
+                        else:
+                            parsed_timed = parsed if entry['timed_plan_only'] else None
+                        formatted_result = self._process_timed_result(
+                            parsed, parsed_timed, entry['timed_runtime'], entry['instrumented'],
+                            entry['ready_query'], benchmark_query, batch.mode)
+                        if entry['checksum'] is not None:
+                            formatted_result['result_rows'] = entry['checksum'].row_count
+                            formatted_result['result_checksum'] = entry['checksum'].hexdigest()
+                    else:
+                        formatted_result = self._process_result(parsed, entry['ready_query'], benchmark_query,
+                                                                batch.mode)
+                    formatted_result['cache_policy'] = batch.cache_policy
+                    formatted_result['cached'] = False
+                    if entry['io'] is not None:
+                        # Server wide counters, concurrent sessions on the same server add to them
+                        formatted_result['io'] = entry['io']
+                timing = entry['timing']
+                timing.parse_ns = parsed['parse_ns']
+                batch.timings.append(timing)
+                queries_total.inc(engine=db_type)
+                query_rate.mark(db_type)
+                parse_seconds.observe(timing.parse_ns / 1e9, engine=db_type)
+                result_list.append(entry['result'])
+                parsed_result_list.append(formatted_result)
+                if sweep is not None:
+                    sweep.completed_queries += 1
+                print(f"{db_type} Query Completed {i}/{len(queries)}")
+            except Exception as e:
+                query_failures_total.inc(engine=db_type)
+                print(f"Error: {db_type} Query {i}/{len(queries)}")
+                print("Error: ", e)
+        await self.batch_sink(batch, parsed_result_list, result_list)
+        await tracer.flush_async()
+
+    @staticmethod
+    def finalize_timings(batch: QueryBatch, parsed_result_list: list, store_ns: int) -> dict:
+        """
+        Attach timing dicts to parsed results and return the batch level timing summary
+        """
+        for formatted_result, timing in zip(parsed_result_list, batch.timings):
+            timing.store_ns = store_ns
+            formatted_result['timing'] = timing.to_dict()
+        return {
+            'queue_wait_ns': batch.timings[0].queue_wait_ns if batch.timings else 0,
+            'acquire_ns': batch.acquire_ns,
+            'baseline_rtt_ns': batch.baseline_rtt_ns,
+            'store_ns': store_ns,
+        }
+
+    async def store_batch(self, batch: QueryBatch, parsed_result_list: list, result_list: list):
+        """
+        Write results of a finished batch into result storage
+        """
         # For multithreaded solution
         async with self.result_storage.lock:
-            print("Acquire lock")
-            self.result_storage.parsed_result_list.append(parsed_result_list)
-            self.result_storage.raw_result_list.append(result_list)
-            # Maybe there is a better way to make a call for table update ?
+            store_start_ns = time.perf_counter_ns()
+            # Timing dicts go into the columnar batch by reference, store_ns is filled in afterwards
+            batch_timing = self.finalize_timings(batch, parsed_result_list, 0)
+            refinement = self.refinement_rounds.get(batch.sweep_id)
+            with tracer.span("store_results", engine=batch.benchmark_query.database,
+                             query_count=len(parsed_result_list)):
+                self._append_results(batch.benchmark_query, parsed_result_list, result_list, batch.sweep_id)
+            store_ns = time.perf_counter_ns() - store_start_ns
+            for formatted_result, timing in zip(parsed_result_list, batch.timings):
+                timing.store_ns = store_ns
+                formatted_result['timing']['store_ns'] = store_ns
+            batch_timing['store_ns'] = store_ns
+            if refinement is not None:
+                refinement.batch_timings.append(batch_timing)
+            else:
+                self.result_storage.batch_timing_list.append(batch_timing)
+
+    def _append_results(self, benchmark_query: BenchmarkQuery, parsed_result_list: list, result_list: list,
+                        sweep_id: Optional[str] = None):
+        """
+        Append a finished batch to result storage, caller must hold the storage lock
+        """
+        index_variant = sweep.index_variant if (sweep := self._sweep_of(sweep_id)) is not None else None
+        if self.result_cache is not None:
+            hits = self.cached_points.pop(sweep_id, None)
+            if hits:
+                # Cached and executed points in parameter order
+                rows = sorted([(p, r) for p, r in zip(parsed_result_list, result_list)] + hits,
+                              key=lambda row: self._point_values(row[0]))
+                parsed_result_list = [p for p, _ in rows]
+                result_list = [r for _, r in rows]
+        refinement = self.refinement_rounds.pop(sweep_id, None)
+        if refinement is not None:
+            # A round of a refinement sweep, all rounds are stored together when it ends
+            refinement.parsed_results.extend(parsed_result_list)
+            refinement.raw_results.extend(result_list)
+            refinement.round_done.set()
+            return
+        sweep = self.sweeps.get(sweep_id)
+        if sweep is not None:
+            sweep.result_index = len(self.result_storage.parsed_result_list)
+            sweep.completed_queries = len(parsed_result_list)
+            sweep.status = "done"
+            sweep.done.set()
+        mismatches = self.result_storage.check_result_checksums(benchmark_query, parsed_result_list)
+        if mismatches:
+            checksum_mismatches_total.inc(mismatches, engine=benchmark_query.database)
+        self.result_storage.parsed_result_list.append(SweepResult.from_records(parsed_result_list))
+        if self.result_cache is not None:
+            batch_index = len(self.result_storage.parsed_result_list) - 1
+            digest = template_hash(benchmark_query.query)
+            for row, formatted_result in enumerate(parsed_result_list):
+                # Cached points keep the time they were measured, only executed ones are (re)cached
+                if not formatted_result.get('cached'):
+                    self.result_cache.put(self._cache_key(benchmark_query, digest, self._point_values(formatted_result),
+                                                          formatted_result['mode'], formatted_result['cache_policy'],
+                                                          index_variant), (batch_index, row))
+            result_cache_entries.set(len(self.result_cache))
+        self.result_storage.add_raw_results(result_list)
+        self.result_storage.batch_summary_list.append({
+            'id': len(self.result_storage.batch_summary_list),
+            'server': benchmark_query.database,
+            'database': benchmark_query.benchmark,
+            'query': benchmark_query.name,
+        })
+        self.result_storage.version += 1
+        if self.callback_table_update is not None:
             self.callback_table_update(benchmark_query)
 
-    async def schedule_query_exectution(self, benchmark_query: BenchmarkQuery, range_values):
-        queries = build_all_queries(benchmark_query.query, range_values)
-        self.queue_worker.schedule_callback(queries, benchmark_query)
+    async def collect_broker_results(self):
+        """
+        Broker mode: poll the job broker and move finished sweeps into result storage
+        """
+        while True:
+            try:
+                await asyncio.to_thread(self.broker.requeue_stale, config.broker.job_timeout)
+                for sweep in await asyncio.to_thread(self.broker.collect_finished_sweeps):
+                    await self._store_broker_sweep(sweep)
+            except Exception as e:
+                print("[Broker] Error:", e)
+            await asyncio.sleep(config.broker.poll_interval)
+
+    async def _store_broker_sweep(self, sweep: dict):
+        benchmark_query = BenchmarkQuery.from_dict(sweep['benchmark_query'])
+        parsed_result_list = []
+        result_list = []
+        chunk_timings = []
+        for chunk in sweep['chunks']:
+            if chunk['status'] != 'done':
+                # Like a failed local batch, the sweep fails instead of storing the other chunks
+                print(f"[Broker] Chunk of sweep {sweep['sweep_id']} failed:", chunk['error'])
+                self._fail_sweep(sweep['sweep_id'], chunk['error'])
+                return
+            parsed_result_list.extend(chunk['result']['parsed'])
+            result_list.extend(chunk['result']['raw'])
+            chunk_timings.append(chunk['result']['batch_timing'])
+        async with self.result_storage.lock:
+            store_start_ns = time.perf_counter_ns()
+            refinement = self.refinement_rounds.get(sweep['sweep_id'])
+            self._append_results(benchmark_query, parsed_result_list, result_list, sweep['sweep_id'])
+            store_ns = time.perf_counter_ns() - store_start_ns
+            for formatted_result in parsed_result_list:
+                formatted_result['timing']['store_ns'] = store_ns
+            batch_timing = self.merge_batch_timings(chunk_timings)
+            batch_timing['store_ns'] = store_ns
+            if refinement is not None:
+                refinement.batch_timings.append(batch_timing)
+            else:
+                self.result_storage.batch_timing_list.append(batch_timing)
+
+    @staticmethod
+    def merge_batch_timings(batch_timings: List[dict]) -> dict:
+        """
+        One timing summary of batches stored together (broker chunks, refinement rounds)
+        """
+        return {
+            'queue_wait_ns': max((t['queue_wait_ns'] for t in batch_timings), default=0),
+            'acquire_ns': sum(t['acquire_ns'] for t in batch_timings),
+            'baseline_rtt_ns': min((t['baseline_rtt_ns'] for t in batch_timings), default=0),
+            'store_ns': sum(t['store_ns'] for t in batch_timings),
+        }
+
+    async def schedule_query_exectution(self, benchmark_query: BenchmarkQuery, range_values,
+                                        mode: str = "analyze", cache_policy: str = "as_is", design: str = "grid",
+                                        budget: Optional[int] = None, seed: Optional[int] = None,
+                                        min_step: Optional[int] = None, threshold: Optional[float] = None,
+                                        index_variants: Optional[List[List[str]]] = None, use_cache: bool = False,
+                                        index_variant: Optional[str] = None) -> str:
+        """
+        Schedule a sweep over the given parameter ranges and return its sweep id.
+        mode is one of SWEEP_MODES, "estimate" only plans every query instead of executing it.
+        cache_policy is one of CACHE_POLICIES.
+        design is one of SWEEP_DESIGNS, the sampling designs run at most budget queries. "refine" starts with
+        the grid of the ranges and bisects intervals with a change point (factor threshold) down to min_step.
+        index_variants runs the sweep once per list of filter columns to index, [] is the run without indexes.
+        use_cache reuses points found in the result cache, all points are executed otherwise.
+        """
+        if mode not in SWEEP_MODES:
+            raise ValueError(f"Unknown sweep mode: {mode}")
+        if cache_policy not in CACHE_POLICIES:
+            raise ValueError(f"Unknown cache policy: {cache_policy}")
+        if design not in SWEEP_DESIGNS:
+            raise ValueError(f"Unknown sweep design: {design}")
+        if index_variants:
+            if self.queue_worker is None:
+                raise ValueError("Index variant sweeps need the local executor, indexes are created from this process")
+            sweep_id = uuid.uuid4().hex
+            sweep = SweepState(sweep_id, benchmark_query, 0, mode=mode, cache_policy=cache_policy, design=design,
+                               budget=budget, use_cache=use_cache)
+            self.sweeps[sweep_id] = sweep
+            _ = asyncio.create_task(self._run_index_variants(
+                sweep, range_values, index_variants,
+                dict(design=design, budget=budget, seed=seed, min_step=min_step, threshold=threshold,
+                     use_cache=use_cache)))
+            return sweep_id
+        with tracer.span("schedule_query_execution", engine=benchmark_query.database, query=benchmark_query.name):
+            queries = build_all_queries(benchmark_query.query, range_values, design, budget, seed)
+            sweep_id = uuid.uuid4().hex
+            sweep = SweepState(sweep_id, benchmark_query, len(queries), mode=mode, cache_policy=cache_policy,
+                               design=design, budget=budget, index_variant=index_variant, use_cache=use_cache)
+            self.sweeps[sweep_id] = sweep
+            if design == "refine":
+                refinement = RefinementState(sweep)
+                _ = asyncio.create_task(self._refine_sweep(refinement, queries, range_values, min_step or 1,
+                                                           threshold or config.refinement.threshold))
+            else:
+                await self._dispatch_queries(queries, benchmark_query, sweep_id, mode, cache_policy)
         print("Scheduled Query: ", benchmark_query.name)
+        return sweep_id
 
-    async def _process_result(self, result, ready_query: ReadyQuery, benchmark_query: BenchmarkQuery):
+    async def _run_index_variants(self, sweep: SweepState, range_values: list, index_variants: List[List[str]],
+                                  sweep_options: dict):
         """
-        Process single query result, extract runtime and rows executed and format result
+        Run the sweep once per index variant: create the variant's indexes, refresh statistics, run the sweep
+        and drop the indexes again before the next variant
         """
+        benchmark_query = sweep.benchmark_query
+        db_type = benchmark_query.database
         try:
-            var_data = ready_query.variables
-            var_list = [var['name'] for var in var_data]
-            db_type = benchmark_query.database
-            benchmark = benchmark_query.benchmark
-            name = benchmark_query.name
-            if benchmark_query.database == "MySQL":
-                parsed_result = parse_analyze_mysql(result, var_list)
-                total_runtime = extract_total_runtime(result)
-            elif benchmark_query.database == "Postgres":
-                postgres_parsed = extract_runtime_and_filter_scans_postgres(result, var_list)
-                total_runtime = postgres_parsed["total_runtime"]
-                parsed_result = postgres_parsed["filters"]
-            elif benchmark_query.database == "DuckDB":
-                duck_parsed = extract_runtime_and_filter_scans_duckdb(result, var_list)
-                total_runtime = duck_parsed["total_runtime"]
-                parsed_result = duck_parsed["filters"]
+            columns = list(dict.fromkeys(column for variant in index_variants for column in variant))
+            async with self.queue_worker.connect(db_type) as client:
+                tables = {column: await client.table_of_column(column) for column in columns}
+            for variant in index_variants:
+                name = variant_name(variant)
+                indexes = variant_indexes(variant, tables)
+                try:
+                    async with self.queue_worker.connect(db_type) as client:
+                        for statement in create_statements(db_type, indexes):
+                            await client.execute_statement(statement)
+                    self.clear_result_cache(f"indexes of {name} created")
+                    variant_query = BenchmarkQuery(benchmark_query.query, benchmark_query.parameters, db_type,
+                                                   benchmark_query.benchmark, f"{benchmark_query.name} [{name}]")
+                    child_id = await self.schedule_query_exectution(variant_query, range_values, sweep.mode,
+                                                                    sweep.cache_policy, **sweep_options,
+                                                                    index_variant=name)
+                    sweep.variants[name] = child_id
+                    child = self.sweeps[child_id]
+                    sweep.query_count += child.query_count
+                    sweep.status = "running"
+                    await child.done.wait()
+                    sweep.completed_queries += child.completed_queries
+                    if child.status == "failed":
+                        raise RuntimeError(f"Variant {name} failed: {child.error}")
+                finally:
+                    async with self.queue_worker.connect(db_type) as client:
+                        for statement in drop_statements(db_type, indexes):
+                            try:
+                                await client.execute_statement(statement)
+                            except Exception as e:
+                                # Index of a failed create, nothing to drop
+                                print(f"[Index variants] '{statement}' failed:", e)
+                    self.clear_result_cache(f"indexes of {name} dropped")
+            sweep.status = "done"
+        except Exception as e:
+            print("[Index variants] Error:", e)
+            sweep.status = "failed"
+            sweep.error = repr(e)
+        sweep.done.set()
+
+    def get_variant_comparison(self, sweep_id: str) -> Optional[list]:
+        """
+        Runtime comparison of the variants of a finished index variant sweep, see index_variants.compare_variants
+        """
+        sweep = self.sweeps.get(sweep_id)
+        if sweep is None or not sweep.variants or not sweep.done.is_set():
+            return None
+        results = {}
+        for name, child_id in sweep.variants.items():
+            child = self.sweeps[child_id]
+            if child.result_index is not None:
+                results[name] = self.result_storage.get_parsed_results(child.result_index)
+        names = list(dict.fromkeys(parameter.name for parameter in sweep.benchmark_query.parameters))
+        return compare_variants(results, names)
+
+    async def _dispatch_queries(self, queries: List[ReadyQuery], benchmark_query: BenchmarkQuery, sweep_id: str,
+                                mode: str, cache_policy: str):
+        sweep = self._sweep_of(sweep_id)
+        if self.result_cache is not None and sweep is not None and sweep.use_cache:
+            queries = self._take_cached_points(queries, benchmark_query, sweep, sweep_id, mode, cache_policy)
+            if not queries:
+                # Every point is cached, the sweep is stored right away
+                await self._store_without_queries(benchmark_query, sweep_id)
+                return
+        if self.broker is not None:
+            await self._submit_to_broker(queries, benchmark_query, sweep_id, mode, cache_policy)
+        else:
+            self.queue_worker.schedule_batch(QueryBatch(queries, benchmark_query, enqueued_ns=time.perf_counter_ns(),
+                                                        sweep_id=sweep_id, mode=mode, cache_policy=cache_policy))
+
+    async def _store_without_queries(self, benchmark_query: BenchmarkQuery, sweep_id: str):
+        """
+        Store a sweep that has nothing to execute, with its cached points if any
+        """
+        async with self.result_storage.lock:
+            refinement = self.refinement_rounds.get(sweep_id)
+            self._append_results(benchmark_query, [], [], sweep_id)
+            batch_timing = self.merge_batch_timings([])
+            if refinement is not None:
+                refinement.batch_timings.append(batch_timing)
             else:
-                total_runtime = 0
-
-            formatted_result = {
-                'server': db_type,
-                'database': benchmark,
-                'query': name,
-                'runtime': total_runtime,
-                'filter_1': var_data[0]['name'] if len(var_data) > 0 and 'name' in var_data[0] else '',
-                'val_1': var_data[0]['value'] if len(var_data) > 0 and 'value' in var_data[0] else '',
-                'rows_1': parsed_result[0]['total_rows'] if len(var_data) > 0 and parsed_result[0]['variable'] == var_data[0]['name'] else '',
-                'filter_2': var_data[1]['name'] if len(var_data) > 1 and 'name' in var_data[1] else '',
-                'val_2': var_data[1]['value'] if len(var_data) > 1 and 'value' in var_data[1] else '',
-                'rows_2': parsed_result[1]['total_rows'] if len(var_data) > 1 and parsed_result[1]['variable'] == var_data[1]['name'] else '',
-                'filter_3': var_data[2]['name'] if len(var_data) > 2 and 'name' in var_data[2] else '',
-                'val_3': var_data[2]['value'] if len(var_data) > 2 and 'value' in var_data[2] else '',
-                'rows_3': parsed_result[2]['total_rows'] if len(var_data) > 2 and parsed_result[2]['variable'] == var_data[2]['name'] else '',
-            }
-            return formatted_result
+                self.result_storage.batch_timing_list.append(batch_timing)
+
+    @staticmethod
+    def _point_values(formatted_result: dict) -> tuple:
+        """
+        Parameter values of a result in parameter order
+        """
+        values = []
+        n = 1
+        while formatted_result.get(f'filter_{n}'):
+            values.append(formatted_result.get(f'val_{n}'))
+            n += 1
+        return tuple(values)
+
+    @staticmethod
+    def _cache_key(benchmark_query: BenchmarkQuery, digest: str, values: tuple, mode: str, cache_policy: str,
+                   index_variant: Optional[str]) -> tuple:
+        return point_key(benchmark_query.database, benchmark_query.benchmark, digest, values,
+                         (mode, cache_policy, index_variant))
+
+    def _take_cached_points(self, queries: List[ReadyQuery], benchmark_query: BenchmarkQuery, sweep: SweepState,
+                            sweep_id: str, mode: str, cache_policy: str) -> List[ReadyQuery]:
+        """
+        Keep the cached results of queries for the sweep's batch and return the queries left to execute
+        """
+        index_variant = sweep.index_variant
+        digest = template_hash(benchmark_query.query)
+        hits = []
+        misses = []
+        for query in queries:
+            values = tuple(var['value'] for var in query.variables)
+            location = self.result_cache.get(self._cache_key(benchmark_query, digest, values, mode, cache_policy,
+                                                             index_variant))
+            if location is None:
+                misses.append(query)
+                continue
+            batch_index, row = location
+            formatted_result = self.result_storage.parsed_result_list[batch_index][row]
+            formatted_result['cached'] = True
+            # Same template under another name in the earlier sweep
+            formatted_result['query'] = benchmark_query.name
+            hits.append((formatted_result, self.result_storage.get_raw_result(batch_index, row)))
+        if hits:
+            self.cached_points[sweep_id] = hits
+            result_cache_hits_total.inc(len(hits), engine=benchmark_query.database)
+            print(f"Result cache: {len(hits)}/{len(queries)} points of {benchmark_query.name} cached")
+        return misses
+
+    def clear_result_cache(self, reason: str):
+        """
+        Forget all cached points, called after data loads and DDL that change what queries measure
+        """
+        if self.result_cache is None or not len(self.result_cache):
+            return
+        self.result_cache.clear()
+        result_cache_entries.set(0)
+        print(f"Result cache cleared: {reason}")
+
+    def _sweep_of(self, sweep_id: Optional[str]) -> Optional[SweepState]:
+        """
+        Sweep of a batch, refinement rounds run under their own ids
+        """
+        refinement = self.refinement_rounds.get(sweep_id)
+        return refinement.sweep if refinement is not None else self.sweeps.get(sweep_id)
+
+    async def _refine_sweep(self, refinement: RefinementState, queries: List[ReadyQuery], range_values: list,
+                            min_step: int, threshold: float):
+        """
+        Run the rounds of a refinement sweep: the coarse grid, then midpoints of every interval between
+        neighboring points with a change point until none is wider than min_step. Stores all rounds as one batch.
+        """
+        sweep = refinement.sweep
+        benchmark_query = sweep.benchmark_query
+        names = [var['name'] for var in range_values]
+        min_steps = {var['name']: min_step for var in range_values}
+        # Points of all rounds, failed queries are not run again
+        scheduled = {tuple(var['value'] for var in query.variables) for query in queries}
+        round_index = 0
+        try:
+            while queries and round_index < config.refinement.max_rounds:
+                round_id = f"{sweep.sweep_id}.{round_index}"
+                refinement.round_done.clear()
+                self.refinement_rounds[round_id] = refinement
+                await self._dispatch_queries(queries, benchmark_query, round_id, sweep.mode, sweep.cache_policy)
+                await refinement.round_done.wait()
+                if refinement.error is not None:
+                    break
+                midpoints = [point for point in refinement_points(refinement.parsed_results, names, min_steps, threshold)
+                             if point not in scheduled]
+                scheduled.update(midpoints)
+                queries = build_ready_queries(benchmark_query.query, range_values, midpoints)
+                sweep.query_count += len(queries)
+                round_index += 1
+            print(f"Refinement of {benchmark_query.name} finished after {round_index} rounds,",
+                  len(refinement.parsed_results), "queries")
         except Exception as e:
-            raise e
+            refinement.error = repr(e)
+        # Stored in parameter order, rounds interleave their points into the coarse grid
+        order = sorted(range(len(refinement.parsed_results)),
+                       key=lambda row: [refinement.parsed_results[row].get(f'val_{n + 1}') for n in range(len(names))])
+        async with self.result_storage.lock:
+            store_start_ns = time.perf_counter_ns()
+            self._append_results(benchmark_query, [refinement.parsed_results[row] for row in order],
+                                 [refinement.raw_results[row] for row in order], sweep.sweep_id)
+            batch_timing = self.merge_batch_timings(refinement.batch_timings)
+            batch_timing['store_ns'] += time.perf_counter_ns() - store_start_ns
+            self.result_storage.batch_timing_list.append(batch_timing)
+        if refinement.error is not None:
+            sweep.status = "failed"
+            sweep.error = refinement.error
+
+    async def _submit_to_broker(self, queries: List[ReadyQuery], benchmark_query: BenchmarkQuery, sweep_id: str,
+                                mode: str = "analyze", cache_policy: str = "as_is"):
+        chunk_size = config.broker.chunk_size
+        query_dicts = [{'query': q.query, 'variables': q.variables} for q in queries]
+        chunks = [query_dicts[i:i + chunk_size] for i in range(0, len(query_dicts), chunk_size)]
+        if not chunks:
+            # No job would ever be collected for an empty sweep
+            await self._store_without_queries(benchmark_query, sweep_id)
+            return
+        await asyncio.to_thread(self.broker.submit_sweep, benchmark_query.database,
+                                benchmark_query.to_dict(), chunks, sweep_id, mode, cache_policy)
+        print(f"Submitted sweep {sweep_id} to broker in {len(chunks)} chunks")
+
+    def _process_result(self, parsed: dict, ready_query: ReadyQuery, benchmark_query: BenchmarkQuery,
+                        mode: str = "analyze"):
+        """
+        Format a single query result from its parse_plan output, runtime and rows executed per filter.
+        In estimate mode runtime holds the optimizer's total cost and rows the estimated rows.
+        """
+        var_data = ready_query.variables
+        parsed_result = parsed["filters"]
+        formatted_result = {
+            'server': benchmark_query.database,
+            'database': benchmark_query.benchmark,
+            'query': benchmark_query.name,
+            'mode': mode,
+            'runtime': parsed["total_runtime"],
+        }
+        # filter_n / val_n / rows_n for every parameter, at least three slots as the result table expects
+        for i in range(max(len(var_data), 3)):
+            var = var_data[i] if i < len(var_data) else {}
+            filter_parsed = parsed_result[i] if i < len(parsed_result) else None
+            formatted_result[f'filter_{i + 1}'] = var.get('name', '')
+            formatted_result[f'val_{i + 1}'] = var.get('value', '')
+            formatted_result[f'rows_{i + 1}'] = filter_parsed['total_rows'] \
+                if filter_parsed is not None and 'name' in var and filter_parsed['variable'] == var['name'] else ''
+        formatted_result['plan_fingerprint'] = parsed["fingerprint"]
+        if mode == "analyze":
+            self._add_cardinalities(formatted_result, parsed["cardinalities"], var_data)
+            if parsed["io"] is not None:
+                formatted_result['io'] = parsed["io"]
+        if mode == "estimate":
+            formatted_result['estimated_cost'] = parsed["total_cost"]
+            for n, (var, filter_parsed) in enumerate(zip(var_data, parsed_result), start=1):
+                formatted_result[f'cost_{n}'] = filter_parsed['estimated_cost'] \
+                    if filter_parsed['variable'] == var['name'] else ''
+        return formatted_result
+
+    @staticmethod
+    async def _prepare_cache(client, query: str, db_type: str, cache_policy: str):
+        """
+        Bring caches into the state the sweep's cache policy asks for before a measured run
+        """
+        if cache_policy == "warm":
+            # Unmeasured pre-run, the pages the query touches are cached afterwards
+            await client.consume_query(query)
+        elif cache_policy == "cold":
+            await client.reset_cache()
+            if config.cache.drop_command:
+                process = await asyncio.create_subprocess_shell(config.cache.drop_command)
+                if await process.wait() != 0:
+                    print("[Cache] Error: drop command exited with", process.returncode)
+
+    def _process_timed_result(self, parsed: dict, parsed_timed: Optional[dict], timed_runtime: float,
+                              instrumented: bool, ready_query: ReadyQuery, benchmark_query: BenchmarkQuery,
+                              mode: str):
+        """
+        Format a timed run: runtime comes from the low overhead run, row counts from the instrumented
+        run when there is one, otherwise from the timed plan (Postgres TIMING OFF still counts rows).
+        parsed_timed is the parsed TIMING OFF plan of Postgres when there is an instrumented run as well.
+        """
+        db_type = benchmark_query.database
+        formatted_result = self._process_result(parsed, ready_query, benchmark_query)
+        instrumented_runtime = formatted_result['runtime'] if instrumented else None
+        if db_type == "Postgres" and parsed_timed is not None:
+            # Server side Execution Time of the TIMING OFF plan, without network and client overhead
+            runtime = parsed_timed["total_runtime"]
+            # Buffers of the measured run, the instrumented run afterwards finds a warmer cache
+            formatted_result['io'] = parsed_timed["io"]
+        elif db_type == "MySQL":
+            # Same unit as EXPLAIN ANALYZE results of MySQL (ms)
+            runtime = timed_runtime * 1000.0
+        else:
+            runtime = timed_runtime
+        formatted_result['mode'] = mode
+        formatted_result['runtime'] = runtime
+        formatted_result['instrumented_runtime'] = instrumented_runtime
+        formatted_result['instrumentation_overhead'] = instrumented_runtime / runtime \
+            if instrumented_runtime is not None and runtime else None
+        return formatted_result
+
+    @staticmethod
+    def _add_cardinalities(formatted_result: dict, cardinalities: Optional[dict], var_data: list):
+        """
+        Add estimated vs actual rows and cardinality q-error per plan node and per filter variable
+        """
+        if cardinalities is None:
+            return
+        formatted_result['node_cardinalities'] = cardinalities['nodes']
+        formatted_result['max_q_error'] = cardinalities['max_q_error']
+        for n, (var, entry) in enumerate(zip(var_data, cardinalities['filters']), start=1):
+            formatted_result[f'est_rows_{n}'] = entry['estimated_rows']
+            formatted_result[f'qerror_{n}'] = entry['q_error']
@@ -0,0 +1,34 @@
+import json
+import urllib.request
+from typing import List, Optional
+
+
+class HttpJobBroker:
+    """
+    Agent side client for a job broker served by the UI process over HTTP (see broker/routes.py).
+    Implements the agent facing subset of SqliteJobBroker, so agents on other hosts can pull jobs.
+    """
+    def __init__(self, url: str, timeout: float = 30):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+
+    def _post(self, path: str, body: dict) -> dict:
+        request = urllib.request.Request(
+            f"{self.url}{path}",
+            data=json.dumps(body).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return json.loads(response.read().decode("utf-8"))
+
+    def claim(self, agent_id: str, engines: List[str]) -> Optional[dict]:
+        return self._post("/broker/claim", {'agent_id': agent_id, 'engines': engines})['job']
+
+    def complete(self, job_id: int, agent_id: str, result: dict) -> bool:
+        response = self._post(f"/broker/jobs/{job_id}/complete", {'agent_id': agent_id, 'result': result})
+        return response['status'] == 'ok'
+
+    def fail(self, job_id: int, agent_id: str, error: str) -> bool:
+        response = self._post(f"/broker/jobs/{job_id}/fail", {'agent_id': agent_id, 'error': error})
+        return response['status'] == 'ok'
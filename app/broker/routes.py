@@ -0,0 +1,33 @@
+import asyncio
+
+from fastapi import APIRouter, Body
+
+from app.broker.sqlite_broker import SqliteJobBroker
+
+
+def create_broker_router(broker: SqliteJobBroker) -> APIRouter:
+    """
+    HTTP endpoints for remote executor agents, served by the UI process
+    """
+    router = APIRouter(prefix="/broker")
+
+    @router.post("/claim")
+    async def claim(body: dict = Body(...)):
+        job = await asyncio.to_thread(broker.claim, body['agent_id'], body['engines'])
+        return {'job': job}
+
+    @router.post("/jobs/{job_id}/complete")
+    async def complete(job_id: int, body: dict = Body(...)):
+        accepted = await asyncio.to_thread(broker.complete, job_id, body['agent_id'], body['result'])
+        return {'status': 'ok' if accepted else 'stale'}
+
+    @router.post("/jobs/{job_id}/fail")
+    async def fail(job_id: int, body: dict = Body(...)):
+        accepted = await asyncio.to_thread(broker.fail, job_id, body['agent_id'], body['error'])
+        return {'status': 'ok' if accepted else 'stale'}
+
+    @router.get("/queue")
+    async def queue():
+        return await asyncio.to_thread(broker.queue_depth)
+
+    return router
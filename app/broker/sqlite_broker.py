@@ -0,0 +1,191 @@
+import json
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    sweep_id TEXT NOT NULL,
+    chunk_index INTEGER NOT NULL,
+    chunk_count INTEGER NOT NULL,
+    engine TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    agent_id TEXT,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    claimed_at REAL,
+    finished_at REAL,
+    collected INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (status, engine, id);
+CREATE INDEX IF NOT EXISTS jobs_sweep ON jobs (sweep_id, chunk_index);
+"""
+
+
+class SqliteJobBroker:
+    """
+    Job queue shared between the UI process and executor agents, backed by a SQLite file.
+
+    A sweep is split into chunks, every chunk is a job. Agents claim queued jobs for the engines
+    they serve and post results back; the UI process collects a sweep once all of its chunks finished.
+    All methods are blocking, call them through asyncio.to_thread from the event loop.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL;")
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        # New autocommit connection per operation, so the broker can be used from any thread or process
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def submit_sweep(self, engine: str, benchmark_query: dict, chunks: List[List[dict]],
+                     sweep_id: Optional[str] = None, mode: str = "analyze", cache_policy: str = "as_is") -> str:
+        """
+        Queue all chunks of a sweep and return its id
+        """
+        sweep_id = sweep_id or uuid.uuid4().hex
+        now = time.time()
+        rows = []
+        for index, chunk in enumerate(chunks):
+            payload = json.dumps({
+                'benchmark_query': benchmark_query,
+                'queries': chunk,
+                'mode': mode,
+                'cache_policy': cache_policy,
+                'enqueued_at': now,
+            })
+            rows.append((sweep_id, index, len(chunks), engine, payload, now))
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT INTO jobs (sweep_id, chunk_index, chunk_count, engine, payload, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+        return sweep_id
+
+    def claim(self, agent_id: str, engines: List[str]) -> Optional[dict]:
+        """
+        Atomically take the oldest queued job for one of the given engines
+        """
+        if not engines:
+            return None
+        placeholders = ",".join("?" for _ in engines)
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    f"SELECT id, sweep_id, chunk_index, engine, payload FROM jobs "
+                    f"WHERE status = 'queued' AND engine IN ({placeholders}) ORDER BY id LIMIT 1",
+                    engines,
+                ).fetchone()
+                if row is not None:
+                    conn.execute(
+                        "UPDATE jobs SET status = 'running', agent_id = ?, claimed_at = ? WHERE id = ?",
+                        (agent_id, time.time(), row["id"]),
+                    )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        if row is None:
+            return None
+        job = json.loads(row["payload"])
+        job.update({'job_id': row["id"], 'sweep_id': row["sweep_id"], 'chunk_index': row["chunk_index"],
+                    'engine': row["engine"]})
+        return job
+
+    def complete(self, job_id: int, agent_id: str, result: dict) -> bool:
+        """
+        Store the result of a job, False when the job is no longer running on this agent
+        (it was requeued after job_timeout and possibly claimed by another agent)
+        """
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'done', result = ?, finished_at = ? "
+                "WHERE id = ? AND status = 'running' AND agent_id = ?",
+                (json.dumps(result), time.time(), job_id, agent_id),
+            )
+            return cursor.rowcount > 0
+
+    def fail(self, job_id: int, agent_id: str, error: str) -> bool:
+        """
+        Mark a job failed, False when the job is no longer running on this agent
+        """
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'failed', error = ?, finished_at = ? "
+                "WHERE id = ? AND status = 'running' AND agent_id = ?",
+                (error, time.time(), job_id, agent_id),
+            )
+            return cursor.rowcount > 0
+
+    def requeue_stale(self, timeout: float) -> int:
+        """
+        Put running jobs back into the queue when their agent did not report back in time
+        """
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'queued', agent_id = NULL, claimed_at = NULL "
+                "WHERE status = 'running' AND claimed_at < ?",
+                (time.time() - timeout,),
+            )
+            return cursor.rowcount
+
+    def collect_finished_sweeps(self) -> List[dict]:
+        """
+        Return sweeps whose chunks all finished and mark them collected.
+        Chunks are returned in order so results keep the order of the original sweep.
+        """
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                sweep_ids = [row["sweep_id"] for row in conn.execute(
+                    "SELECT sweep_id FROM jobs WHERE collected = 0 GROUP BY sweep_id "
+                    "HAVING SUM(status IN ('done', 'failed')) = MAX(chunk_count)"
+                ).fetchall()]
+                sweeps = []
+                for sweep_id in sweep_ids:
+                    rows = conn.execute(
+                        "SELECT engine, payload, status, result, error FROM jobs WHERE sweep_id = ? ORDER BY chunk_index",
+                        (sweep_id,),
+                    ).fetchall()
+                    sweeps.append({
+                        'sweep_id': sweep_id,
+                        'engine': rows[0]["engine"],
+                        'benchmark_query': json.loads(rows[0]["payload"])['benchmark_query'],
+                        'chunks': [
+                            {
+                                'status': row["status"],
+                                'result': json.loads(row["result"]) if row["result"] else None,
+                                'error': row["error"],
+                            }
+                            for row in rows
+                        ],
+                    })
+                    conn.execute("UPDATE jobs SET collected = 1 WHERE sweep_id = ?", (sweep_id,))
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return sweeps
+
+    def queue_depth(self) -> Dict[str, int]:
+        """
+        Number of queued jobs per engine
+        """
+        with self._connect() as conn:
+            rows = conn.execute("SELECT engine, COUNT(*) AS n FROM jobs WHERE status = 'queued' GROUP BY engine")
+            return {row["engine"]: row["n"] for row in rows.fetchall()}
@@ -0,0 +1,114 @@
+"""
+Headless sweep runner, executes sweep specs with the BackendService pipeline without starting the UI.
+
+Run from the repository root:
+    python -m app.cli sweep.json --out results/
+
+A spec file holds one sweep or a list of sweeps, each in BenchmarkQuery.to_dict shape plus "ranges":
+    {"name": "q5", "database": "Postgres", "benchmark": "TPC-H 1GB", "query": "... {{o_orderdate:INT}} ...",
+     "parameters": [{"name": "o_orderdate", "data_type": "INT"}],
+     "ranges": [{"name": "o_orderdate", "range": [10, 100, 5], "type": "INT"}]}
+Add "mode": "estimate" to only collect optimizer estimates with EXPLAIN instead of executing the queries,
+"timed" or "timed_analyze" to measure runtimes without EXPLAIN ANALYZE instrumentation.
+"cache_policy" is "as_is" (default), "warm" or "cold".
+"design": "lhs", "sobol", "halton" or "random" with "budget": 300 (and optionally "seed") runs at most 300
+points of a space-filling design over the ranges instead of the full "grid".
+"design": "refine" runs the grid of the ranges coarsely, then bisects intervals where plan, runtime or rows
+jump (by more than "threshold" times, default refinement.threshold) down to "min_step" (default 1).
+"index_variants": [[], ["o_totalprice"]] runs the sweep once without and once with an index on o_totalprice
+and writes a runtime comparison of the variants next to their results.
+"use_cache": true reuses points of earlier sweeps of this run from the result cache instead of executing them.
+"""
+import argparse
+import asyncio
+import json
+import os
+
+from app.backend_service import BackendService
+from app.helpers import parse_sweep_spec
+
+
+def write_sweep_results(backend_service: BackendService, sweep_id: str, out_dir: str, write_raw: bool = True):
+    """
+    Write results of a finished sweep with the same file names as the UI download
+    """
+    sweep = backend_service.sweeps[sweep_id]
+    bq = sweep.benchmark_query
+    parsed, raw = backend_service.get_sweep_results(sweep_id, include_raw=write_raw)
+    prefix = os.path.join(out_dir, f"{bq.database}_{bq.benchmark}_{bq.name}_{sweep.result_index}")
+    with open(f"{prefix}.json", "w", encoding="utf-8") as f:
+        json.dump(parsed, f)
+    if write_raw:
+        with open(f"{prefix}_raw.json", "w", encoding="utf-8") as f:
+            json.dump(raw, f)
+    return f"{prefix}.json"
+
+
+def write_variant_comparison(backend_service: BackendService, sweep_id: str, out_dir: str):
+    """
+    Write the runtime comparison of an index variant sweep
+    """
+    bq = backend_service.sweeps[sweep_id].benchmark_query
+    path = os.path.join(out_dir, f"{bq.database}_{bq.benchmark}_{bq.name}_variants.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(backend_service.get_variant_comparison(sweep_id), f, indent=2)
+    return path
+
+
+async def run_sweeps(specs: list, out_dir: str, write_raw: bool = True) -> bool:
+    backend_service = BackendService(executor_mode="local")
+    await backend_service.initialize_queue_worker()
+
+    sweep_ids = []
+    for spec in specs:
+        benchmark_query, range_values = parse_sweep_spec(spec)
+        sweep_ids.append(await backend_service.schedule_query_exectution(benchmark_query, range_values,
+                                                                         spec.get('mode', "analyze"),
+                                                                         spec.get('cache_policy', "as_is"),
+                                                                         spec.get('design', "grid"),
+                                                                         spec.get('budget'), spec.get('seed'),
+                                                                         spec.get('min_step'),
+                                                                         spec.get('threshold'),
+                                                                         spec.get('index_variants'),
+                                                                         spec.get('use_cache', False)))
+
+    os.makedirs(out_dir, exist_ok=True)
+    success = True
+    for sweep_id in sweep_ids:
+        sweep = backend_service.sweeps[sweep_id]
+        await sweep.done.wait()
+        if sweep.status != "done":
+            print(f"Sweep {sweep.benchmark_query.name} failed: {sweep.error}")
+            success = False
+            continue
+        if sweep.variants:
+            for name, variant_id in sweep.variants.items():
+                path = write_sweep_results(backend_service, variant_id, out_dir, write_raw)
+                print(f"Sweep {sweep.benchmark_query.name} variant {name} -> {path}")
+            path = write_variant_comparison(backend_service, sweep_id, out_dir)
+            print(f"Sweep {sweep.benchmark_query.name}: {sweep.completed_queries}/{sweep.query_count} queries "
+                  f"over {len(sweep.variants)} index variants -> {path}")
+            continue
+        path = write_sweep_results(backend_service, sweep_id, out_dir, write_raw)
+        print(f"Sweep {sweep.benchmark_query.name}: {sweep.completed_queries}/{sweep.query_count} queries -> {path}")
+    return success
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run query sweeps without the UI")
+    parser.add_argument("spec", help="JSON file with a sweep spec or a list of sweep specs")
+    parser.add_argument("--out", default="results", help="Directory for result files")
+    parser.add_argument("--no-raw", action="store_true", help="Do not write raw plan files")
+    args = parser.parse_args()
+
+    with open(args.spec, "r", encoding="utf-8") as f:
+        specs = json.load(f)
+    if isinstance(specs, dict):
+        specs = [specs]
+
+    success = asyncio.run(run_sweeps(specs, args.out, write_raw=not args.no_raw))
+    raise SystemExit(0 if success else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,19 @@
+import functools
 import glob
 import os
 
 from omegaconf import OmegaConf
 
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+CONFIG_DIR = os.path.join(APP_DIR, "config")
+
+
+def resolve_app_path(path: str) -> str:
+    """
+    Resolve a relative path from config against the app directory, so all processes agree on it
+    """
+    return path if os.path.isabs(path) else os.path.join(APP_DIR, path)
+
 
 def get_env_yaml_paths():
     """
@@ -15,17 +26,22 @@ def get_env_yaml_paths():
     return glob.glob(os.path.join(directory, "*.yaml"))
 
 
+@functools.lru_cache(maxsize=None)
 def load_config():
     """
     Load configs and merge into single config. The latest one has the highest priority
+    Loaded once per process, every module shares the same config object
     :return:
     """
     base_config = OmegaConf.create()
 
-    if os.path.exists("config/main/settings.yaml"):
-        base_config = OmegaConf.merge(base_config, OmegaConf.load("config/main/settings.yaml"))
-    if os.path.exists("config/local/settings.yaml"):
-        base_config = OmegaConf.merge(base_config, OmegaConf.load("config/local/settings.yaml"))
+    # Resolved relative to the app package, so entry points can be started from any directory
+    main_settings = os.path.join(CONFIG_DIR, "main", "settings.yaml")
+    local_settings = os.path.join(CONFIG_DIR, "local", "settings.yaml")
+    if os.path.exists(main_settings):
+        base_config = OmegaConf.merge(base_config, OmegaConf.load(main_settings))
+    if os.path.exists(local_settings):
+        base_config = OmegaConf.merge(base_config, OmegaConf.load(local_settings))
 
     config_paths = get_env_yaml_paths()
     for path in config_paths:
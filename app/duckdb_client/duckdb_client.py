@@ -1,4 +1,6 @@
+import asyncio
 import json
+import time
 
 import duckdb
 import os
@@ -11,36 +13,87 @@ config = load_config()
 
 class DuckDbClient:
     def __init__(self):
-        self.conn = duckdb.connect(database=config.database.duckdb.path)
+        self.db_path = config.database.duckdb.path
+        self.conn = duckdb.connect(database=self.db_path)
         self.cursor = self.conn.cursor()
+        # perf_counter_ns breakdown of the last executed statement
+        self.last_execute_ns = 0
+        self.last_fetch_ns = 0
 
-    async def execute_query(self, query: str) -> Tuple[Optional[List[tuple]], float]:
+    # DuckDB's Python API blocks, every statement runs in a worker thread so concurrent batches (one client and
+    # connection each) execute in parallel instead of one after another on the event loop
+
+    async def execute_query(self, query: str, checksum=None) -> Tuple[Optional[List[tuple]], float]:
         """
-        Execute a SQL query and return (results, execution_time)
+        Execute a SQL query and return (results, execution_time), optionally feeding checksum.update(rows)
         """
-        import time
+        return await asyncio.to_thread(self._execute_query, query, checksum)
+
+    def _execute_query(self, query: str, checksum=None) -> Tuple[Optional[List[tuple]], float]:
         try:
-            start_time = time.time()
-            result = self.cursor.execute(query).fetchall()
-            duration = time.time() - start_time
-            return result, duration
+            start_ns = time.perf_counter_ns()
+            self.cursor.execute(query)
+            executed_ns = time.perf_counter_ns()
+            result = self.cursor.fetchall()
+            end_ns = time.perf_counter_ns()
+            if checksum is not None:
+                checksum.update(result)
+            self.last_execute_ns = executed_ns - start_ns
+            self.last_fetch_ns = end_ns - executed_ns
+            return result, (end_ns - start_ns) / 1e9
         except Exception as e:
             print("Query Failed:", e)
             return None, 0
 
+    async def consume_query(self, query: str, checksum=None) -> Tuple[int, float]:
+        """
+        Execute a SQL query and stream over the result in fetchmany batches without keeping it,
+        optionally feeding every batch to checksum.update(rows). Returns (row_count, execution_time)
+        """
+        return await asyncio.to_thread(self._consume_query, query, checksum)
+
+    def _consume_query(self, query: str, checksum=None) -> Tuple[int, float]:
+        row_count = 0
+        try:
+            start_ns = time.perf_counter_ns()
+            self.cursor.execute(query)
+            executed_ns = time.perf_counter_ns()
+            while rows := self.cursor.fetchmany(config.execution.fetch_batch_size):
+                row_count += len(rows)
+                if checksum is not None:
+                    checksum.update(rows)
+            end_ns = time.perf_counter_ns()
+            self.last_execute_ns = executed_ns - start_ns
+            self.last_fetch_ns = end_ns - executed_ns
+            return row_count, (end_ns - start_ns) / 1e9
+        except Exception as e:
+            print("Query Failed:", e)
+            raise
+
     async def analyze_query(self, query: str):
         """
         Run query with profiling enabled and return the JSON profile
-        Currently I couldn't find any other way
         """
+        return await asyncio.to_thread(self._analyze_query, query)
+
+    def _analyze_query(self, query: str):
         try:
-            self.cursor.execute("SET enable_profiling = 'json';")
-            self.cursor.execute("SET profiling_output = 'out.json';")
+            # Profiles are kept per connection and read back directly, nothing is written to a shared file
+            self.cursor.execute("SET enable_profiling = 'no_output';")
 
-            self.cursor.execute(query).fetchall()
+            start_ns = time.perf_counter_ns()
+            self.cursor.execute(query)
+            executed_ns = time.perf_counter_ns()
+            self.cursor.fetchall()
+            self.last_execute_ns = executed_ns - start_ns
+            self.last_fetch_ns = time.perf_counter_ns() - executed_ns
 
-            with open("out.json", "r", encoding="utf-8") as f:
-                return f.read()
+            profile = self.cursor.get_profiling_information(format="json")
+            if "children" not in json.loads(profile):
+                # {"result": "error"} for queries answered without an operator tree
+                print("Query Analyze Failed: no profile for", query)
+                return None
+            return profile
 
         except Exception as e:
             print("Query Analyze Failed:", e)
@@ -52,6 +105,77 @@ class DuckDbClient:
             except Exception:
                 pass
 
+    async def time_query(self, query: str, checksum=None) -> Tuple[None, float]:
+        """
+        Execute the query with profiling disabled and return (None, execution_time)
+        """
+        _, execution_time = await self.consume_query(query, checksum)
+        return None, execution_time
+
+    async def explain_query(self, query: str):
+        """
+        Plan the query without executing it and return the JSON plan with cardinality estimates
+        """
+        return await asyncio.to_thread(self._explain_query, query)
+
+    def _explain_query(self, query: str):
+        try:
+            start_ns = time.perf_counter_ns()
+            self.cursor.execute(f"EXPLAIN (FORMAT JSON) {query}")
+            executed_ns = time.perf_counter_ns()
+            # One (explain_key, explain_value) row for the physical plan
+            rows = self.cursor.fetchall()
+            self.last_execute_ns = executed_ns - start_ns
+            self.last_fetch_ns = time.perf_counter_ns() - executed_ns
+            return rows[0][1]
+        except Exception as e:
+            print("Query Explain Failed:", e)
+            return None
+
+    async def reset_cache(self):
+        """
+        Evict DuckDB's buffer manager by briefly lowering memory_limit. Connections of one process share the
+        database instance and its buffers, so reconnecting does not drop them while any other connection
+        (metadata client, concurrent batches) keeps the file open. Raises when the buffers cannot be evicted,
+        e.g. because concurrent batches pin them, instead of running the query warm.
+        """
+        await asyncio.to_thread(self._reset_cache)
+
+    def _reset_cache(self):
+        memory_limit = self.cursor.execute("SELECT current_setting('memory_limit')").fetchone()[0]
+        try:
+            self.cursor.execute("SET memory_limit = '1MB'")
+        except duckdb.OutOfMemoryException as e:
+            raise RuntimeError(f"DuckDB buffers in use, cannot evict them for a cold run: {e}") from e
+        finally:
+            self.cursor.execute(f"SET memory_limit = '{memory_limit}'")
+
+    async def execute_statement(self, statement: str):
+        """
+        Execute a statement without result (DDL, ANALYZE), raises on failure
+        """
+        await asyncio.to_thread(self.cursor.execute, statement)
+
+    async def table_of_column(self, column: str) -> Optional[str]:
+        """
+        Table of the database that has the column, None if there is none
+        """
+        def table_of_column():
+            return self.cursor.execute("SELECT table_name FROM information_schema.columns "
+                                       "WHERE column_name = ? LIMIT 1", [column]).fetchone()
+        row = await asyncio.to_thread(table_of_column)
+        return row[0] if row else None
+
+    async def measure_round_trip(self) -> int:
+        """
+        Measure round trip time of a trivial query in nanoseconds, including the hop to the worker thread
+        """
+        def round_trip():
+            self.cursor.execute("SELECT 1").fetchall()
+        start_ns = time.perf_counter_ns()
+        await asyncio.to_thread(round_trip)
+        return time.perf_counter_ns() - start_ns
+
     async def set_database(self, db_path: str):
         """
         Switch to a different DuckDB file.
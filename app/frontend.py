@@ -1,13 +1,15 @@
+import asyncio
 import json
 
 from fastapi import FastAPI
 from nicegui import ui, events
 
 from app.config import load_config
-from app.backend_service import BackendService, start_db_connections, get_min_max_of_column
-from app.helpers import extract_variables
+from app.backend_service import BackendService, enabled_databases, get_min_max_of_column
+from app.helpers import extract_variables, SAMPLING_DESIGNS
+from app.loader.load_benchmark import load_benchmark
+from app.loader.tpch import ExistingTablesError
 from app.types import BenchmarkQuery
-from app.ui.analyze.analyze_page import analyze_page
 from app.ui.common.navbar import navbar
 
 config = load_config()
@@ -23,7 +25,34 @@ result_table_columns = [
     {'name': 'download', 'label': 'Download', 'field': 'download', 'required': True},
 ]
 
-result_table_rows = []
+# Result table is paginated on the server, clients only receive the visible page
+RESULT_TABLE_ROWS_PER_PAGE = 20
+# UI updates from query execution are coalesced and pushed at most once per interval
+UI_UPDATE_INTERVAL = 0.25
+SWEEP_MODE_LABELS = {
+    "analyze": "Execute (EXPLAIN ANALYZE)",
+    "estimate": "Estimates only (EXPLAIN)",
+    "timed": "Timed, no instrumentation",
+    "timed_analyze": "Timed + separate EXPLAIN ANALYZE",
+}
+CACHE_POLICY_LABELS = {
+    "as_is": "As is",
+    "warm": "Warm (pre-run every query)",
+    "cold": "Cold (reset caches before every query)",
+}
+SWEEP_DESIGN_LABELS = {
+    "grid": "Full grid",
+    "lhs": "Latin hypercube",
+    "sobol": "Sobol sequence",
+    "halton": "Halton sequence",
+    "random": "Random sampling",
+    "refine": "Refine change points",
+}
+INDEX_VARIANT_LABELS = {
+    "none": "No index variants",
+    "each": "Without + each filter column indexed",
+    "each_all": "Without + each + all filter columns indexed",
+}
 
 benchmark_query_list = []
 
@@ -35,27 +64,40 @@ query_table_columns = [
 
 query_table_rows = []
 
-batch_results = []
-total_executed_batch = 0
-
 @ui.page("/")
 async def main_page():
     navbar()
-    await backend_service.initialize_queue_worker()
+    # Pools for the queue worker and metadata connections are opened concurrently
+    _, db_clients_local = await asyncio.gather(backend_service.initialize_queue_worker(),
+                                               backend_service.get_clients())
     queries_in_queue = 0
-    db_clients_local = start_db_connections()
-
-    def result_table_update(benchmark_query: BenchmarkQuery):
-        global total_executed_batch
-        result_table.add_row(
-            {
-                'id': total_executed_batch,
-                'server': benchmark_query.database,
-                'database': benchmark_query.benchmark,
-                'query': benchmark_query.name,
-            }
-        )
-        total_executed_batch += 1
+    result_storage = backend_service.result_storage
+    rendered_version = -1
+
+    def render_result_page(pagination: dict):
+        """
+        Replace result table rows with the requested page and set the pagination with the total row count
+        """
+        rows, total = result_storage.get_summary_page(pagination.get('page', 1),
+                                                      pagination.get('rowsPerPage', RESULT_TABLE_ROWS_PER_PAGE))
+        result_table.rows = rows
+        result_table.pagination = {**pagination, 'rowsNumber': total}
+
+    def on_result_table_request(e: events.GenericEventArguments):
+        """
+        Callback for page changes on the result table
+        """
+        render_result_page(e.args['pagination'])
+
+    def flush_ui_updates():
+        """
+        Periodic push of result storage changes, skipped when nothing changed since last push
+        """
+        nonlocal rendered_version
+        if result_storage.version == rendered_version:
+            return
+        rendered_version = result_storage.version
+        render_result_page(result_table.pagination)
         queue_information.refresh(0, 0, False)
 
     def on_click_save_query():
@@ -75,6 +117,45 @@ async def main_page():
         benchmark_query_list.append(benchmark_query)
         add_query_to_table(benchmark_query.to_dict())
 
+    async def confirm_replace(message: str) -> bool:
+        """
+        Ask before a load drops existing tables
+        """
+        with ui.dialog() as dialog, ui.card():
+            ui.label(message)
+            with ui.row():
+                ui.button("Replace", on_click=lambda: dialog.submit(True)).props("color=negative")
+                ui.button("Cancel", on_click=lambda: dialog.submit(False))
+        replace = await dialog
+        dialog.delete()
+        return bool(replace)
+
+    async def on_click_load_data():
+        """
+        Build the selected benchmark's database on the selected server
+        """
+        benchmark, db_type = dropdown_bm.value, dropdown_db.value
+        ui.notify(f"Loading {benchmark} into {db_type}")
+        loaded = False
+        try:
+            try:
+                loaded = await load_benchmark(db_type, benchmark)
+            except ExistingTablesError as e:
+                if not await confirm_replace(f"{e}. Replace them?"):
+                    ui.notify(f"Loading {benchmark} cancelled")
+                    return
+                loaded = await load_benchmark(db_type, benchmark, replace=True)
+            ui.notify(f"{benchmark} loaded into {db_type}" if loaded else f"{db_type} already has {benchmark}")
+        except Exception as e:
+            # A failed load may have dropped or changed tables as well
+            loaded = True
+            print("[Loader] Error:", e)
+            ui.notify(f"Loading {benchmark} failed: {e}", type="negative")
+        finally:
+            if loaded:
+                # Cached points were measured on the data before the load
+                backend_service.clear_result_cache(f"{benchmark} loaded into {db_type}")
+
     def add_query_to_table(new_query):
         """
         Add a new query to the table
@@ -107,7 +188,27 @@ async def main_page():
                 range_values.append({'name': handle.label, 'range': range_value, 'type': 'INT'})
             query_template = query_table.selected[0]
             benchmark_query = BenchmarkQuery.from_dict(query_template)
-            await backend_service.schedule_query_exectution(benchmark_query, range_values)
+            budget, min_step = None, None
+            if design_select.value in SAMPLING_DESIGNS:
+                if budget_input.value is None or budget_input.value < 1:
+                    ui.notify("Enter a budget of at least one query", type="negative")
+                    return
+                budget = int(budget_input.value)
+            if design_select.value == "refine":
+                if min_step_input.value is None or min_step_input.value < 1:
+                    ui.notify("Enter a minimum step of at least one", type="negative")
+                    return
+                min_step = int(min_step_input.value)
+            columns = [var['name'] for var in range_values]
+            index_variants = None
+            if variant_select.value != "none":
+                index_variants = [[]] + [[column] for column in columns]
+                if variant_select.value == "each_all" and len(columns) > 1:
+                    index_variants.append(columns)
+            await backend_service.schedule_query_exectution(benchmark_query, range_values, mode_select.value,
+                                                            cache_select.value, design_select.value, budget,
+                                                            min_step=min_step, index_variants=index_variants,
+                                                            use_cache=use_cache_checkbox.value)
             print("Query added to queue")
             queries_in_queue += 1
             queue_information.refresh(0, 0, False)
@@ -129,6 +230,15 @@ async def main_page():
                         ui.label(f"Min :{min_value}, Max: {max_value}")
                         var_input = ui.input(label=var_name)
                         var_input_handles.append(var_input)
+                mode_select = ui.select(options=SWEEP_MODE_LABELS, label="Mode", value="analyze")
+                cache_select = ui.select(options=CACHE_POLICY_LABELS, label="Cache", value="as_is")
+                design_select = ui.select(options=SWEEP_DESIGN_LABELS, label="Design", value="grid")
+                budget_input = ui.number(label="Budget (queries)", value=300, min=1, precision=0) \
+                    .bind_visibility_from(design_select, 'value', backward=lambda design: design in SAMPLING_DESIGNS)
+                min_step_input = ui.number(label="Minimum step", value=1, min=1, precision=0) \
+                    .bind_visibility_from(design_select, 'value', backward=lambda design: design == "refine")
+                variant_select = ui.select(options=INDEX_VARIANT_LABELS, label="Index variants", value="none")
+                use_cache_checkbox = ui.checkbox("Reuse cached results", value=False)
                 ui.button("Start Query Execution", on_click=on_click_start_query_execution)
 
     def on_click_import_queries():
@@ -157,9 +267,9 @@ async def main_page():
         server = row["server"]
         db = row["database"]
         q = row["query"]
-        ui.download.content(json.dumps(backend_service.result_storage.parsed_result_list[id]),
+        ui.download.content(json.dumps(backend_service.result_storage.get_parsed_results(id)),
                             f"{server}_{db}_{q}_{id}.json")
-        ui.download.content(json.dumps(backend_service.result_storage.raw_result_list[id]),
+        ui.download.content(json.dumps(backend_service.result_storage.get_raw_results(id)),
                             f"{server}_{db}_{q}_{id}_raw.json")
 
     @ui.refreshable
@@ -171,7 +281,6 @@ async def main_page():
         else:
             ui.label("No queries are executing currently")
 
-    backend_service.set_table_update_callback(result_table_update)
     # UI code starts here
     with ui.row():
         with ui.column():
@@ -184,13 +293,14 @@ async def main_page():
                     with ui.row():
                         with ui.column():
                             name_input = ui.input(label="Query Name")
-                            db_list = list(db_clients_local.keys())
+                            db_list = enabled_databases()
                             ui.label("Server")
                             dropdown_db = ui.select(options=db_list, label="Server",
                                                     value=db_list[0])
-                            benchmark_list = ["TPC-H 1GB", "TPC-H 10GB", "TPC-DS 1GB", "TPC-DS 10GB"]
+                            benchmark_list = list(config.benchmarks)
                             dropdown_bm = ui.select(options=benchmark_list, label="Benchmark", value=benchmark_list[0])
                             ui.button(text="Save Query", on_click=on_click_save_query)
+                            ui.button(text="Load Data", on_click=on_click_load_data)
                         with ui.column():
                             ui.button("Delete Selected")
                             ui.button("Export Queries", on_click=on_click_import_queries)
@@ -210,7 +320,13 @@ async def main_page():
             with ui.row():
                 with ui.card():
                     ui.label("Query Execution Results")
-                    result_table = ui.table(columns=result_table_columns, rows=result_table_rows, row_key='id')
+                    result_table = ui.table(
+                        columns=result_table_columns,
+                        rows=[],
+                        row_key='id',
+                        pagination={'page': 1, 'rowsPerPage': RESULT_TABLE_ROWS_PER_PAGE, 'rowsNumber': 0},
+                    )
+                    result_table.on("request", on_result_table_request)
                     result_table.add_slot(
                         "body-cell-download",
                         """
@@ -223,9 +339,13 @@ async def main_page():
                 with ui.card():
                     queue_information()
 
+    ui.timer(UI_UPDATE_INTERVAL, flush_ui_updates)
+
 
 @ui.page("/analyze")
 async def analyze_page_route():
+    # Analysis stack (pandas, scikit-learn, matplotlib) is only imported once the page is first opened
+    from app.ui.analyze.analyze_page import analyze_page
     navbar()
     analyze_page()
 
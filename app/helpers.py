@@ -1,7 +1,14 @@
 import re
-from typing import List
+from typing import List, Optional
 import itertools
-from app.types import QueryParameter, ReadyQuery
+
+from app.types import QueryParameter, ReadyQuery, BenchmarkQuery
+
+# How parameter values of a sweep are chosen: the full cartesian "grid" of all ranges, a fixed budget of
+# points from a space-filling design over it ("lhs" Latin hypercube, "sobol" and "halton" low-discrepancy
+# sequences, "random" uniform sampling), or "refine": the grid as coarse start, bisected where results jump
+SAMPLING_DESIGNS = ("lhs", "sobol", "halton", "random")
+SWEEP_DESIGNS = ("grid", *SAMPLING_DESIGNS, "refine")
 
 
 def extract_variables(query: str) -> List[QueryParameter]:
@@ -39,16 +46,30 @@ def build_single_query(template: str, variables: list) -> str:
     return re.sub(pattern, replace_placeholder, template)
 
 
-def build_all_queries(template: str, variable_ranges: list) -> list[ReadyQuery]:
-    variable_names = [var['name'] for var in variable_ranges]
-    variable_types = {var['name']: var['type'] for var in variable_ranges}
-
+def build_all_queries(template: str, variable_ranges: list, design: str = "grid", budget: Optional[int] = None,
+                      seed: Optional[int] = None) -> list[ReadyQuery]:
+    """
+    Queries of a sweep over the variable ranges. The grid design runs every combination (also the first
+    round of "refine"), SAMPLING_DESIGNS run at most budget distinct combinations of values on the same ranges.
+    """
     # Generate ranges
     value_lists = [range(start, end + 1, step) for var in variable_ranges
                    for (start, end, step) in [var['range']]]
 
-    # Cartesian product of all variable values
-    combinations = itertools.product(*value_lists)
+    if design in ("grid", "refine"):
+        # Cartesian product of all variable values
+        combinations = itertools.product(*value_lists)
+    else:
+        combinations = sample_design(value_lists, design, budget, seed)
+    return build_ready_queries(template, variable_ranges, combinations)
+
+
+def build_ready_queries(template: str, variable_ranges: list, combinations) -> list[ReadyQuery]:
+    """
+    One query per combination of values, in the order of variable_ranges
+    """
+    variable_names = [var['name'] for var in variable_ranges]
+    variable_types = {var['name']: var['type'] for var in variable_ranges}
 
     all_queries: List[ReadyQuery] = []
     for combo in combinations:
@@ -62,3 +83,63 @@ def build_all_queries(template: str, variable_ranges: list) -> list[ReadyQuery]:
         all_queries.append(ready_query)
 
     return all_queries
+
+
+def sample_design(value_lists: List[range], design: str, budget: Optional[int], seed: Optional[int] = None) -> list:
+    """
+    Up to budget distinct value combinations of a space-filling design. Every range splits the unit interval
+    into equal bins, one per value, and a point takes the value of the bin it falls in, so steps stay the
+    resolution of the sweep
+    """
+    # Imported on first use, every UI and CLI start imports this module
+    import numpy as np
+    from scipy.stats import qmc
+
+    if design not in SAMPLING_DESIGNS:
+        raise ValueError(f"Unknown sampling design: {design}")
+    if not budget or budget < 1:
+        raise ValueError(f"Sweep design {design} needs a budget")
+    dimensions = len(value_lists)
+    if dimensions == 0:
+        return [()]
+    if design == "lhs":
+        points = qmc.LatinHypercube(d=dimensions, seed=seed).random(budget)
+    elif design == "sobol":
+        # Sobol points are balanced in powers of two, the first budget points of the next one are used
+        points = qmc.Sobol(d=dimensions, seed=seed).random_base2(int(np.ceil(np.log2(budget))))[:budget]
+    elif design == "halton":
+        points = qmc.Halton(d=dimensions, seed=seed).random(budget)
+    else:
+        points = np.random.default_rng(seed).random((budget, dimensions))
+
+    sizes = np.array([len(values) for values in value_lists])
+    indices = np.minimum((points * sizes).astype(np.int64), sizes - 1)
+    combinations = []
+    seen = set()
+    for row in indices:
+        combo = tuple(values[i] for values, i in zip(value_lists, row))
+        if combo not in seen:
+            seen.add(combo)
+            combinations.append(combo)
+    return combinations
+
+
+def parse_sweep_spec(spec: dict) -> tuple[BenchmarkQuery, list]:
+    """
+    Parse a sweep spec: BenchmarkQuery.to_dict fields plus "ranges", a list of
+    {"name": ..., "range": [start, end, step] or "start,end,step", "type": "INT"}
+    A single value range runs the parameter with a fixed value like on the UI
+    """
+    benchmark_query = BenchmarkQuery.from_dict(spec)
+    range_values = []
+    for var in spec['ranges']:
+        var_range = var['range']
+        if isinstance(var_range, str):
+            var_range = [x.strip() for x in var_range.split(",")]
+        elif not isinstance(var_range, (list, tuple)):
+            var_range = [var_range]
+        var_range = tuple(int(x) for x in var_range)
+        if len(var_range) == 1:
+            var_range = (var_range[0], var_range[0], 1)
+        range_values.append({'name': var['name'], 'range': var_range, 'type': var.get('type', 'INT')})
+    return benchmark_query, range_values
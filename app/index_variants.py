@@ -0,0 +1,85 @@
+"""
+Index variants of a sweep: the same sweep run once per set of indexes on its filter columns.
+
+A variant is a list of filter columns, the empty list is the baseline without extra indexes. Columns of
+one table share a composite index in the given order. Before the variant's sweep its indexes are created
+and statistics refreshed, afterwards they are dropped again, so variants run one after another.
+"""
+from statistics import median
+from typing import Dict, List, Tuple
+
+from app.refinement import sweep_point
+
+BASELINE = "none"
+
+
+def variant_name(columns: List[str]) -> str:
+    return f"idx({', '.join(columns)})" if columns else BASELINE
+
+
+def variant_indexes(columns: List[str], tables: Dict[str, str]) -> List[Tuple[str, str, List[str]]]:
+    """
+    (index name, table, columns) of a variant, tables maps every column to its table
+    """
+    by_table: Dict[str, List[str]] = {}
+    for column in columns:
+        if tables.get(column) is None:
+            raise ValueError(f"No table has column {column}")
+        by_table.setdefault(tables[column], []).append(column)
+    return [(f"qe_variant_{table}_{'_'.join(table_columns)}", table, table_columns)
+            for table, table_columns in by_table.items()]
+
+
+def create_statements(db_type: str, indexes: List[Tuple[str, str, List[str]]]) -> List[str]:
+    """
+    CREATE INDEX statements of a variant followed by the statistics refresh of its tables
+    """
+    statements = [f"CREATE INDEX {name} ON {table} ({', '.join(columns)})" for name, table, columns in indexes]
+    tables = list(dict.fromkeys(table for _, table, _ in indexes))
+    if db_type == "MySQL":
+        statements += [f"ANALYZE TABLE {table}" for table in tables]
+    elif db_type == "Postgres":
+        statements += [f"ANALYZE {table}" for table in tables]
+    elif indexes:
+        statements.append("ANALYZE")
+    return statements
+
+
+def drop_statements(db_type: str, indexes: List[Tuple[str, str, List[str]]]) -> List[str]:
+    if db_type == "MySQL":
+        return [f"DROP INDEX {name} ON {table}" for name, table, _ in indexes]
+    return [f"DROP INDEX IF EXISTS {name}" for name, _, _ in indexes]
+
+
+def compare_variants(results: Dict[str, List[dict]], names: List[str]) -> List[dict]:
+    """
+    Runtime curves of the variants against the baseline (the first variant when there is no "none"),
+    over the sweep points both have. speedup is baseline runtime / variant runtime.
+    """
+    if not results:
+        return []
+    baseline_name = BASELINE if BASELINE in results else next(iter(results))
+    baseline = {sweep_point(r, names): r for r in results[baseline_name]}
+    comparison = []
+    for name, variant_results in results.items():
+        speedups = []
+        plan_changes = 0
+        for formatted_result in variant_results:
+            base = baseline.get(sweep_point(formatted_result, names))
+            if base is None or not formatted_result.get('runtime') or base.get('runtime') in ("", None):
+                continue
+            speedups.append(float(base['runtime']) / float(formatted_result['runtime']))
+            plan_changes += formatted_result.get('plan_fingerprint') != base.get('plan_fingerprint')
+        comparison.append({
+            'variant': name,
+            'baseline': baseline_name,
+            'points': len(speedups),
+            'median_speedup': median(speedups) if speedups else None,
+            'min_speedup': min(speedups, default=None),
+            'max_speedup': max(speedups, default=None),
+            # Points where the variant is at least 10% faster or slower than the baseline
+            'faster_points': sum(s >= 1.1 for s in speedups),
+            'slower_points': sum(s <= 1 / 1.1 for s in speedups),
+            'plan_changes': plan_changes,
+        })
+    return comparison
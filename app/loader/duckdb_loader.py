@@ -0,0 +1,56 @@
+"""
+TPC-H loader for DuckDB
+"""
+import time
+from typing import Optional
+
+import duckdb
+
+from app.loader.tpch import TABLES, COLUMNS, LOAD_MARKER, check_existing, create_table_statement, \
+    drop_table_statements, has_tbl_files, has_trailing_delimiter, marker_statements, tbl_path
+
+
+def load_duckdb(db_path: str, data_dir: Optional[str], scale_factor: float, threads: int = 4,
+                replace: bool = False) -> bool:
+    """
+    Load TPC-H into a DuckDB file. Table files are read with DuckDB's parallel CSV reader using
+    threads threads, without table files the data is generated in place with the tpch extension.
+    No keys are created, DuckDB does not use them for these queries and they slow the load down.
+    Returns False when this scale factor is loaded already, see tpch.check_existing for replace.
+    """
+    start = time.perf_counter()
+    con = duckdb.connect(db_path)
+    try:
+        con.execute(f"SET threads = {threads}")
+        existing = {row[0] for row in con.execute("SHOW TABLES").fetchall()}
+        loaded_scale_factor = None
+        if LOAD_MARKER in existing:
+            row = con.execute(f"SELECT scale_factor FROM {LOAD_MARKER}").fetchone()
+            loaded_scale_factor = row[0] if row else None
+        if check_existing("DuckDB", existing, loaded_scale_factor, scale_factor, replace):
+            print(f"[Loader] {db_path} already has TPC-H sf={scale_factor:g}, skipping")
+            return False
+        for statement in drop_table_statements():
+            con.execute(statement)
+        if data_dir is None or not has_tbl_files(data_dir):
+            con.execute("INSTALL tpch")
+            con.execute("LOAD tpch")
+            con.execute(f"CALL dbgen(sf={scale_factor})")
+        else:
+            for table in TABLES:
+                con.execute(create_table_statement(table))
+                path = tbl_path(data_dir, table)
+                columns = [f"'{name}': '{data_type}'" for name, data_type in COLUMNS[table]]
+                if has_trailing_delimiter(path):
+                    # Rows of dbgen files end with "|", read as an extra column that is not inserted
+                    columns.append("'trailing': 'VARCHAR'")
+                con.execute(f"INSERT INTO {table} SELECT {', '.join(name for name, _ in COLUMNS[table])} "
+                            f"FROM read_csv('{path}', delim='|', header=false, columns={{{', '.join(columns)}}})")
+                print(f"[Loader] DuckDB {table} loaded")
+        for statement in marker_statements(scale_factor):
+            con.execute(statement)
+        con.execute("CHECKPOINT")
+    finally:
+        con.close()
+    print(f"[Loader] DuckDB TPC-H loaded into {db_path} in {time.perf_counter() - start:.1f} s")
+    return True
@@ -0,0 +1,71 @@
+"""
+Build the database of a benchmark entry (config "benchmarks", the benchmark dropdown of the UI) on an engine.
+
+Run from the repository root:
+    python -m app.loader.load_benchmark Postgres "TPC-H 10GB"
+
+Table files are taken from the entry's data_dir and generated there with DuckDB's tpch extension when
+they are missing. Engines load into the database configured under "database". A database that holds another
+scale factor or TPC-H tables of no finished load is only replaced with --replace.
+"""
+import argparse
+import asyncio
+import time
+
+from app.config import load_config, resolve_app_path
+from app.loader.duckdb_loader import load_duckdb
+from app.loader.mysql_loader import load_mysql
+from app.loader.postgres_loader import load_postgres
+from app.loader.tpch import ExistingTablesError, generate_tbl_files, has_tbl_files
+
+config = load_config()
+
+
+async def load_benchmark(db_type: str, benchmark: str, replace: bool = False) -> bool:
+    """
+    Load the benchmark's data into the engine, blocking steps run in a worker thread. Returns False when
+    the benchmark is loaded already, raises tpch.ExistingTablesError when other tables would be replaced.
+    """
+    if benchmark not in config.benchmarks:
+        raise ValueError(f"Unknown benchmark: {benchmark}")
+    entry = config.benchmarks[benchmark]
+    if entry.kind != "tpch":
+        raise ValueError(f"No loader for {entry.kind} benchmarks")
+    data_dir = resolve_app_path(entry.data_dir)
+    start = time.perf_counter()
+
+    if db_type == "DuckDB":
+        # Without table files DuckDB generates the data in place, no files needed
+        return await asyncio.to_thread(load_duckdb, config.database.duckdb.path,
+                                       data_dir if has_tbl_files(data_dir) else None, entry.scale_factor,
+                                       config.loader.connections, replace)
+    if not has_tbl_files(data_dir):
+        await asyncio.to_thread(generate_tbl_files, data_dir, entry.scale_factor)
+        print(f"[Loader] Table files generated in {time.perf_counter() - start:.1f} s")
+    if db_type == "Postgres":
+        return await load_postgres(data_dir, entry.scale_factor, config.loader.connections, config.loader.chunk_mb,
+                                   replace)
+    if db_type == "MySQL":
+        return await load_mysql(data_dir, entry.scale_factor, config.loader.connections, replace)
+    raise ValueError(f"Unknown database type: {db_type}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("engine", choices=["MySQL", "Postgres", "DuckDB"])
+    parser.add_argument("benchmark", help="Entry of the benchmarks config section")
+    parser.add_argument("--connections", type=int, default=config.loader.connections,
+                        help="Parallel connections (DuckDB: threads)")
+    parser.add_argument("--replace", action="store_true",
+                        help="Drop existing TPC-H tables of another scale factor or of a failed load")
+    args = parser.parse_args()
+    config.loader.connections = args.connections
+    try:
+        asyncio.run(load_benchmark(args.engine, args.benchmark, args.replace))
+    except ExistingTablesError as e:
+        print("[Loader] Error:", e)
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
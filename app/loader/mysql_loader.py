@@ -0,0 +1,86 @@
+"""
+TPC-H loader for MySQL
+"""
+import asyncio
+import time
+
+import aiomysql
+
+from app.config import load_config
+from app.loader.tpch import TABLES, PRIMARY_KEYS, INDEXES, LOAD_MARKER, check_existing, create_table_statement, \
+    drop_table_statements, index_name, marker_statements, tbl_path
+
+config = load_config()
+
+
+async def _connect():
+    # LOAD DATA LOCAL streams the file from this host, the server needs local_infile=ON
+    return await aiomysql.connect(
+        host=config.database.mysql.host,
+        user=config.database.mysql.user,
+        password=config.database.mysql.password,
+        db=config.database.mysql.db,
+        autocommit=True,
+        local_infile=True,
+    )
+
+
+async def _load_table(table: str, path: str, semaphore: asyncio.Semaphore):
+    async with semaphore:
+        conn = await _connect()
+        try:
+            async with conn.cursor() as cur:
+                await cur.execute("SET unique_checks = 0, foreign_key_checks = 0")
+                # The "|" at line ends of dbgen files is an extra field MySQL drops with a warning
+                await cur.execute(f"LOAD DATA LOCAL INFILE '{path}' INTO TABLE {table} "
+                                  "FIELDS TERMINATED BY '|' OPTIONALLY ENCLOSED BY '\"' LINES TERMINATED BY '\\n'")
+                # Keys and indexes in one ALTER, the table is rebuilt once
+                clauses = [f"ADD PRIMARY KEY ({', '.join(PRIMARY_KEYS[table])})"]
+                clauses += [f"ADD INDEX {index_name(table, columns)} ({', '.join(columns)})"
+                            for columns in INDEXES.get(table, [])]
+                await cur.execute(f"ALTER TABLE {table} {', '.join(clauses)}")
+                await cur.execute(f"ANALYZE TABLE {table}")
+            print(f"[Loader] MySQL {table} loaded")
+        finally:
+            conn.close()
+
+
+async def load_mysql(data_dir: str, scale_factor: float, connections: int = 4, replace: bool = False) -> bool:
+    """
+    Load TPC-H table files with LOAD DATA, one table per connection and up to connections tables at once.
+    Tables are created without keys, keys and indexes are added after each table's load.
+    Returns False when this scale factor is loaded already, see tpch.check_existing for replace.
+    """
+    start = time.perf_counter()
+    conn = await _connect()
+    try:
+        async with conn.cursor() as cur:
+            await cur.execute("SHOW TABLES")
+            existing = {row[0] for row in await cur.fetchall()}
+            loaded_scale_factor = None
+            if LOAD_MARKER in existing:
+                await cur.execute(f"SELECT scale_factor FROM {LOAD_MARKER}")
+                row = await cur.fetchone()
+                loaded_scale_factor = row[0] if row else None
+            if check_existing("MySQL", existing, loaded_scale_factor, scale_factor, replace):
+                print(f"[Loader] MySQL already has TPC-H sf={scale_factor:g}, skipping")
+                return False
+            for statement in drop_table_statements():
+                await cur.execute(statement)
+            for table in TABLES:
+                await cur.execute(create_table_statement(table))
+    finally:
+        conn.close()
+
+    semaphore = asyncio.Semaphore(connections)
+    # Largest tables first, they set the total load time
+    await asyncio.gather(*(_load_table(table, tbl_path(data_dir, table), semaphore) for table in reversed(TABLES)))
+    conn = await _connect()
+    try:
+        async with conn.cursor() as cur:
+            for statement in marker_statements(scale_factor):
+                await cur.execute(statement)
+    finally:
+        conn.close()
+    print(f"[Loader] MySQL TPC-H loaded in {time.perf_counter() - start:.1f} s")
+    return True
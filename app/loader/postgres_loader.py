@@ -0,0 +1,77 @@
+"""
+TPC-H loader for Postgres
+"""
+import asyncio
+import os
+import time
+
+from psycopg import AsyncConnection
+
+from app.loader.tpch import TABLES, PRIMARY_KEYS, INDEXES, LOAD_MARKER, check_existing, create_table_statement, \
+    drop_table_statements, has_trailing_delimiter, index_name, marker_statements, read_range, split_file, tbl_path
+from app.postgres_client.create_pool import postgres_conninfo
+
+
+async def _execute(statement: str):
+    async with await AsyncConnection.connect(postgres_conninfo(), autocommit=True) as conn:
+        await conn.execute(statement)
+
+
+async def _copy_range(table: str, path: str, start: int, end: int, strip_trailing: bool,
+                      semaphore: asyncio.Semaphore):
+    async with semaphore:
+        async with await AsyncConnection.connect(postgres_conninfo(), autocommit=True) as conn:
+            async with conn.cursor() as cur:
+                async with cur.copy(f"COPY {table} FROM STDIN (FORMAT csv, DELIMITER '|')") as copy:
+                    for block in read_range(path, start, end, strip_trailing):
+                        await copy.write(block)
+
+
+async def _add_keys(table: str, semaphore: asyncio.Semaphore):
+    async with semaphore:
+        await _execute(f"ALTER TABLE {table} ADD PRIMARY KEY ({', '.join(PRIMARY_KEYS[table])})")
+        for columns in INDEXES.get(table, []):
+            await _execute(f"CREATE INDEX {index_name(table, columns)} ON {table} ({', '.join(columns)})")
+        await _execute(f"ANALYZE {table}")
+
+
+async def load_postgres(data_dir: str, scale_factor: float, connections: int = 4, chunk_mb: int = 256,
+                        replace: bool = False) -> bool:
+    """
+    Load TPC-H table files with COPY over several connections. Tables are split into chunks of about
+    chunk_mb that are copied in parallel, keys and indexes are created once all rows are in.
+    Returns False when this scale factor is loaded already, see tpch.check_existing for replace.
+    """
+    start = time.perf_counter()
+    semaphore = asyncio.Semaphore(connections)
+    async with await AsyncConnection.connect(postgres_conninfo(), autocommit=True) as conn:
+        cur = await conn.execute("SELECT tablename FROM pg_tables WHERE schemaname = current_schema()")
+        existing = {row[0] for row in await cur.fetchall()}
+        loaded_scale_factor = None
+        if LOAD_MARKER in existing:
+            cur = await conn.execute(f"SELECT scale_factor FROM {LOAD_MARKER}")
+            row = await cur.fetchone()
+            loaded_scale_factor = row[0] if row else None
+        if check_existing("Postgres", existing, loaded_scale_factor, scale_factor, replace):
+            print(f"[Loader] Postgres already has TPC-H sf={scale_factor:g}, skipping")
+            return False
+        for statement in drop_table_statements():
+            await conn.execute(statement)
+        for table in TABLES:
+            await conn.execute(create_table_statement(table))
+
+    copies = []
+    for table in TABLES:
+        path = tbl_path(data_dir, table)
+        strip_trailing = has_trailing_delimiter(path)
+        # Chunks of all tables share the connections, lineitem does not end up on a single one
+        ranges = split_file(path, max(1, -(-os.path.getsize(path) // (chunk_mb << 20))))
+        copies += [_copy_range(table, path, range_start, range_end, strip_trailing, semaphore)
+                   for range_start, range_end in ranges]
+    await asyncio.gather(*copies)
+    print(f"[Loader] Postgres rows copied in {time.perf_counter() - start:.1f} s")
+    await asyncio.gather(*(_add_keys(table, semaphore) for table in TABLES))
+    for statement in marker_statements(scale_factor):
+        await _execute(statement)
+    print(f"[Loader] Postgres TPC-H loaded in {time.perf_counter() - start:.1f} s")
+    return True
@@ -0,0 +1,176 @@
+"""
+TPC-H schema, keys and local data generation shared by the engine loaders
+"""
+import os
+from typing import Dict, List, Optional, Set, Tuple
+
+import duckdb
+
+# Loading order, small tables first so they are done while lineitem is still loading
+TABLES = ["region", "nation", "supplier", "customer", "part", "partsupp", "orders", "lineitem"]
+
+# Column definitions in types all three engines understand
+COLUMNS: Dict[str, List[Tuple[str, str]]] = {
+    "region": [("r_regionkey", "INTEGER"), ("r_name", "CHAR(25)"), ("r_comment", "VARCHAR(152)")],
+    "nation": [("n_nationkey", "INTEGER"), ("n_name", "CHAR(25)"), ("n_regionkey", "INTEGER"),
+               ("n_comment", "VARCHAR(152)")],
+    "supplier": [("s_suppkey", "INTEGER"), ("s_name", "CHAR(25)"), ("s_address", "VARCHAR(40)"),
+                 ("s_nationkey", "INTEGER"), ("s_phone", "CHAR(15)"), ("s_acctbal", "DECIMAL(15,2)"),
+                 ("s_comment", "VARCHAR(101)")],
+    "customer": [("c_custkey", "INTEGER"), ("c_name", "VARCHAR(25)"), ("c_address", "VARCHAR(40)"),
+                 ("c_nationkey", "INTEGER"), ("c_phone", "CHAR(15)"), ("c_acctbal", "DECIMAL(15,2)"),
+                 ("c_mktsegment", "CHAR(10)"), ("c_comment", "VARCHAR(117)")],
+    "part": [("p_partkey", "INTEGER"), ("p_name", "VARCHAR(55)"), ("p_mfgr", "CHAR(25)"), ("p_brand", "CHAR(10)"),
+             ("p_type", "VARCHAR(25)"), ("p_size", "INTEGER"), ("p_container", "CHAR(10)"),
+             ("p_retailprice", "DECIMAL(15,2)"), ("p_comment", "VARCHAR(23)")],
+    "partsupp": [("ps_partkey", "INTEGER"), ("ps_suppkey", "INTEGER"), ("ps_availqty", "INTEGER"),
+                 ("ps_supplycost", "DECIMAL(15,2)"), ("ps_comment", "VARCHAR(199)")],
+    "orders": [("o_orderkey", "INTEGER"), ("o_custkey", "INTEGER"), ("o_orderstatus", "CHAR(1)"),
+               ("o_totalprice", "DECIMAL(15,2)"), ("o_orderdate", "DATE"), ("o_orderpriority", "CHAR(15)"),
+               ("o_clerk", "CHAR(15)"), ("o_shippriority", "INTEGER"), ("o_comment", "VARCHAR(79)")],
+    "lineitem": [("l_orderkey", "INTEGER"), ("l_partkey", "INTEGER"), ("l_suppkey", "INTEGER"),
+                 ("l_linenumber", "INTEGER"), ("l_quantity", "DECIMAL(15,2)"), ("l_extendedprice", "DECIMAL(15,2)"),
+                 ("l_discount", "DECIMAL(15,2)"), ("l_tax", "DECIMAL(15,2)"), ("l_returnflag", "CHAR(1)"),
+                 ("l_linestatus", "CHAR(1)"), ("l_shipdate", "DATE"), ("l_commitdate", "DATE"),
+                 ("l_receiptdate", "DATE"), ("l_shipinstruct", "CHAR(25)"), ("l_shipmode", "CHAR(10)"),
+                 ("l_comment", "VARCHAR(44)")],
+}
+
+PRIMARY_KEYS = {
+    "region": ["r_regionkey"],
+    "nation": ["n_nationkey"],
+    "supplier": ["s_suppkey"],
+    "customer": ["c_custkey"],
+    "part": ["p_partkey"],
+    "partsupp": ["ps_partkey", "ps_suppkey"],
+    "orders": ["o_orderkey"],
+    "lineitem": ["l_orderkey", "l_linenumber"],
+}
+
+# Secondary indexes on the foreign key columns, created after the load like the primary keys
+INDEXES = {
+    "nation": [["n_regionkey"]],
+    "supplier": [["s_nationkey"]],
+    "customer": [["c_nationkey"]],
+    "partsupp": [["ps_suppkey"]],
+    "orders": [["o_custkey"]],
+    "lineitem": [["l_partkey", "l_suppkey"]],
+}
+
+
+# Table created as the last step of a load with the loaded scale factor,
+# TPC-H tables without it are left over from a failed load or were not created by the loader
+LOAD_MARKER = "qe_tpch_loaded"
+
+
+class ExistingTablesError(RuntimeError):
+    """
+    The database has tables a load would drop, load again with replace to drop them
+    """
+
+
+def create_table_statement(table: str) -> str:
+    columns = ", ".join(f"{name} {data_type}" for name, data_type in COLUMNS[table])
+    return f"CREATE TABLE {table} ({columns})"
+
+
+def drop_table_statements() -> List[str]:
+    """
+    Drop statements for the TPC-H tables and the load marker
+    """
+    return [f"DROP TABLE IF EXISTS {table}" for table in [LOAD_MARKER, *reversed(TABLES)]]
+
+
+def marker_statements(scale_factor: float) -> List[str]:
+    return [f"CREATE TABLE {LOAD_MARKER} (scale_factor DOUBLE PRECISION)",
+            f"INSERT INTO {LOAD_MARKER} VALUES ({float(scale_factor)})"]
+
+
+def check_existing(engine: str, existing_tables: Set[str], loaded_scale_factor: Optional[float],
+                   scale_factor: float, replace: bool) -> bool:
+    """
+    True when the database already holds a finished load of scale_factor. Raises ExistingTablesError when
+    TPC-H tables of another scale factor or of no finished load exist and replace is not set.
+    """
+    if loaded_scale_factor is not None and float(loaded_scale_factor) == float(scale_factor):
+        return True
+    found = sorted(existing_tables & {*TABLES, LOAD_MARKER})
+    if found and not replace:
+        if loaded_scale_factor is not None:
+            reason = f"TPC-H sf={loaded_scale_factor:g} loaded"
+        else:
+            reason = f"tables {', '.join(found)} that no finished load created"
+        raise ExistingTablesError(f"{engine} has {reason}, replace drops them and loads sf={scale_factor:g}")
+    return False
+
+
+def index_name(table: str, columns: List[str]) -> str:
+    return f"idx_{table}_{'_'.join(columns)}"
+
+
+def tbl_path(data_dir: str, table: str) -> str:
+    return os.path.join(data_dir, f"{table}.tbl")
+
+
+def has_tbl_files(data_dir: str) -> bool:
+    return all(os.path.exists(tbl_path(data_dir, table)) for table in TABLES)
+
+
+def has_trailing_delimiter(path: str) -> bool:
+    """
+    Whether rows end with "|" like the output of the reference dbgen tool
+    """
+    with open(path, "rb") as f:
+        return f.readline().rstrip(b"\r\n").endswith(b"|")
+
+
+def generate_tbl_files(data_dir: str, scale_factor: float):
+    """
+    Generate "|" separated table files with DuckDB's tpch extension, no dbgen build needed
+    """
+    os.makedirs(data_dir, exist_ok=True)
+    # Generated into a scratch database file, large scale factors do not fit into memory
+    scratch_path = os.path.join(data_dir, "dbgen.duckdb")
+    print(f"[Loader] Generating TPC-H sf={scale_factor} into {data_dir}")
+    con = duckdb.connect(scratch_path)
+    try:
+        con.execute("INSTALL tpch")
+        con.execute("LOAD tpch")
+        con.execute(f"CALL dbgen(sf={scale_factor})")
+        for table in TABLES:
+            con.execute(f"COPY {table} TO '{tbl_path(data_dir, table)}' (FORMAT csv, DELIMITER '|', HEADER false)")
+    finally:
+        con.close()
+        os.remove(scratch_path)
+
+
+def split_file(path: str, parts: int) -> List[Tuple[int, int]]:
+    """
+    Byte ranges of about equal size covering the file, every range starts at the beginning of a line
+    """
+    size = os.path.getsize(path)
+    offsets = [0]
+    with open(path, "rb") as f:
+        for n in range(1, parts):
+            f.seek(max(offsets[-1], size * n // parts))
+            f.readline()
+            if f.tell() >= size:
+                break
+            offsets.append(f.tell())
+    offsets.append(size)
+    return [(start, end) for start, end in zip(offsets, offsets[1:]) if end > start]
+
+
+def read_range(path: str, start: int, end: int, strip_trailing: bool = False, block_size: int = 1 << 22):
+    """
+    Yield the lines between two offsets of split_file in blocks of whole lines, without the trailing "|"
+    """
+    with open(path, "rb") as f:
+        f.seek(start)
+        while f.tell() < end:
+            block = f.read(min(block_size, end - f.tell()))
+            if f.tell() < end and not block.endswith(b"\n"):
+                block += f.readline()
+            if strip_trailing:
+                block = block.replace(b"|\n", b"\n")
+            yield block
@@ -1,9 +1,25 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 
 import frontend
+from app.api import create_api_router
+from app.broker.routes import create_broker_router
+from app.metrics import metrics_registry, CONTENT_TYPE
 
 app = FastAPI()
 
+
+@app.get("/metrics")
+async def metrics():
+    """
+    Prometheus scrape endpoint
+    """
+    return Response(content=await metrics_registry.render(), media_type=CONTENT_TYPE)
+
+
+app.include_router(create_api_router(frontend.backend_service))
+if frontend.backend_service.broker is not None:
+    app.include_router(create_broker_router(frontend.backend_service.broker))
+
 frontend.init(app)
 
 if __name__ == "__main__":
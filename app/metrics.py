@@ -0,0 +1,244 @@
+"""
+Minimal Prometheus style metrics for the executor.
+
+Metrics are plain in-process counters updated from the event loop, rendered
+in the Prometheus text exposition format on scrape. Values that are cheap to
+read directly (queue sizes, pool stats) are collected only at scrape time.
+"""
+import bisect
+import inspect
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _format_labels(label_names: Tuple[str, ...], label_values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(label_names, label_values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    metric_type = ""
+
+    def __init__(self, name: str, documentation: str, label_names: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.metric_type}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    metric_type = "counter"
+
+    def __init__(self, name: str, documentation: str, label_names: Tuple[str, ...] = ()):
+        super().__init__(name, documentation, label_names)
+        self.values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def _samples(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.label_names, key)} {value}" for key, value in self.values.items()]
+
+
+class Gauge(_Metric):
+    metric_type = "gauge"
+
+    def __init__(self, name: str, documentation: str, label_names: Tuple[str, ...] = ()):
+        super().__init__(name, documentation, label_names)
+        self.values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels):
+        self.values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def _samples(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.label_names, key)} {value}" for key, value in self.values.items()]
+
+
+class Histogram(_Metric):
+    metric_type = "histogram"
+
+    def __init__(self, name: str, documentation: str, label_names: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_LATENCY_BUCKETS):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets))
+        # label key -> [bucket counts..., +Inf count], sum
+        self.counts: Dict[Tuple[str, ...], List[int]] = {}
+        self.sums: Dict[Tuple[str, ...], float] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        counts = self.counts.get(key)
+        if counts is None:
+            counts = self.counts[key] = [0] * (len(self.buckets) + 1)
+            self.sums[key] = 0.0
+        # Counts are stored per bucket and accumulated on render
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sums[key] += value
+
+    def _samples(self) -> List[str]:
+        lines = []
+        for key, counts in self.counts.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                bucket_labels = _format_labels(self.label_names, key, 'le="%s"' % bound)
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            cumulative += counts[-1]
+            bucket_labels = _format_labels(self.label_names, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.label_names, key)} {self.sums[key]}")
+            lines.append(f"{self.name}_count{_format_labels(self.label_names, key)} {cumulative}")
+        return lines
+
+
+class RateMeter:
+    """
+    Events per second over a sliding time window, counted in one second buckets
+    """
+    def __init__(self, window_seconds: float = 10.0):
+        self.window_seconds = window_seconds
+        # key -> [second, count] buckets, oldest first, at most one per second of the window
+        self.events: Dict[str, deque] = {}
+
+    def _trim(self, buckets: deque, now: float):
+        cutoff = int(now - self.window_seconds)
+        while buckets and buckets[0][0] <= cutoff:
+            buckets.popleft()
+
+    def mark(self, key: str):
+        now = time.monotonic()
+        second = int(now)
+        buckets = self.events.setdefault(key, deque())
+        if buckets and buckets[-1][0] == second:
+            buckets[-1][1] += 1
+            return
+        buckets.append([second, 1])
+        self._trim(buckets, now)
+
+    def rate(self, key: str) -> float:
+        buckets = self.events.get(key)
+        if not buckets:
+            return 0.0
+        self._trim(buckets, time.monotonic())
+        return sum(count for _, count in buckets) / self.window_seconds
+
+    def keys(self):
+        return list(self.events.keys())
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics: List[_Metric] = []
+        self.collectors: List[Callable[[], Any]] = []
+
+    def counter(self, name: str, documentation: str, label_names: Tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, documentation, label_names))
+
+    def gauge(self, name: str, documentation: str, label_names: Tuple[str, ...] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, label_names))
+
+    def histogram(self, name: str, documentation: str, label_names: Tuple[str, ...] = (),
+                  buckets: Tuple[float, ...] = DEFAULT_LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, label_names, buckets))
+
+    def register_collector(self, collector: Callable[[], Any]):
+        """
+        Register a callable that refreshes gauges right before each scrape, coroutine functions are awaited
+        """
+        self.collectors.append(collector)
+
+    def _register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    async def render(self) -> str:
+        """
+        Run the collectors and render all metrics, on the event loop that updates them
+        so no snapshot sees a half applied update
+        """
+        for collector in self.collectors:
+            try:
+                result = collector()
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                print("Metrics collector failed:", e)
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+metrics_registry = MetricsRegistry()
+
+queue_depth = metrics_registry.gauge(
+    "query_executor_queue_depth", "Query batches waiting in the engine queue", ("engine",))
+inflight_batches = metrics_registry.gauge(
+    "query_executor_inflight_batches", "Query batches currently executing", ("engine",))
+queries_total = metrics_registry.counter(
+    "query_executor_queries_total", "Queries executed successfully", ("engine",))
+query_failures_total = metrics_registry.counter(
+    "query_executor_query_failures_total", "Queries that failed to execute or parse", ("engine",))
+batch_failures_total = metrics_registry.counter(
+    "query_executor_batch_failures_total", "Query batches aborted with an error", ("engine",))
+queries_per_second = metrics_registry.gauge(
+    "query_executor_queries_per_second", "Queries completed per second over the last 10 seconds", ("engine",))
+query_latency_seconds = metrics_registry.histogram(
+    "query_executor_query_latency_seconds", "Client side query latency (execute + fetch)", ("engine",))
+parse_seconds = metrics_registry.histogram(
+    "query_executor_parse_seconds", "Time spent parsing a query plan", ("engine",),
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0))
+pool_size = metrics_registry.gauge(
+    "query_executor_pool_size", "Open connections in the engine pool", ("engine",))
+pool_in_use = metrics_registry.gauge(
+    "query_executor_pool_in_use", "Connections currently checked out of the engine pool", ("engine",))
+pool_max_size = metrics_registry.gauge(
+    "query_executor_pool_max_size", "Maximum size of the engine pool", ("engine",))
+checksum_mismatches_total = metrics_registry.counter(
+    "query_executor_checksum_mismatches_total", "Sweep points whose result checksum differs from another engine",
+    ("engine",))
+result_cache_hits_total = metrics_registry.counter(
+    "query_executor_result_cache_hits_total", "Sweep points answered from the result cache", ("engine",))
+result_cache_entries = metrics_registry.gauge(
+    "query_executor_result_cache_entries", "Sweep points in the result cache", ())
+parse_queue_depth = metrics_registry.gauge(
+    "query_executor_parse_queue_depth", "Raw plans waiting for the parse stage", ())
+raw_plan_bytes = metrics_registry.gauge(
+    "query_executor_raw_plan_bytes", "UTF-8 size of all stored raw plans", ())
+stored_plan_bytes = metrics_registry.gauge(
+    "query_executor_stored_plan_bytes", "Compressed size of all stored raw plans in the plan store", ())
+
+query_rate = RateMeter()
+
+
+def _collect_query_rate():
+    for engine in query_rate.keys():
+        queries_per_second.set(query_rate.rate(engine), engine=engine)
+
+
+metrics_registry.register_collector(_collect_query_rate)
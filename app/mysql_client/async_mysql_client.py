@@ -1,8 +1,6 @@
-import re
 import time
 
 import aiomysql
-import mysql.connector
 
 from app.config import load_config
 
@@ -13,35 +11,146 @@ class AsyncMysqlClient:
     def __init__(self, conn: aiomysql.Connection, cursor):
         self.conn = conn
         self.cursor = cursor
+        # perf_counter_ns breakdown of the last executed statement
+        self.last_execute_ns = 0
+        self.last_fetch_ns = 0
 
     @classmethod
     async def create(cls, conn):
         cursor = await conn.cursor(aiomysql.DictCursor)
         return cls(conn, cursor)
 
-    async def execute_query(self, query: str):
+    async def execute_query(self, query: str, checksum=None):
         """
         Execute given query
         :param query:
+        :param checksum: optional object with update(rows), e.g. RowChecksum
         :return:
         """
         try:
-            start_time = time.time()
+            start_ns = time.perf_counter_ns()
             await self.cursor.execute(query)
-            end_time = time.time()
+            executed_ns = time.perf_counter_ns()
             results = await self.cursor.fetchall()
-            return results, (end_time - start_time)
+            end_ns = time.perf_counter_ns()
+            if checksum is not None:
+                checksum.update(results)
+            self.last_execute_ns = executed_ns - start_ns
+            self.last_fetch_ns = end_ns - executed_ns
+            return results, (end_ns - start_ns) / 1e9
         except Exception as e:
             print("Query Failed: ", e)
 
+    async def consume_query(self, query: str, checksum=None):
+        """
+        Execute the query through an unbuffered SSCursor and stream over the result without keeping it
+        :param checksum: optional object with update(rows), fed every fetched batch of tuples
+        :return: (row_count, time_taken)
+        """
+        row_count = 0
+        cursor = await self.conn.cursor(aiomysql.SSCursor)
+        try:
+            start_ns = time.perf_counter_ns()
+            await cursor.execute(query)
+            executed_ns = time.perf_counter_ns()
+            while rows := await cursor.fetchmany(config.execution.fetch_batch_size):
+                row_count += len(rows)
+                if checksum is not None:
+                    checksum.update(rows)
+            end_ns = time.perf_counter_ns()
+            self.last_execute_ns = executed_ns - start_ns
+            self.last_fetch_ns = end_ns - executed_ns
+            return row_count, (end_ns - start_ns) / 1e9
+        except Exception as e:
+            print("Query Failed: ", e)
+            raise
+        finally:
+            await cursor.close()
+
     async def analyze_query(self, query: str):
         try:
+            start_ns = time.perf_counter_ns()
             await self.cursor.execute(f"EXPLAIN ANALYZE {query}")
+            executed_ns = time.perf_counter_ns()
             results = await self.cursor.fetchone()
-            return results
+            self.last_execute_ns = executed_ns - start_ns
+            self.last_fetch_ns = time.perf_counter_ns() - executed_ns
+            # DictCursor returns the plan under the "EXPLAIN" column
+            return results["EXPLAIN"]
         except Exception as e:
             print("Query Analyze Failed: ", e)
 
+    async def time_query(self, query: str, checksum=None):
+        """
+        Execute the query without instrumentation, MySQL has no plan output without EXPLAIN ANALYZE
+        :param checksum: optional object with update(rows), e.g. RowChecksum
+        :return: (None, time_taken)
+        """
+        _, time_taken = await self.consume_query(query, checksum)
+        return None, time_taken
+
+    async def explain_query(self, query: str):
+        """
+        Plan the query without executing it, returns the JSON plan with cost and row estimates
+        """
+        try:
+            start_ns = time.perf_counter_ns()
+            await self.cursor.execute(f"EXPLAIN FORMAT=JSON {query}")
+            executed_ns = time.perf_counter_ns()
+            results = await self.cursor.fetchone()
+            self.last_execute_ns = executed_ns - start_ns
+            self.last_fetch_ns = time.perf_counter_ns() - executed_ns
+            return results["EXPLAIN"]
+        except Exception as e:
+            print("Query Explain Failed: ", e)
+
+    async def reset_cache(self):
+        """
+        Run the configured flush statements (cache.mysql_flush_statements) before a cold run
+        """
+        for statement in config.cache.mysql_flush_statements:
+            try:
+                await self.cursor.execute(statement)
+                await self.cursor.fetchall()
+            except Exception as e:
+                print(f"Cache flush '{statement}' failed:", e)
+
+    async def io_counters(self) -> dict:
+        """
+        InnoDB buffer pool and data read counters, server wide, compare two snapshots around a query
+        """
+        await self.cursor.execute(
+            "SHOW GLOBAL STATUS WHERE Variable_name IN "
+            "('Innodb_buffer_pool_read_requests', 'Innodb_buffer_pool_reads', 'Innodb_data_read', 'Innodb_data_reads')"
+        )
+        return {row['Variable_name'].lower(): int(row['Value']) for row in await self.cursor.fetchall()}
+
+    async def execute_statement(self, statement: str):
+        """
+        Execute a statement without result (DDL, ANALYZE TABLE), raises on failure
+        """
+        await self.cursor.execute(statement)
+        await self.cursor.fetchall()
+
+    async def table_of_column(self, column: str):
+        """
+        Table of the current database that has the column, None if there is none
+        """
+        await self.cursor.execute(
+            "SELECT table_name AS table_name FROM information_schema.columns "
+            "WHERE table_schema = DATABASE() AND column_name = %s LIMIT 1", (column,))
+        row = await self.cursor.fetchone()
+        return row['table_name'] if row else None
+
+    async def measure_round_trip(self) -> int:
+        """
+        Measure round trip time of a trivial query in nanoseconds
+        """
+        start_ns = time.perf_counter_ns()
+        await self.cursor.execute("SELECT 1")
+        await self.cursor.fetchall()
+        return time.perf_counter_ns() - start_ns
+
     async def set_database(self, database_name: str):
         """
         Set database
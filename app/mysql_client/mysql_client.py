@@ -1,7 +1,5 @@
-import re
 import time
 
-import aiomysql
 import mysql.connector
 
 from app.config import load_config
@@ -26,11 +24,10 @@ class MysqlClient:
         :return:
         """
         try:
-            start_time = time.time()
+            start_ns = time.perf_counter_ns()
             self.cursor.execute(query)
-            end_time = time.time()
             results = self.cursor.fetchall()
-            return results, (end_time - start_time)
+            return results, (time.perf_counter_ns() - start_ns) / 1e9
         except Exception as e:
             print("Query Failed: ", e)
 
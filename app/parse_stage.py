@@ -0,0 +1,77 @@
+"""
+Plan parsing stage between query execution and result storage.
+
+Executors put raw plans on a bounded queue and get a future back right away, so their connection
+goes on with the next query. Consumer tasks hand the plans to a process pool running
+analyze_parsers.parse_plan and resolve the futures. A full queue makes executors wait, which keeps
+memory bounded when parsing falls behind.
+"""
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+from app.analyze_parsers import parse_plan
+
+
+class ParseStage:
+    def __init__(self, workers: int = 2, queue_size: int = 64):
+        # workers = 0 parses on the event loop, still decoupled from execution through the queue
+        self.workers = workers
+        self.queue_size = queue_size
+        self.queue: Optional[asyncio.Queue] = None
+        self.pool: Optional[ProcessPoolExecutor] = None
+        self.tasks: List[asyncio.Task] = []
+
+    def start(self):
+        """
+        Create the queue, pool and consumers, called on first use from inside the event loop
+        """
+        if self.tasks:
+            return
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        # Spawned, forking a process that runs connection pool and UI threads is unsafe
+        self.pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")) \
+            if self.workers > 0 else None
+        self.tasks = [asyncio.create_task(self._consume()) for _ in range(max(self.workers, 1))]
+
+    async def submit(self, db_type: str, plan, filters: List[str], mode: str = "analyze") -> asyncio.Future:
+        """
+        Queue a plan for parsing and return the future of its parse_plan result
+        """
+        future = asyncio.get_running_loop().create_future()
+        if plan is None:
+            # Nothing to parse (timed run without a plan)
+            future.set_result(parse_plan(db_type, None, filters, mode))
+            return future
+        self.start()
+        await self.queue.put(((db_type, plan, filters, mode), future))
+        return future
+
+    async def _consume(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            args, future = await self.queue.get()
+            try:
+                if self.pool is not None:
+                    result = await loop.run_in_executor(self.pool, parse_plan, *args)
+                else:
+                    result = parse_plan(*args)
+                if not future.done():
+                    future.set_result(result)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            finally:
+                self.queue.task_done()
+
+    def qsize(self) -> int:
+        return self.queue.qsize() if self.queue is not None else 0
+
+    def shutdown(self):
+        for task in self.tasks:
+            task.cancel()
+        self.tasks = []
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
@@ -0,0 +1,124 @@
+"""
+Plan shape fingerprints.
+
+A captured plan is reduced to its shape: operators, the tables they touch and their nesting
+(join order), with costs, timings, row counts and literals stripped. Two plans with the same
+fingerprint were executed with the same strategy, only on different data.
+"""
+import hashlib
+import json
+import re
+from typing import Any, Dict, List
+
+# "(cost=... rows=... width=...)", "(actual time=... rows=... loops=...)", "(never executed)"
+_RE_PLAN_METRICS = re.compile(r"\s*\((?:cost|actual|never executed|rows=)[^()]*\)")
+_RE_QUOTED_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_RE_NUMBER_LITERAL = re.compile(r"(?<![\w.$])-?\d+(?:\.\d+)?(?:e[+-]?\d+)?(?![\w.])", re.IGNORECASE)
+# Keys naming operators, tables and indexes in JSON plans of all engines (EXPLAIN FORMAT JSON)
+_JSON_SHAPE_KEYS = ("Node Type", "Join Type", "Relation Name", "Index Name", "table_name", "access_type", "key",
+                    "operation", "name")
+
+
+def strip_literals(text: str) -> str:
+    """
+    Node label with quoted and numeric literals replaced by "?", used as the key of a plan node
+    """
+    text = _RE_QUOTED_LITERAL.sub("?", text)
+    return _RE_NUMBER_LITERAL.sub("?", text)
+
+
+def normalize_plan_postgres(explain_text: str) -> List[str]:
+    """
+    Shape of a Postgres text plan: one entry per plan node with its indentation,
+    detail lines (Filter, Buffers, Hash Cond, ...) are dropped
+    """
+    shape = []
+    for i, line in enumerate(explain_text.splitlines()):
+        arrow = len(line) - len(line.lstrip())
+        if line.lstrip().startswith("->"):
+            indent, label = arrow, line[arrow + 2:]
+        elif i == 0:
+            indent, label = 0, line
+        else:
+            continue
+        label = _RE_PLAN_METRICS.sub("", label).strip()
+        shape.append(f"{indent}:{label}")
+    return shape
+
+
+def normalize_plan_mysql(plan_text: str) -> List[str]:
+    """
+    Shape of a MySQL EXPLAIN ANALYZE tree: one entry per "->" node with its indentation,
+    conditions are kept with literals replaced by "?"
+    """
+    shape = []
+    for line in plan_text.splitlines():
+        arrow = len(line) - len(line.lstrip())
+        if not line.lstrip().startswith("->"):
+            continue
+        label = _RE_PLAN_METRICS.sub("", line[arrow + 2:]).strip()
+        shape.append(f"{arrow}:{strip_literals(label)}")
+    return shape
+
+
+def normalize_plan_duckdb(profile_json: str) -> List[str]:
+    """
+    Shape of a DuckDB JSON profile: operator names and scanned tables in tree order
+    """
+    profile: Dict[str, Any] = json.loads(profile_json)
+    shape = []
+
+    def walk(node: Dict[str, Any], depth: int):
+        name = node.get("operator_name") or node.get("operator_type") or node.get("name")
+        if name:
+            extra = node.get("extra_info") or {}
+            table = extra.get("Table") if isinstance(extra, dict) else None
+            shape.append(f"{depth}:{str(name).strip()}" + (f"[{table}]" if table else ""))
+        for child in (node.get("children") or []):
+            walk(child, depth + 1)
+
+    walk(profile, 0)
+    return shape
+
+
+def normalize_plan_json(plan_json: str) -> List[str]:
+    """
+    Shape of a JSON plan (estimate mode): operator, table and index names in tree order
+    """
+    shape = []
+
+    def walk(node: Any, depth: int):
+        if isinstance(node, list):
+            for child in node:
+                walk(child, depth)
+            return
+        if not isinstance(node, dict):
+            return
+        label = ",".join(str(node[k]) for k in _JSON_SHAPE_KEYS if isinstance(node.get(k), str))
+        if label:
+            shape.append(f"{depth}:{label}")
+        for key, value in node.items():
+            if key not in ("extra_info", "cost_info") and isinstance(value, (dict, list)):
+                walk(value, depth + 1)
+
+    walk(json.loads(plan_json), 0)
+    return shape
+
+
+def normalize_plan(db_type: str, raw_plan: str) -> List[str]:
+    if db_type == "MySQL":
+        return normalize_plan_mysql(raw_plan)
+    if db_type == "Postgres":
+        return normalize_plan_postgres(raw_plan)
+    if db_type == "DuckDB":
+        return normalize_plan_duckdb(raw_plan)
+    raise ValueError(f"Unknown database type: {db_type}")
+
+
+def plan_fingerprint(db_type: str, raw_plan: str, mode: str = "analyze") -> str:
+    """
+    Short stable hash of the normalized plan shape
+    """
+    shape_lines = normalize_plan_json(raw_plan) if mode == "estimate" else normalize_plan(db_type, raw_plan)
+    shape = "\n".join(shape_lines)
+    return hashlib.sha1(shape.encode("utf-8")).hexdigest()[:16]
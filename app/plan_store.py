@@ -0,0 +1,99 @@
+"""
+Deduplicated, compressed storage for raw plans.
+
+Plans of one sweep differ almost only in their numbers (timings, row counts, literals). Each plan is
+split into a template, the text with every number replaced by a marker, and the list of numbers as
+they appeared. Templates are zlib compressed and stored once by content hash; per plan only the
+hash and the compressed numbers are kept. get() rebuilds the original text exactly.
+"""
+import hashlib
+import re
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+# Numbers that are not part of an identifier, e.g. "rows=42", "0.013..1.250", but not "l_1".
+# ASCII digits only, other Unicode digits stay in the template
+_RE_NUMBER = re.compile(r"(?<!\w)[0-9]+(?:\.[0-9]+)?(?!\w)")
+_MARKER = "\x00"
+_RE_MARKER = re.compile(_MARKER)
+_SEPARATOR = "\x1f"
+
+
+
+class StoredPlan:
+    """
+    Handle of a plan in a PlanStore, numbers is None when the template holds the full text
+    """
+    __slots__ = ("digest", "numbers")
+
+    def __init__(self, digest: bytes, numbers: Optional[bytes]):
+        self.digest = digest
+        self.numbers = numbers
+
+
+class PlanStore:
+    def __init__(self, compression_level: int = 6, template_cache_size: int = 64):
+        self.compression_level = compression_level
+        self.templates: Dict[bytes, bytes] = {}
+        self.template_cache_size = template_cache_size
+        # Recently used decompressed templates, rebuilding a whole sweep reuses the same few
+        self._template_cache: OrderedDict[bytes, str] = OrderedDict()
+        self.raw_bytes = 0
+        self.stored_bytes = 0
+
+    def put(self, raw_plan: Any) -> Any:
+        """
+        Store a raw plan and return its handle, values that are not plan text are returned unchanged
+        """
+        if not isinstance(raw_plan, str):
+            return raw_plan
+        if _MARKER in raw_plan or _SEPARATOR in raw_plan:
+            template, numbers = raw_plan, None
+        else:
+            numbers = _RE_NUMBER.findall(raw_plan)
+            template = _RE_NUMBER.sub(_MARKER, raw_plan)
+        digest = hashlib.blake2b(template.encode("utf-8"), digest_size=16).digest()
+        if digest not in self.templates:
+            compressed = zlib.compress(template.encode("utf-8"), self.compression_level)
+            self.templates[digest] = compressed
+            self.stored_bytes += len(compressed)
+        packed = None
+        if numbers is not None:
+            packed = zlib.compress(_SEPARATOR.join(numbers).encode("ascii"), self.compression_level)
+            self.stored_bytes += len(packed)
+        self.raw_bytes += len(raw_plan.encode("utf-8"))
+        return StoredPlan(digest, packed)
+
+    def get(self, handle: Any) -> Any:
+        """
+        Rebuild the exact raw plan of a handle
+        """
+        if not isinstance(handle, StoredPlan):
+            return handle
+        template = self._get_template(handle.digest)
+        if handle.numbers is None:
+            return template
+        numbers = zlib.decompress(handle.numbers).decode("ascii")
+        numbers = iter(numbers.split(_SEPARATOR)) if numbers else iter(())
+        return _RE_MARKER.sub(lambda _: next(numbers), template)
+
+    def _get_template(self, digest: bytes) -> str:
+        template = self._template_cache.get(digest)
+        if template is not None:
+            self._template_cache.move_to_end(digest)
+            return template
+        template = zlib.decompress(self.templates[digest]).decode("utf-8")
+        self._template_cache[digest] = template
+        if len(self._template_cache) > self.template_cache_size:
+            self._template_cache.popitem(last=False)
+        return template
+
+    def stats(self) -> dict:
+        return {
+            'templates': len(self.templates),
+            'raw_bytes': self.raw_bytes,
+            'stored_bytes': self.stored_bytes,
+            'ratio': self.raw_bytes / self.stored_bytes if self.stored_bytes else 0.0,
+        }
+
@@ -1,8 +1,13 @@
+import json
 import time
 
 from psycopg import AsyncConnection
 from psycopg.rows import dict_row
 
+from app.config import load_config
+
+config = load_config()
+
 
 class AsyncPostgresClient:
     """
@@ -10,25 +15,63 @@ class AsyncPostgresClient:
     """
     def __init__(self, conn: AsyncConnection):
         self.conn = conn
+        # perf_counter_ns breakdown of the last executed statement
+        self.last_execute_ns = 0
+        self.last_fetch_ns = 0
 
-    async def execute_query(self, query: str):
+    async def execute_query(self, query: str, checksum=None):
         """
         Execute the given SQL query asynchronously.
         :param query: SQL query to execute.
+        :param checksum: optional object with update(rows), e.g. RowChecksum
         :return: (results, time_taken)
         """
         try:
             async with self.conn.cursor(row_factory=dict_row) as cur:
-                start_time = time.time()
+                start_ns = time.perf_counter_ns()
                 await cur.execute(query)
+                executed_ns = time.perf_counter_ns()
                 results = await cur.fetchall()
-                end_time = time.time()
-                return results, end_time - start_time
+                end_ns = time.perf_counter_ns()
+                if checksum is not None:
+                    checksum.update(results)
+                self.last_execute_ns = executed_ns - start_ns
+                self.last_fetch_ns = end_ns - executed_ns
+                return results, (end_ns - start_ns) / 1e9
         except Exception as e:
             print("Query failed:", e)
             await self.conn.rollback()
             return None, 0
 
+    async def consume_query(self, query: str, checksum=None):
+        """
+        Execute the query through a server side (named) cursor and stream over the result
+        without keeping it, client memory stays constant for any result size.
+        :param query: SQL query to execute.
+        :param checksum: optional object with update(rows), fed every fetched batch of tuples
+        :return: (row_count, time_taken)
+        """
+        row_count = 0
+        try:
+            # Named cursors only live inside a transaction
+            async with self.conn.transaction():
+                async with self.conn.cursor(name="consume_query") as cur:
+                    start_ns = time.perf_counter_ns()
+                    await cur.execute(query)
+                    executed_ns = time.perf_counter_ns()
+                    while rows := await cur.fetchmany(config.execution.fetch_batch_size):
+                        row_count += len(rows)
+                        if checksum is not None:
+                            checksum.update(rows)
+                    end_ns = time.perf_counter_ns()
+            self.last_execute_ns = executed_ns - start_ns
+            self.last_fetch_ns = end_ns - executed_ns
+            return row_count, (end_ns - start_ns) / 1e9
+        except Exception as e:
+            print("Query failed:", e)
+            await self.conn.rollback()
+            raise
+
     async def analyze_query(self, query: str):
         """
         Execute the given SQL query asynchronously.
@@ -38,16 +81,113 @@ class AsyncPostgresClient:
         query = f"EXPLAIN (ANALYZE, BUFFERS, VERBOSE) {query}"
         try:
             async with self.conn.cursor(row_factory=dict_row) as cur:
+                start_ns = time.perf_counter_ns()
                 await cur.execute(query)
+                executed_ns = time.perf_counter_ns()
                 result = await cur.fetchall()
+                self.last_execute_ns = executed_ns - start_ns
+                self.last_fetch_ns = time.perf_counter_ns() - executed_ns
                 text = "\n".join(r['QUERY PLAN'] for r in result)
-                print(text)
                 return text
         except Exception as e:
             print("Query failed:", e)
             await self.conn.rollback()
             return None, 0
 
+    async def time_query(self, query: str, checksum=None):
+        """
+        Execute the query with EXPLAIN (ANALYZE, TIMING OFF, BUFFERS): row and buffer counts and total Execution Time
+        without the per node clock calls that inflate EXPLAIN ANALYZE runtimes.
+        EXPLAIN returns no rows, with a checksum the query is streamed with consume_query instead.
+        :param query: SQL query to execute.
+        :param checksum: optional object with update(rows), e.g. RowChecksum
+        :return: (plan text or None, client side time_taken)
+        """
+        if checksum is not None:
+            _, time_taken = await self.consume_query(query, checksum)
+            return None, time_taken
+        query = f"EXPLAIN (ANALYZE, TIMING OFF, BUFFERS) {query}"
+        try:
+            async with self.conn.cursor(row_factory=dict_row) as cur:
+                start_ns = time.perf_counter_ns()
+                await cur.execute(query)
+                executed_ns = time.perf_counter_ns()
+                result = await cur.fetchall()
+                end_ns = time.perf_counter_ns()
+                self.last_execute_ns = executed_ns - start_ns
+                self.last_fetch_ns = end_ns - executed_ns
+                return "\n".join(r['QUERY PLAN'] for r in result), (end_ns - start_ns) / 1e9
+        except Exception as e:
+            print("Query failed:", e)
+            await self.conn.rollback()
+            raise
+
+    async def explain_query(self, query: str):
+        """
+        Plan the given SQL query without executing it.
+        :param query: SQL query to explain.
+        :return: JSON plan text with the planner's cost and row estimates
+        """
+        query = f"EXPLAIN (FORMAT JSON) {query}"
+        try:
+            async with self.conn.cursor(row_factory=dict_row) as cur:
+                start_ns = time.perf_counter_ns()
+                await cur.execute(query)
+                executed_ns = time.perf_counter_ns()
+                result = await cur.fetchone()
+                self.last_execute_ns = executed_ns - start_ns
+                self.last_fetch_ns = time.perf_counter_ns() - executed_ns
+                # psycopg already loads the json column
+                plan = result['QUERY PLAN']
+                return plan if isinstance(plan, str) else json.dumps(plan)
+        except Exception as e:
+            print("Query Explain failed:", e)
+            await self.conn.rollback()
+            return None
+
+    async def reset_cache(self):
+        """
+        Drop session level caches (prepared plans, temp tables) with DISCARD ALL.
+        Shared buffers and the OS page cache are not affected, see cache.drop_command.
+        """
+        # DISCARD ALL cannot run inside a transaction block
+        await self.conn.rollback()
+        autocommit = self.conn.autocommit
+        await self.conn.set_autocommit(True)
+        try:
+            async with self.conn.cursor() as cur:
+                await cur.execute("DISCARD ALL")
+        finally:
+            await self.conn.set_autocommit(autocommit)
+
+    async def execute_statement(self, statement: str):
+        """
+        Execute and commit a statement without result (DDL, ANALYZE), raises on failure
+        """
+        async with self.conn.cursor() as cur:
+            await cur.execute(statement)
+        await self.conn.commit()
+
+    async def table_of_column(self, column: str):
+        """
+        Table of the current schema that has the column, None if there is none
+        """
+        async with self.conn.cursor() as cur:
+            await cur.execute("SELECT table_name FROM information_schema.columns "
+                              "WHERE table_schema = current_schema() AND column_name = %s LIMIT 1", (column,))
+            row = await cur.fetchone()
+            return row[0] if row else None
+
+    async def measure_round_trip(self) -> int:
+        """
+        Measure round trip time of a trivial query in nanoseconds
+        """
+        start_ns = time.perf_counter_ns()
+        async with self.conn.cursor() as cur:
+            await cur.execute("SELECT 1")
+            await cur.fetchall()
+        return time.perf_counter_ns() - start_ns
+
     async def get_size_of_database(self, database: str):
         """
         Get the size (in MB) of the given PostgreSQL database.
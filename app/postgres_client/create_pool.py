@@ -4,15 +4,19 @@ from app.config import load_config
 config = load_config()
 
 
-def create_postgres_pool() -> AsyncConnectionPool:
-    """
-    Creates and returns an async Postgres connection pool.
-    """
-    conninfo = (
+def postgres_conninfo() -> str:
+    return (
         f"host={config.database.postgres.host} "
         f"port={config.database.postgres.port} "
         f"dbname={config.database.postgres.database} "
         f"user={config.database.postgres.username} "
         f"password={config.database.postgres.password}"
     )
-    return AsyncConnectionPool(conninfo=conninfo, min_size=1, max_size=10)
\ No newline at end of file
+
+
+def create_postgres_pool() -> AsyncConnectionPool:
+    """
+    Creates and returns an async Postgres connection pool.
+    The pool is not opened, call "await pool.open()" from the event loop.
+    """
+    return AsyncConnectionPool(conninfo=postgres_conninfo(), min_size=1, max_size=10, open=False)
\ No newline at end of file
@@ -41,11 +41,10 @@ class PostgresClient:
         :return: results and time taken
         """
         try:
-            start_time = time.time()
+            start_ns = time.perf_counter_ns()
             self.cur.execute(query)
-            end_time = time.time()
             results = self.cur.fetchall()
-            return results, (end_time - start_time)
+            return results, (time.perf_counter_ns() - start_ns) / 1e9
         except Exception as e:
             print("Query failed: ", e)
             self.conn.rollback()
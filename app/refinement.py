@@ -0,0 +1,84 @@
+"""
+Change point detection for refinement sweeps.
+
+A refinement sweep runs a coarse grid first. Neighboring points along each parameter whose results jump
+(another plan fingerprint, or runtime or filter rows differing by more than a factor) get a point in the
+middle of their interval in the next round, until intervals are down to the minimum step. Flat regions
+keep the coarse resolution and plan switch boundaries end up at the minimum step.
+"""
+from typing import Dict, List, Tuple
+
+
+def sweep_point(formatted_result: dict, names: List[str]) -> Tuple:
+    """
+    Parameter values of a result in the order of names, None for parameters it does not have
+    """
+    values = {}
+    n = 1
+    while f'filter_{n}' in formatted_result:
+        values[formatted_result[f'filter_{n}']] = formatted_result.get(f'val_{n}')
+        n += 1
+    return tuple(values.get(name) for name in names)
+
+
+def _ratio(a, b) -> float:
+    """
+    Factor between two non negative measurements, inf when exactly one of them is zero
+    """
+    if a in ("", None) or b in ("", None):
+        return 1.0
+    a, b = abs(float(a)), abs(float(b))
+    if a == b:
+        return 1.0
+    if min(a, b) == 0:
+        return float("inf")
+    return max(a, b) / min(a, b)
+
+
+def is_change_point(left: dict, right: dict, threshold: float) -> bool:
+    """
+    Whether the results of two neighboring points differ enough to refine between them
+    """
+    if left.get('plan_fingerprint') != right.get('plan_fingerprint'):
+        return True
+    if _ratio(left.get('runtime'), right.get('runtime')) > threshold:
+        return True
+    n = 1
+    while f'rows_{n}' in left:
+        if _ratio(left[f'rows_{n}'], right.get(f'rows_{n}')) > threshold:
+            return True
+        n += 1
+    return False
+
+
+def refinement_points(parsed_results: List[dict], names: List[str], min_steps: Dict[str, int],
+                      threshold: float) -> List[Tuple]:
+    """
+    Midpoints of all intervals between neighboring results that contain a change point and are wider
+    than the parameter's minimum step. Neighbors are points that differ in one parameter only.
+    """
+    points = {}
+    for formatted_result in parsed_results:
+        points[sweep_point(formatted_result, names)] = formatted_result
+
+    midpoints = []
+    seen = set(points)
+    for d, name in enumerate(names):
+        min_step = max(1, min_steps.get(name, 1))
+        # Points on the same line along parameter d, keyed by their other coordinates
+        lines = {}
+        for point in points:
+            if point[d] is not None:
+                lines.setdefault(point[:d] + point[d + 1:], []).append(point)
+        for line in lines.values():
+            line.sort(key=lambda p: p[d])
+            for left, right in zip(line, line[1:]):
+                gap = right[d] - left[d]
+                if gap <= min_step or not is_change_point(points[left], points[right], threshold):
+                    continue
+                # Bisect on multiples of the minimum step from the left point
+                middle = left[:d] + (left[d] + (gap // 2 // min_step) * min_step,) + left[d + 1:]
+                if middle[d] != left[d] and middle not in seen:
+                    seen.add(middle)
+                    midpoints.append(middle)
+    return midpoints
@@ -0,0 +1,56 @@
+"""
+Cache of executed sweep points, so rerunning a query over an overlapping range only executes new points.
+
+Keys are (engine, benchmark, hash of the whitespace normalized template, parameter values, settings) and
+values point at the stored result ((batch index, row) in ResultStorage), the cache itself keeps no results.
+Entries expire after ttl_seconds and the least recently used ones are evicted beyond max_entries.
+"""
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Hashable, Optional, Tuple
+
+
+def template_hash(template: str) -> str:
+    """
+    Hash of a query template that ignores whitespace and a trailing semicolon
+    """
+    normalized = " ".join(template.split()).rstrip(";").strip()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()[:16]
+
+
+def point_key(engine: str, benchmark: str, template_digest: str, values: tuple, settings: tuple) -> tuple:
+    return engine, benchmark, template_digest, tuple(str(value) for value in values), settings
+
+
+class ResultCache:
+    def __init__(self, ttl_seconds: float = 3600, max_entries: int = 100_000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        # key -> (stored_at, value), oldest use first
+        self.entries: "OrderedDict[Hashable, Tuple[float, tuple]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[tuple]:
+        entry = self.entries.get(key)
+        if entry is None or time.monotonic() - entry[0] > self.ttl_seconds:
+            if entry is not None:
+                del self.entries[key]
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key: Hashable, value: tuple):
+        self.entries[key] = (time.monotonic(), value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+
+    def __len__(self) -> int:
+        return len(self.entries)
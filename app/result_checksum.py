@@ -0,0 +1,68 @@
+"""
+Order insensitive checksums of query results, comparable across engines.
+
+Every row is normalized (numbers, dates, padding differ per engine and driver), hashed to 64 bits
+and the hashes are summed modulo 2^64. The sum does not depend on row order and, unlike XOR,
+keeps duplicate rows, so it can be computed batch by batch while the result streams past.
+"""
+import datetime
+import decimal
+import hashlib
+from typing import Iterable
+
+_MASK = (1 << 64) - 1
+_NULL = "\x00"
+_SEPARATOR = "\x1f"
+
+
+def _normalize_value(value, float_digits: int) -> str:
+    if value is None:
+        return _NULL
+    if isinstance(value, bool):
+        return str(int(value))
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, decimal.Decimal):
+        # 12.3400 (numeric), 12.34 (decimal) and 12.34 (double) must hash alike
+        if value.is_finite() and value == value.to_integral_value():
+            return str(int(value))
+        value = float(value)
+    if isinstance(value, float):
+        if value.is_integer():
+            return str(int(value))
+        return f"{value:.{float_digits}g}"
+    if isinstance(value, datetime.datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+        return value.isoformat(sep=" ")
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, datetime.timedelta):
+        return str(value.total_seconds())
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return bytes(value).hex()
+    # CHAR(n) columns are space padded on some engines only
+    return str(value).rstrip(" ")
+
+
+class RowChecksum:
+    def __init__(self, float_digits: int = 9):
+        # Significant digits kept of non integral numbers, engines round floats and decimals differently
+        self.float_digits = float_digits
+        self.row_count = 0
+        self.value = 0
+
+    def update(self, rows: Iterable):
+        """
+        Add a batch of rows, tuples or dicts (dict_row / DictCursor) in column order
+        """
+        for row in rows:
+            if isinstance(row, dict):
+                row = row.values()
+            text = _SEPARATOR.join(_normalize_value(v, self.float_digits) for v in row)
+            digest = hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest()
+            self.value = (self.value + int.from_bytes(digest, "little")) & _MASK
+            self.row_count += 1
+
+    def hexdigest(self) -> str:
+        return f"{self.row_count}:{self.value:016x}"
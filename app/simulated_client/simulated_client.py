@@ -0,0 +1,308 @@
+"""
+In-process stand-ins for the database engines, to scale test the scheduler without servers.
+
+SimulatedClient has the interface of the async engine clients used by execute_query_batch. Queries are not
+executed: comparisons with numeric literals are read from the query text, their row counts grow with the
+literal, and a plan in the engine's real output format is rendered around them, so parsers, fingerprints
+and checksums work unchanged. Latency is drawn from a lognormal distribution, queries fail at a configured
+rate and a SimulatedEngine hands out at most max_connections clients at once.
+"""
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional, Tuple
+
+# "o_totalprice < 1200", "orders.o_totalprice >= 12.5"
+_RE_COMPARISON = re.compile(r"([A-Za-z_][\w.]*)\s*(<=|>=|<>|!=|<|>|=)\s*(-?\d+(?:\.\d+)?)(?![\w.])")
+_TPCH_PREFIXES = {"l": "lineitem", "o": "orders", "c": "customer", "p": "part", "ps": "partsupp", "s": "supplier",
+                  "n": "nation", "r": "region"}
+_MAX_ROWS = 10 ** 7
+# Above this many rows the simulated optimizer switches from a nested loop to a hash join
+_HASH_JOIN_ROWS = 10 ** 4
+# Per node instrumentation of EXPLAIN ANALYZE makes simulated analyzed runs this much slower
+_INSTRUMENTATION_OVERHEAD = 1.2
+# Rows fed to result checksums are capped, checksums only have to agree between engines
+_CHECKSUM_ROWS = 1000
+
+
+class SimulatedQueryError(Exception):
+    pass
+
+
+class SimulatedEngine:
+    """
+    Shared state of one simulated engine: latency model, failure rate and the connection limit
+    """
+    def __init__(self, db_type: str, latency_ms: float = 5.0, latency_sigma: float = 0.5, per_row_us: float = 0.0,
+                 failure_rate: float = 0.0, max_connections: int = 10, joins: int = 0, seed: Optional[int] = None):
+        self.db_type = db_type
+        # Median latency and lognormal spread, plus a cost per row of the filtered scans
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.per_row_us = per_row_us
+        self.failure_rate = failure_rate
+        self.max_connections = max_connections
+        # Unfiltered joins added to every plan, makes plans (and parsing) bigger
+        self.joins = joins
+        self.rng = random.Random(seed)
+        self.semaphore = asyncio.Semaphore(max_connections)
+        self.active_connections = 0
+        self.queries = 0
+        self.failures = 0
+        self.buffer_reads = 0
+
+    @asynccontextmanager
+    async def connection(self):
+        """
+        Acquire a client, waits while max_connections clients are in use
+        """
+        async with self.semaphore:
+            self.active_connections += 1
+            try:
+                yield SimulatedClient(self)
+            finally:
+                self.active_connections -= 1
+
+
+def build_simulated_engines(simulation_config) -> Dict[str, SimulatedEngine]:
+    """
+    SimulatedEngines of the simulation.engines config section, by database type
+    """
+    return {db_type: SimulatedEngine(db_type, **dict(params)) for db_type, params in simulation_config.engines.items()}
+
+
+def _column_rows(column: str, value: float) -> int:
+    """
+    Rows passing "column < value", deterministic per column so that every engine agrees
+    """
+    scale = int.from_bytes(hashlib.blake2b(column.encode("utf-8"), digest_size=4).digest(), "little") % 1000 + 1
+    return min(_MAX_ROWS, int(abs(value) * scale))
+
+
+def _table_of(column: str) -> str:
+    prefix = column.split("_")[0] if "_" in column else ""
+    return _TPCH_PREFIXES.get(prefix, f"t_{column}")
+
+
+class SimulatedClient:
+    def __init__(self, engine: SimulatedEngine):
+        self.engine = engine
+        self.db_type = engine.db_type
+        # perf_counter_ns breakdown of the last executed statement
+        self.last_execute_ns = 0
+        self.last_fetch_ns = 0
+
+    def _filters(self, query: str) -> List[Tuple[str, float, int, int]]:
+        """
+        (column, literal, actual rows, estimated rows) of every comparison in the query
+        """
+        filters = []
+        for column, _, value in _RE_COMPARISON.findall(query):
+            column = column.split(".")[-1]
+            rows = _column_rows(column, float(value))
+            estimate = max(1, int(rows * self.engine.rng.lognormvariate(0, 0.7)))
+            filters.append((column, float(value), rows, estimate))
+        return filters
+
+    async def _run(self, filters: list, instrumented: bool = False) -> float:
+        """
+        Wait for the simulated latency and return it in seconds, raises at the configured failure rate
+        """
+        engine = self.engine
+        latency = engine.rng.lognormvariate(math.log(engine.latency_ms), engine.latency_sigma) / 1000 \
+            if engine.latency_ms > 0 else 0.0
+        latency += sum(f[2] for f in filters) * engine.per_row_us / 1e6
+        if instrumented:
+            latency *= _INSTRUMENTATION_OVERHEAD
+        start_ns = time.perf_counter_ns()
+        await asyncio.sleep(latency)
+        engine.queries += 1
+        engine.buffer_reads += len(filters)
+        if engine.rng.random() < engine.failure_rate:
+            engine.failures += 1
+            raise SimulatedQueryError(f"Simulated {self.db_type} query failure")
+        self.last_execute_ns = time.perf_counter_ns() - start_ns
+        self.last_fetch_ns = 0
+        return latency
+
+    @staticmethod
+    def _result_rows(filters: list) -> int:
+        return min((f[2] for f in filters), default=1)
+
+    async def execute_query(self, query: str, checksum=None):
+        filters = self._filters(query)
+        latency = await self._run(filters)
+        rows = [(i,) for i in range(min(self._result_rows(filters), _CHECKSUM_ROWS))]
+        if checksum is not None:
+            checksum.update(rows)
+        return rows, latency
+
+    async def consume_query(self, query: str, checksum=None) -> Tuple[int, float]:
+        filters = self._filters(query)
+        latency = await self._run(filters)
+        if checksum is not None:
+            checksum.update((i,) for i in range(min(self._result_rows(filters), _CHECKSUM_ROWS)))
+        return self._result_rows(filters), latency
+
+    async def analyze_query(self, query: str) -> str:
+        filters = self._filters(query)
+        latency = await self._run(filters, instrumented=True)
+        if self.db_type == "MySQL":
+            return self._mysql_plan(filters, latency)
+        if self.db_type == "Postgres":
+            return self._postgres_plan(filters, latency)
+        return self._duckdb_profile(filters, latency)
+
+    async def time_query(self, query: str, checksum=None):
+        if self.db_type == "Postgres" and checksum is None:
+            filters = self._filters(query)
+            latency = await self._run(filters)
+            return self._postgres_plan(filters, latency, timing=False), latency
+        _, latency = await self.consume_query(query, checksum)
+        return None, latency
+
+    async def explain_query(self, query: str) -> str:
+        filters = self._filters(query)
+        await self._run([])
+        if self.db_type == "MySQL":
+            return self._mysql_explain(filters)
+        if self.db_type == "Postgres":
+            return self._postgres_explain(filters)
+        return self._duckdb_explain(filters)
+
+    async def reset_cache(self):
+        pass
+
+    async def execute_statement(self, statement: str):
+        await asyncio.sleep(0)
+
+    async def table_of_column(self, column: str) -> str:
+        return _table_of(column)
+
+    async def io_counters(self) -> dict:
+        return {'innodb_buffer_pool_read_requests': self.engine.queries * 100,
+                'innodb_buffer_pool_reads': self.engine.buffer_reads}
+
+    async def measure_round_trip(self) -> int:
+        start_ns = time.perf_counter_ns()
+        await asyncio.sleep(0)
+        return time.perf_counter_ns() - start_ns
+
+    def _join_type(self, filters: list) -> str:
+        return "Hash Join" if self._result_rows(filters) > _HASH_JOIN_ROWS else "Nested Loop"
+
+    def _postgres_plan(self, filters: list, latency: float, timing: bool = True) -> str:
+        """
+        EXPLAIN (ANALYZE, BUFFERS) text, with TIMING OFF when timing is False
+        """
+        rng = self.engine.rng
+        ms = latency * 1000
+        lines = []
+
+        def node(depth: int, label: str, estimate: int, rows: int):
+            prefix = "" if depth == 0 else " " * (2 + 6 * (depth - 1)) + "->  "
+            actual = f"actual time={rng.uniform(0, ms / 10):.3f}..{ms:.3f} " if timing else "actual "
+            lines.append(f"{prefix}{label}  (cost=0.00..{estimate * 1.5 + 10:.2f} rows={estimate} "
+                         f"width={rng.randint(4, 64)}) ({actual}rows={rows} loops=1)")
+            return " " * (2 if depth == 0 else 2 + 6 * depth)
+
+        result_rows = self._result_rows(filters)
+        detail = node(0, "Aggregate", 1, 1)
+        lines.append(f"{detail}Buffers: shared hit={rng.randint(0, 10 ** 5)} read={rng.randint(0, 10 ** 4)}")
+        scans = [(f"Seq Scan on {_table_of(c)}", f"({c} < {v:g})", e, r, r)
+                 for c, v, r, e in filters]
+        scans += [(f"Seq Scan on t_join_{n}", None, 1000, 1000, 0) for n in range(self.engine.joins)]
+        depth = 1
+        for n, (label, condition, estimate, rows, removed) in enumerate(scans):
+            if n < len(scans) - 1:
+                node(depth, self._join_type(filters), result_rows, result_rows)
+                depth += 1
+            detail = node(depth, label, estimate, rows)
+            if condition is not None:
+                lines.append(f"{detail}Filter: {condition}")
+                lines.append(f"{detail}Rows Removed by Filter: {removed}")
+        lines.append(f"Planning Time: {rng.uniform(0.05, 1):.3f} ms")
+        lines.append(f"Execution Time: {ms:.3f} ms")
+        return "\n".join(lines)
+
+    def _mysql_plan(self, filters: list, latency: float) -> str:
+        """
+        EXPLAIN ANALYZE tree
+        """
+        rng = self.engine.rng
+        ms = latency * 1000
+        lines = []
+
+        def node(depth: int, label: str, estimate: Optional[int], rows: int):
+            cost = f"(cost={estimate * 0.1 + 1:.4g} rows={estimate}) " if estimate is not None else ""
+            lines.append(f"{'    ' * depth}-> {label}  {cost}"
+                         f"(actual time={rng.uniform(0, ms / 10):.3f}..{ms:.3f} rows={rows} loops=1)")
+
+        result_rows = self._result_rows(filters)
+        node(0, "Aggregate: count(0)", None, 1)
+        scans = [(_table_of(c), f"({_table_of(c)}.{c} < {v:g})", e, r) for c, v, r, e in filters]
+        scans += [(f"t_join_{n}", None, 1000, 1000) for n in range(self.engine.joins)]
+        depth = 1
+        for n, (table, condition, estimate, rows) in enumerate(scans):
+            if n < len(scans) - 1:
+                node(depth, "Nested loop inner join" if self._join_type(filters) == "Nested Loop"
+                     else "Inner hash join", result_rows, result_rows)
+                depth += 1
+            if condition is not None:
+                node(depth, f"Filter: {condition}", estimate, rows)
+                node(depth + 1, f"Table scan on {table}", estimate * 2, rows * 2)
+            else:
+                node(depth, f"Table scan on {table}", estimate, rows)
+        return "\n".join(lines)
+
+    def _duckdb_profile(self, filters: list, latency: float) -> str:
+        """
+        JSON profile (enable_profiling = 'json')
+        """
+        rng = self.engine.rng
+        scans = [{
+            "operator_name": "TABLE_SCAN",
+            "operator_cardinality": rows,
+            "operator_rows_scanned": rows + rng.randint(0, rows + 1),
+            "operator_timing": latency / max(1, len(filters)),
+            "extra_info": {"Table": _table_of(column), "Filters": f"{column}<{value:g}",
+                           "Estimated Cardinality": str(estimate)},
+            "children": [],
+        } for column, value, rows, estimate in filters]
+        node = scans[-1] if scans else {"operator_name": "DUMMY_SCAN", "operator_cardinality": 1, "children": []}
+        result_rows = self._result_rows(filters)
+        for scan in reversed(scans[:-1]):
+            node = {"operator_name": "HASH_JOIN" if result_rows > _HASH_JOIN_ROWS else "NESTED_LOOP_JOIN",
+                    "operator_cardinality": result_rows, "operator_timing": 0.0,
+                    "extra_info": {"Join Type": "INNER", "Estimated Cardinality": str(result_rows)},
+                    "children": [scan, node]}
+        return json.dumps({
+            "latency": latency,
+            "cumulative_rows_scanned": sum(f[2] for f in filters),
+            "children": [{"operator_name": "UNGROUPED_AGGREGATE", "operator_cardinality": 1, "children": [node]}],
+        })
+
+    def _postgres_explain(self, filters: list) -> str:
+        plans = [{"Node Type": "Seq Scan", "Relation Name": _table_of(c), "Filter": f"({c} < {v:g})",
+                  "Plan Rows": e, "Total Cost": e * 1.5 + 10} for c, v, r, e in filters]
+        total = sum(p["Total Cost"] for p in plans) + 1
+        return json.dumps([{"Plan": {"Node Type": "Aggregate", "Plan Rows": 1, "Total Cost": total, "Plans": plans}}])
+
+    def _mysql_explain(self, filters: list) -> str:
+        tables = [{"table": {"table_name": _table_of(c), "rows_produced_per_join": e,
+                             "attached_condition": f"({_table_of(c)}.{c} < {v:g})",
+                             "cost_info": {"read_cost": f"{e * 0.1:.2f}", "eval_cost": f"{e * 0.01:.2f}"}}}
+                  for c, v, r, e in filters]
+        total = sum(e * 0.11 for c, v, r, e in filters)
+        return json.dumps({"query_block": {"cost_info": {"query_cost": f"{total:.2f}"}, "nested_loop": tables}})
+
+    def _duckdb_explain(self, filters: list) -> str:
+        scans = [{"name": "SEQ_SCAN ", "children": [],
+                  "extra_info": {"Table": _table_of(c), "Filters": f"{c}<{v:g}", "Estimated Cardinality": str(e)}}
+                 for c, v, r, e in filters]
+        return json.dumps([{"name": "UNGROUPED_AGGREGATE", "children": scans, "extra_info": {}}])
@@ -0,0 +1,205 @@
+"""
+Columnar results of one stored batch.
+
+_process_result emits one dict per query (filter_n / val_n / rows_n ... for any number of parameters).
+ResultStorage keeps a batch as a SweepResult instead: parameter names and values shared by all
+queries (server, benchmark, query, mode) are stored once, numeric fields as typed NumPy columns and
+everything else (timing dicts, plan node lists) as plain lists. to_records() gives back the dicts.
+"""
+import re
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+
+_RE_FILTER_KEY = re.compile(r"^filter_(\d+)$")
+# Placeholder in list columns for records that do not have the key at all
+_MISSING = object()
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float, np.integer, np.floating)) and not isinstance(value, (bool, np.bool_))
+
+
+def _to_column(values: list):
+    """
+    Typed NumPy column when all values are numbers or booleans, numbers may be mixed with a single
+    kind of blank ('' or None) which is kept in a mask. Anything else stays a list.
+    Returns (column, null mask or None, null value)
+    """
+    blanks = [v for v in values if not _is_number(v)]
+    null_value = blanks[0] if blanks else None
+    if all(isinstance(v, (bool, np.bool_)) for v in values) and values:
+        return np.array(values, dtype=bool), None, None
+    if blanks and (len(blanks) == len(values) or null_value not in ("", None)
+                   or any(v is not null_value and v != null_value for v in blanks)):
+        return list(values), None, None
+    mask = np.array([not _is_number(v) for v in values], dtype=bool) if blanks else None
+    numbers = [0 if mask is not None and mask[i] else v for i, v in enumerate(values)]
+    try:
+        if all(isinstance(v, (int, np.integer)) for v in numbers):
+            return np.array(numbers, dtype=np.int64), mask, null_value
+        return np.array(numbers, dtype=np.float64), mask, null_value
+    except OverflowError:
+        return list(values), None, None
+
+
+class SweepResult:
+    def __init__(self, param_names: List[str], key_order: List[str], constants: Dict[str, Any],
+                 columns: Dict[str, Any], nulls: Dict[str, tuple], length: int):
+        # Parameter names in filter_n order, stored once for the whole batch
+        self.param_names = param_names
+        # Record keys in their original order, filter_n included
+        self.key_order = key_order
+        self.constants = constants
+        self.columns = columns
+        # key -> (mask, null value) of numeric columns with blanks
+        self.nulls = nulls
+        self.length = length
+
+    @classmethod
+    def from_records(cls, records: List[dict]) -> "SweepResult":
+        key_order: List[str] = []
+        seen = set()
+        for rec in records:
+            for key in rec:
+                if key not in seen:
+                    seen.add(key)
+                    key_order.append(key)
+
+        params = {}
+        constants, columns, nulls = {}, {}, {}
+        for key in key_order:
+            values = [rec.get(key, _MISSING) for rec in records]
+            m_filter = _RE_FILTER_KEY.match(key)
+            if m_filter and all(isinstance(v, str) and v == values[0] for v in values):
+                params[int(m_filter.group(1))] = values[0]
+                continue
+            if all(isinstance(v, str) and v == values[0] for v in values):
+                constants[key] = values[0]
+                continue
+            if any(v is _MISSING for v in values):
+                columns[key] = values
+                continue
+            column, mask, null_value = _to_column(values)
+            columns[key] = column
+            if mask is not None:
+                nulls[key] = (mask, null_value)
+        # None for a filter_n that differs between records, its values are a column then
+        param_names = [params.get(n) for n in range(1, max(params, default=0) + 1)]
+        return cls(param_names, key_order, constants, columns, nulls, len(records))
+
+    def __len__(self) -> int:
+        return self.length
+
+    def param_index(self, name: str) -> Optional[int]:
+        """
+        1-based n of the parameter (case-insensitive), the record keys are filter_n / val_n / rows_n
+        """
+        want = str(name).strip().lower()
+        for n, param in enumerate(self.param_names, start=1):
+            if param is not None and str(param).strip().lower() == want:
+                return n
+        return None
+
+    def column(self, key: str):
+        """
+        Values of a field for all records: the NumPy column itself when it has no blanks (no copy),
+        a float copy with NaN for blanks, or a list with None for records without the key
+        """
+        if key in self.constants:
+            return [self.constants[key]] * self.length
+        if key not in self.columns:
+            m_filter = _RE_FILTER_KEY.match(key)
+            if m_filter and 0 < int(m_filter.group(1)) <= len(self.param_names):
+                return [self.param_names[int(m_filter.group(1)) - 1]] * self.length
+            return [None] * self.length
+        column = self.columns[key]
+        if isinstance(column, list):
+            return [None if v is _MISSING else v for v in column]
+        if key in self.nulls:
+            column = column.astype(np.float64)
+            column[self.nulls[key][0]] = np.nan
+        return column
+
+    def get(self, key: str, default=None):
+        """
+        Value of a field shared by all records, e.g. server
+        """
+        return self.constants.get(key, default)
+
+    def set_value(self, key: str, index: int, value):
+        """
+        Update the field of a single record
+        """
+        if key in self.constants:
+            if self.constants[key] == value:
+                return
+            self.columns[key] = [self.constants.pop(key)] * self.length
+        elif key not in self.columns:
+            if key not in self.key_order:
+                self.key_order.append(key)
+            self.columns[key] = [_MISSING] * self.length
+        column = self.columns[key]
+        if isinstance(column, np.ndarray):
+            if column.dtype == bool and isinstance(value, (bool, np.bool_)) or \
+                    column.dtype != bool and _is_number(value):
+                column[index] = value
+                if key in self.nulls:
+                    self.nulls[key][0][index] = False
+                return
+            column = self._column_as_list(key)
+            self.columns[key] = column
+            self.nulls.pop(key, None)
+        column[index] = value
+
+    def _column_as_list(self, key: str) -> list:
+        column = self.columns[key]
+        if isinstance(column, list):
+            return list(column)
+        values = column.tolist()
+        if key in self.nulls:
+            mask, null_value = self.nulls[key]
+            for i in np.flatnonzero(mask):
+                values[i] = null_value
+        return values
+
+    def _record(self, index: int, columns: Dict[str, list]) -> dict:
+        record = {}
+        for key in self.key_order:
+            m_filter = _RE_FILTER_KEY.match(key)
+            if key in self.constants:
+                record[key] = self.constants[key]
+            elif key in columns:
+                value = columns[key][index]
+                if value is not _MISSING:
+                    record[key] = value
+            elif m_filter:
+                record[key] = self.param_names[int(m_filter.group(1)) - 1]
+        return record
+
+    def __getitem__(self, index: int) -> dict:
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError(index)
+        columns = {key: [self._value(key, index)] for key in self.columns}
+        return self._record(0, columns)
+
+    def _value(self, key: str, index: int):
+        column = self.columns[key]
+        if isinstance(column, list):
+            return column[index]
+        if key in self.nulls and self.nulls[key][0][index]:
+            return self.nulls[key][1]
+        return column[index].item()
+
+    def __iter__(self) -> Iterator[dict]:
+        columns = {key: self._column_as_list(key) for key in self.columns}
+        for i in range(self.length):
+            yield self._record(i, columns)
+
+    def to_records(self) -> List[dict]:
+        """
+        One dict per query, in the format _process_result produced them
+        """
+        return list(self)
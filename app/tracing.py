@@ -0,0 +1,160 @@
+"""
+Lightweight tracing spans exported in Chrome trace-event format.
+
+Events are buffered in memory and appended to the output file on flush using the
+JSON array format, which chrome://tracing and Perfetto open without a closing bracket.
+Lanes (asyncio tasks or threads) get numeric tids with a thread_name metadata event naming them.
+When tracing is disabled span() returns a shared no-op context manager.
+"""
+import asyncio
+import atexit
+import json
+import os
+import threading
+import time
+
+from app.config import load_config
+
+config = load_config()
+
+
+class _NoopSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def _current_lane() -> str:
+    """
+    Name of the trace lane (tid) for the caller: the asyncio task name inside the event loop,
+    otherwise the thread name
+    """
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        task = None
+    if task is not None:
+        return task.get_name()
+    return threading.current_thread().name
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "category", "args", "start_ns")
+
+    def __init__(self, tracer, name: str, category: str, args: dict):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+        self.start_ns = 0
+
+    def __enter__(self):
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is not None:
+            self.args["error"] = repr(exc_val)
+        self.tracer.record(self.name, self.start_ns, time.perf_counter_ns(), self.category, **self.args)
+        return False
+
+
+class Tracer:
+    def __init__(self, enabled: bool = False, output_path: str = "trace.json", flush_every: int = 10000):
+        self.enabled = enabled
+        self.output_path = output_path
+        self.flush_every = flush_every
+        self.events = []
+        self.pid = os.getpid()
+        # Lane name -> tid
+        self.lanes = {}
+        self._file_started = False
+        # Flushes run in worker threads, one writes the file at a time
+        self._write_lock = threading.Lock()
+
+    def span(self, name: str, category: str = "executor", **args):
+        """
+        Context manager measuring the enclosed block as a complete ("X") event
+        """
+        if not self.enabled:
+            return _NOOP_SPAN
+        return _Span(self, name, category, args)
+
+    def record(self, name: str, start_ns: int, end_ns: int, category: str = "executor", **args):
+        """
+        Record an already measured interval, e.g. an acquire that cannot be wrapped in a span
+        """
+        if not self.enabled:
+            return
+        self.events.append({
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": start_ns / 1000,
+            "dur": (end_ns - start_ns) / 1000,
+            "pid": self.pid,
+            "tid": self._lane_tid(_current_lane()),
+            "args": args,
+        })
+        if len(self.events) >= self.flush_every:
+            self._flush_in_background()
+
+    def _lane_tid(self, lane: str) -> int:
+        tid = self.lanes.get(lane)
+        if tid is None:
+            tid = self.lanes[lane] = len(self.lanes) + 1
+            self.events.append({"name": "thread_name", "ph": "M", "pid": self.pid, "tid": tid,
+                                "args": {"name": lane}})
+        return tid
+
+    def _take_events(self) -> list:
+        events, self.events = self.events, []
+        return events
+
+    def _write(self, events: list):
+        if not events:
+            return
+        with self._write_lock:
+            mode = "a" if self._file_started else "w"
+            with open(self.output_path, mode, encoding="utf-8") as f:
+                if not self._file_started:
+                    f.write("[\n")
+                    self._file_started = True
+                for event in events:
+                    f.write(json.dumps(event, default=str))
+                    f.write(",\n")
+
+    def _flush_in_background(self):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush()
+            return
+        loop.run_in_executor(None, self._write, self._take_events())
+
+    def flush(self):
+        """
+        Append buffered events to the trace file, blocking the caller
+        """
+        self._write(self._take_events())
+
+    async def flush_async(self):
+        """
+        Append buffered events to the trace file from a worker thread
+        """
+        if not self.events:
+            return
+        await asyncio.to_thread(self._write, self._take_events())
+
+
+tracer = Tracer(
+    enabled=bool(config.tracing.enabled),
+    output_path=config.tracing.output_path,
+)
+# Events recorded after the last batch
+atexit.register(tracer.flush)
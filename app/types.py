@@ -1,5 +1,6 @@
-from dataclasses import dataclass, asdict
-from typing import List
+import asyncio
+from dataclasses import dataclass, asdict, field
+from typing import Dict, List, Optional
 
 @dataclass
 class QueryParameter:
@@ -49,6 +50,100 @@ class BenchmarkQuery:
         }
 
 
+@dataclass
+class QueryTiming:
+    """
+    Monotonic (perf_counter_ns) latency breakdown of a single query, in nanoseconds
+    """
+    queue_wait_ns: int = 0
+    acquire_ns: int = 0
+    execute_ns: int = 0
+    fetch_ns: int = 0
+    parse_ns: int = 0
+    store_ns: int = 0
+    baseline_rtt_ns: int = 0
+
+    def to_dict(self):
+        return asdict(self)
+
+
+@dataclass
+class QueryBatch:
+    """
+    Queries of a single sweep scheduled together, with the timing info collected around it
+    """
+    queries: List[ReadyQuery]
+    benchmark_query: BenchmarkQuery
+    enqueued_ns: int = 0
+    acquire_ns: int = 0
+    baseline_rtt_ns: int = 0
+    timings: List[QueryTiming] = field(default_factory=list)
+    # Set when the batch is a chunk pulled from the job broker
+    job_id: Optional[int] = None
+    sweep_id: Optional[str] = None
+    # One of backend_service.SWEEP_MODES and CACHE_POLICIES
+    mode: str = "analyze"
+    cache_policy: str = "as_is"
+
+
+@dataclass
+class SweepState:
+    """
+    Progress of a scheduled sweep, used by the REST API and headless runner
+    """
+    sweep_id: str
+    benchmark_query: BenchmarkQuery
+    query_count: int
+    status: str = "queued"  # queued, running, done, failed
+    completed_queries: int = 0
+    # Index of the sweep's results in ResultStorage once stored
+    result_index: Optional[int] = None
+    error: Optional[str] = None
+    mode: str = "analyze"
+    cache_policy: str = "as_is"
+    # One of helpers.SWEEP_DESIGNS, budget is the query limit of the space-filling designs
+    design: str = "grid"
+    budget: Optional[int] = None
+    # Index variant sweeps: sweep id of every variant's run by variant name, see index_variants
+    variants: Dict[str, str] = field(default_factory=dict)
+    # Set on the sweep of one index variant, its results are cached apart from runs without the indexes
+    index_variant: Optional[str] = None
+    # Reuse points of earlier sweeps from the result cache instead of executing them again
+    use_cache: bool = False
+    done: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+    def to_dict(self):
+        return {
+            'sweep_id': self.sweep_id,
+            'benchmark_query': self.benchmark_query.to_dict(),
+            'query_count': self.query_count,
+            'status': self.status,
+            'completed_queries': self.completed_queries,
+            'result_index': self.result_index,
+            'error': self.error,
+            'mode': self.mode,
+            'cache_policy': self.cache_policy,
+            'design': self.design,
+            'budget': self.budget,
+            'variants': self.variants,
+            'index_variant': self.index_variant,
+            'use_cache': self.use_cache,
+        }
+
+
+@dataclass
+class RefinementState:
+    """
+    Results of a refinement sweep collected over its rounds, stored as one batch when refinement ends
+    """
+    sweep: SweepState
+    parsed_results: list = field(default_factory=list)
+    raw_results: list = field(default_factory=list)
+    batch_timings: list = field(default_factory=list)
+    round_done: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+    error: Optional[str] = None
+
+
 @dataclass
 class QueueState:
     queries_in_queue: int
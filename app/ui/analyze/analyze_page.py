@@ -4,7 +4,7 @@ import json
 from app.sampling_methods.adaptive_balanced_sampling import sample_adaptive_balanced
 from app.sampling_methods.calculate_qerr import fit_polynomial_on_sample, predict_and_qerr_for_all, summarize_qerr
 from app.sampling_methods.stratified_time_sampling import sample_stratified
-from app.ui.analyze.helpers import load_runtime_from_json, extract_filters
+from app.ui.analyze.helpers import load_runtime_from_json, extract_filters, plan_regions, cardinality_qerror_summary
 
 
 def plot_qerr(evaluation_df, filter_name: str):
@@ -33,6 +33,43 @@ upload_table_columns = [
 upload_table_rows = []
 upload_list = []
 
+plan_region_columns = [
+    {'name': 'server', 'label': 'Server', 'field': 'server'},
+    {'name': 'context', 'label': 'Other Parameters', 'field': 'context'},
+    {'name': 'plan', 'label': 'Plan', 'field': 'plan'},
+    {'name': 'from', 'label': 'From', 'field': 'from'},
+    {'name': 'to', 'label': 'To', 'field': 'to'},
+    {'name': 'points', 'label': 'Points', 'field': 'points'},
+]
+
+plan_switch_columns = [
+    {'name': 'server', 'label': 'Server', 'field': 'server'},
+    {'name': 'context', 'label': 'Other Parameters', 'field': 'context'},
+    {'name': 'after', 'label': 'After', 'field': 'after'},
+    {'name': 'before', 'label': 'Before', 'field': 'before'},
+    {'name': 'from_plan', 'label': 'From Plan', 'field': 'from_plan'},
+    {'name': 'to_plan', 'label': 'To Plan', 'field': 'to_plan'},
+]
+
+cardinality_node_columns = [
+    {'name': 'server', 'label': 'Server', 'field': 'server'},
+    {'name': 'node', 'label': 'Plan Node', 'field': 'node'},
+    {'name': 'count', 'label': 'Count', 'field': 'count'},
+    {'name': 'median', 'label': 'Median Q-Error', 'field': 'median'},
+    {'name': 'p90', 'label': 'P90 Q-Error', 'field': 'p90'},
+    {'name': 'max', 'label': 'Max Q-Error', 'field': 'max'},
+]
+
+cardinality_selectivity_columns = [
+    {'name': 'server', 'label': 'Server', 'field': 'server'},
+    {'name': 'from', 'label': 'From', 'field': 'from'},
+    {'name': 'to', 'label': 'To', 'field': 'to'},
+    {'name': 'points', 'label': 'Points', 'field': 'points'},
+    {'name': 'median', 'label': 'Median Q-Error', 'field': 'median'},
+    {'name': 'p90', 'label': 'P90 Q-Error', 'field': 'p90'},
+    {'name': 'max', 'label': 'Max Q-Error', 'field': 'max'},
+]
+
 
 def analyze_page():
     # TODO: Read filters from first entry
@@ -64,6 +101,32 @@ def analyze_page():
 
         pass
 
+    def on_click_plan_regions():
+        """
+        Show parameter ranges per plan and the switch points between plans for the selected filter
+        """
+        row_id = upload_table.selected[0].get("id")
+        dataset = upload_list[row_id]
+        regions, switches = plan_regions(dataset, filters_select.value)
+        if not regions:
+            ui.notify("Selected result has no plan fingerprints")
+            return
+        plan_region_table.rows = regions
+        plan_switch_table.rows = switches
+
+    def on_click_cardinality_qerror():
+        """
+        Show the optimizer's cardinality q-error per plan node and along the selected filter
+        """
+        row_id = upload_table.selected[0].get("id")
+        dataset = upload_list[row_id]
+        nodes, selectivity = cardinality_qerror_summary(dataset, filters_select.value)
+        if not nodes:
+            ui.notify("Selected result has no cardinality estimates")
+            return
+        cardinality_node_table.rows = nodes
+        cardinality_selectivity_table.rows = selectivity
+
     def on_select_upload_table():
         """
         When selected row changes in UploadTable, update filters with new row filters
@@ -114,3 +177,14 @@ def analyze_page():
     sampling_method_select = ui.select(options=["Stratified", "Adaptive"])
     filters_select = ui.select(options=[])
     ui.button("Calculate QError", on_click=on_click_calculate_qerr)
+    ui.button("Plan Regions", on_click=on_click_plan_regions)
+    ui.button("Cardinality Q-Error", on_click=on_click_cardinality_qerror)
+
+    ui.label("Plan Regions")
+    plan_region_table = ui.table(columns=plan_region_columns, rows=[])
+    ui.label("Plan Switch Points")
+    plan_switch_table = ui.table(columns=plan_switch_columns, rows=[])
+    ui.label("Cardinality Q-Error per Plan Node")
+    cardinality_node_table = ui.table(columns=cardinality_node_columns, rows=[])
+    ui.label("Cardinality Q-Error along Filter")
+    cardinality_selectivity_table = ui.table(columns=cardinality_selectivity_columns, rows=[])
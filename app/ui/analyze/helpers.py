@@ -4,7 +4,10 @@ from typing import Optional, Tuple, List
 import numpy as np
 import pandas as pd
 
+from app.plan_fingerprint import strip_literals
 from app.sampling_methods.adaptive_balanced_sampling import _coerce_numeric
+from app.sampling_methods.calculate_qerr import summarize_qerr
+from app.sweep_result import SweepResult
 
 _DB_KEYS = {
     "postgres": ("postgres", "postgre", "pgsql", "psql"),
@@ -26,11 +29,11 @@ def _find_filter_slot(rec: dict, filter_name: str) -> Optional[int]:
     if not filter_name:
         return None
     want = str(filter_name).strip().lower()
-    for n in range(1, 10):  # support up to filter_9; adjust if you need more
-        key = f"filter_{n}"
-        if key in rec and rec[key] is not None:
-            if str(rec[key]).strip().lower() == want:
-                return n
+    n = 1
+    while f"filter_{n}" in rec:
+        if rec[f"filter_{n}"] is not None and str(rec[f"filter_{n}"]).strip().lower() == want:
+            return n
+        n += 1
     return None
 
 def _encode_feature_series(raw_vals: pd.Series) -> Tuple[pd.Series, pd.Series]:
@@ -61,7 +64,7 @@ def _encode_feature_series(raw_vals: pd.Series) -> Tuple[pd.Series, pd.Series]:
 
 
 def load_runtime_from_json(
-    records: List[dict],
+    records,
     filter_name: str,
     extra_cols: Optional[List[str]] = None,
 ) -> pd.DataFrame:
@@ -72,7 +75,13 @@ def load_runtime_from_json(
       - rows := corresponding `rows_n`
       - postgres_time / duck_time / mysql_time set from `server` + `runtime`
       - pass through any extra_cols; also keep _server/_database/_query
+    records is a list of result dicts or a SweepResult, whose columns are used as they are.
     """
+    if isinstance(records, SweepResult):
+        if records.get("server") is not None:
+            return _load_runtime_from_sweep(records, filter_name, extra_cols)
+        records = records.to_records()
+
     extra_cols = set(extra_cols or [])
     for rec in records:
         for k in rec.keys():
@@ -124,7 +133,10 @@ def load_runtime_from_json(
 
     df = pd.DataFrame(rows_out)
 
-    feature_raw_series = pd.Series(raw_feature_vals, index=df.index)
+    return _finish_runtime_frame(df, pd.Series(raw_feature_vals, index=df.index))
+
+
+def _finish_runtime_frame(df: pd.DataFrame, feature_raw_series: pd.Series) -> pd.DataFrame:
     range_vals, _ = _encode_feature_series(feature_raw_series)
     df["range_value"] = range_vals
 
@@ -136,9 +148,158 @@ def load_runtime_from_json(
     return df
 
 
-def extract_filters(entry, max_filters=3):
-    return [
-        entry[f"filter_{i}"]
-        for i in range(1, max_filters + 1)
-        if entry.get(f"filter_{i}")
+def _load_runtime_from_sweep(result: SweepResult, filter_name: str,
+                             extra_cols: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    load_runtime_from_json for a SweepResult of a single server, built from its columns
+    """
+    n = result.param_index(filter_name)
+    if n is None or len(result) == 0:
+        return load_runtime_from_json([], filter_name)
+
+    engine = _server_to_engine(result.get("server"))
+    runtime = _coerce_numeric(pd.Series(result.column("runtime"), copy=False))
+    empty = np.full(len(result), np.nan)
+    columns = {
+        "postgres_time": runtime if engine == "postgres" else empty,
+        "duck_time": runtime if engine == "duck" else empty,
+        "mysql_time": runtime if engine == "mysql" else empty,
+        filter_name: result.column(f"val_{n}"),
+        "rows": result.column(f"rows_{n}"),
+        "_server": result.column("server"),
+        "_database": result.column("database"),
+        "_query": result.column("query"),
+    }
+    extra = set(extra_cols or [])
+    extra.update(k for k in result.key_order if re.match(r"^(filter|val|rows)_\d+$", str(k), flags=re.I))
+    for c in extra:
+        columns[c] = result.column(c)
+    df = pd.DataFrame(columns, copy=False)
+
+    return _finish_runtime_frame(df, pd.Series(result.column(f"val_{n}"), copy=False))
+
+
+def extract_filters(entry):
+    """
+    Parameter names of a result dict (filter_1, filter_2, ...) or a SweepResult
+    """
+    if isinstance(entry, SweepResult):
+        return [name for name in entry.param_names if name]
+    filters = []
+    n = 1
+    while f"filter_{n}" in entry:
+        if entry[f"filter_{n}"]:
+            filters.append(entry[f"filter_{n}"])
+        n += 1
+    return filters
+
+
+def _sort_key(value):
+    try:
+        return 0, float(value), ""
+    except (TypeError, ValueError):
+        return 1, 0.0, str(value)
+
+
+def plan_regions(records: List[dict], filter_name: str) -> Tuple[List[dict], List[dict]]:
+    """
+    Find the `filter_name` value ranges where each plan (plan_fingerprint) was chosen.
+    Points are grouped by server and the values of the other parameters, so every group is a
+    line through the sweep along `filter_name`.
+    Returns (regions, switches):
+      regions  : contiguous runs of one plan -> server, context, plan, from, to, points
+      switches : boundaries between runs     -> server, context, after, before, from_plan, to_plan
+    """
+    lines = {}
+    for rec in records:
+        fingerprint = rec.get("plan_fingerprint")
+        n = _find_filter_slot(rec, filter_name)
+        if not fingerprint or n is None:
+            continue
+        context = []
+        k = 1
+        while f"filter_{k}" in rec:
+            if k != n and rec.get(f"filter_{k}"):
+                context.append(f"{rec[f'filter_{k}']}={rec.get(f'val_{k}')}")
+            k += 1
+        key = (rec.get("server"), ", ".join(context))
+        lines.setdefault(key, []).append((rec.get(f"val_{n}"), fingerprint))
+
+    regions, switches = [], []
+    for (server, context), points in lines.items():
+        points.sort(key=lambda p: _sort_key(p[0]))
+        run_start = 0
+        for i in range(1, len(points) + 1):
+            if i < len(points) and points[i][1] == points[run_start][1]:
+                continue
+            regions.append({
+                "server": server,
+                "context": context,
+                "plan": points[run_start][1],
+                "from": points[run_start][0],
+                "to": points[i - 1][0],
+                "points": i - run_start,
+            })
+            if i < len(points):
+                switches.append({
+                    "server": server,
+                    "context": context,
+                    "after": points[i - 1][0],
+                    "before": points[i][0],
+                    "from_plan": points[i - 1][1],
+                    "to_plan": points[i][1],
+                })
+            run_start = i
+    return regions, switches
+
+
+def cardinality_qerror_summary(records: List[dict], filter_name: str, bins: int = 10) -> Tuple[List[dict], List[dict]]:
+    """
+    Aggregate the optimizer's cardinality q-error over a sweep.
+    Returns (nodes, selectivity):
+      nodes       : per server and plan node (literals stripped) -> server, node, count, median, p90, max
+      selectivity : per server and `filter_name` value bin, q-error of the nodes filtering on it
+                    -> server, from, to, points, median, p90, max
+    """
+    node_qerr = {}
+    filter_points = []
+    for rec in records:
+        server = rec.get("server")
+        for node in rec.get("node_cardinalities") or []:
+            node_qerr.setdefault((server, strip_literals(node["node"])), []).append(node["q_error"])
+        n = _find_filter_slot(rec, filter_name)
+        if n is not None and rec.get(f"qerror_{n}") is not None:
+            filter_points.append({"server": server, "value": rec.get(f"val_{n}"), "q_error": rec[f"qerror_{n}"]})
+
+    def stats(values) -> dict:
+        summary = summarize_qerr(pd.Series(values, dtype=float))
+        return {
+            "median": round(summary["median_qerr"], 3),
+            "p90": round(summary["p90_qerr"], 3),
+            "max": round(summary["max_qerr"], 3),
+        }
+
+    nodes = [
+        {"server": server, "node": node, "count": len(values), **stats(values)}
+        for (server, node), values in node_qerr.items()
     ]
+    nodes.sort(key=lambda row: row["max"], reverse=True)
+
+    selectivity = []
+    if filter_points:
+        df = pd.DataFrame(filter_points)
+        df["range_value"], _ = _encode_feature_series(df["value"])
+        df = df.dropna(subset=["range_value"])
+        for server, group in df.groupby("server", sort=True):
+            n_bins = max(1, min(bins, group["range_value"].nunique()))
+            group = group.assign(bin=pd.cut(group["range_value"], bins=n_bins, include_lowest=True))
+            for _, in_bin in group.groupby("bin", observed=True):
+                ordered = in_bin.sort_values("range_value")
+                selectivity.append({
+                    "server": server,
+                    "from": ordered["value"].iloc[0],
+                    "to": ordered["value"].iloc[-1],
+                    "points": len(in_bin),
+                    **stats(in_bin["q_error"]),
+                })
+    return nodes, selectivity
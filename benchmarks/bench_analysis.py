@@ -0,0 +1,33 @@
+"""
+Analyze page path: result loading, sampling and q-error evaluation over 100k results
+"""
+from app.sampling_methods.adaptive_balanced_sampling import sample_adaptive_balanced
+from app.sampling_methods.calculate_qerr import fit_polynomial_on_sample, predict_and_qerr_for_all
+from app.sampling_methods.stratified_time_sampling import sample_stratified
+from app.sweep_result import SweepResult
+from app.ui.analyze.helpers import load_runtime_from_json
+
+
+def bench_load_runtime_from_json(benchmark, result_records):
+    benchmark(load_runtime_from_json, result_records, "o_totalprice")
+
+
+def bench_load_runtime_from_sweep_result(benchmark, result_records):
+    """
+    Same load from a stored (columnar) batch of a single server
+    """
+    sweep_result = SweepResult.from_records([r for r in result_records if r['server'] == "Postgres"])
+    benchmark(load_runtime_from_json, sweep_result, "o_totalprice")
+
+
+def bench_sample_adaptive_balanced(benchmark, runtime_frame):
+    benchmark(sample_adaptive_balanced, runtime_frame)
+
+
+def bench_sample_stratified(benchmark, runtime_frame):
+    benchmark(sample_stratified, runtime_frame)
+
+
+def bench_predict_and_qerr_for_all(benchmark, runtime_frame):
+    model = fit_polynomial_on_sample(sample_stratified(runtime_frame), filter_name="o_totalprice")
+    benchmark(predict_and_qerr_for_all, runtime_frame, model, filter_name="o_totalprice")
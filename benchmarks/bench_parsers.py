@@ -0,0 +1,63 @@
+"""
+Plan parsers of app/analyze_parsers.py on plans with a few hundred nodes
+"""
+import pytest
+
+from app.analyze_parsers import parse_analyze_mysql, extract_total_runtime, extract_runtime_and_filter_scans_duckdb, \
+    extract_runtime_and_filter_scans_postgres, extract_estimates_postgres, extract_estimates_mysql, \
+    extract_estimates_duckdb, extract_node_cardinalities_postgres, extract_node_cardinalities_mysql, \
+    extract_node_cardinalities_duckdb, extract_buffers_postgres, extract_io_duckdb, parse_plan
+
+
+def bench_parse_analyze_mysql(benchmark, mysql_plan, filters):
+    benchmark(parse_analyze_mysql, mysql_plan, filters)
+
+
+def bench_extract_total_runtime(benchmark, mysql_plan):
+    benchmark(extract_total_runtime, mysql_plan)
+
+
+def bench_extract_runtime_and_filter_scans_postgres(benchmark, postgres_plan, filters):
+    benchmark(extract_runtime_and_filter_scans_postgres, postgres_plan, filters)
+
+
+def bench_extract_runtime_and_filter_scans_duckdb(benchmark, duckdb_profile, filters):
+    benchmark(extract_runtime_and_filter_scans_duckdb, duckdb_profile, filters)
+
+
+def bench_extract_node_cardinalities_postgres(benchmark, postgres_plan, filters):
+    benchmark(extract_node_cardinalities_postgres, postgres_plan, filters)
+
+
+def bench_extract_node_cardinalities_mysql(benchmark, mysql_plan, filters):
+    benchmark(extract_node_cardinalities_mysql, mysql_plan, filters)
+
+
+def bench_extract_node_cardinalities_duckdb(benchmark, duckdb_profile, filters):
+    benchmark(extract_node_cardinalities_duckdb, duckdb_profile, filters)
+
+
+def bench_extract_buffers_postgres(benchmark, postgres_plan):
+    benchmark(extract_buffers_postgres, postgres_plan)
+
+
+def bench_extract_io_duckdb(benchmark, duckdb_profile):
+    benchmark(extract_io_duckdb, duckdb_profile)
+
+
+@pytest.mark.parametrize("db_type, extract", [
+    ("Postgres", extract_estimates_postgres),
+    ("MySQL", extract_estimates_mysql),
+    ("DuckDB", extract_estimates_duckdb),
+])
+def bench_extract_estimates(benchmark, estimate_plans, filters, db_type, extract):
+    benchmark(extract, estimate_plans[db_type], filters)
+
+
+@pytest.mark.parametrize("db_type", ["Postgres", "MySQL", "DuckDB"])
+def bench_parse_plan(benchmark, postgres_plan, mysql_plan, duckdb_profile, filters, db_type):
+    """
+    Everything the parse stage runs per executed query
+    """
+    plan = {"Postgres": postgres_plan, "MySQL": mysql_plan, "DuckDB": duckdb_profile}[db_type]
+    benchmark(parse_plan, db_type, plan, filters)
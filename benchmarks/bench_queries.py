@@ -0,0 +1,24 @@
+"""
+Sweep grid expansion and space-filling designs
+"""
+import pytest
+
+import synthetic
+from app.helpers import build_all_queries
+
+
+@pytest.mark.parametrize("points, variables", [(1000, 1), (50, 3)])
+def bench_build_all_queries(benchmark, points, variables):
+    template = synthetic.grid_template(variables)
+    ranges = synthetic.grid_ranges(points, variables)
+    # The 125k query grid takes seconds per call, a few rounds are enough
+    queries = benchmark.pedantic(build_all_queries, args=(template, ranges), rounds=3, iterations=1)
+    assert len(queries) == points ** variables
+
+
+@pytest.mark.parametrize("design", ["lhs", "sobol", "halton", "random"])
+def bench_build_design_queries(benchmark, design):
+    template = synthetic.grid_template(4)
+    ranges = synthetic.grid_ranges(1000, 4)
+    queries = benchmark(build_all_queries, template, ranges, design, 500, 0)
+    assert 0 < len(queries) <= 500
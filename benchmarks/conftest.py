@@ -0,0 +1,46 @@
+"""
+Session wide synthetic inputs, generated once and shared by all benchmarks
+"""
+import pytest
+
+import synthetic
+
+
+@pytest.fixture(scope="session")
+def postgres_plan():
+    return synthetic.postgres_plan()
+
+
+@pytest.fixture(scope="session")
+def mysql_plan():
+    return synthetic.mysql_plan()
+
+
+@pytest.fixture(scope="session")
+def duckdb_profile():
+    return synthetic.duckdb_profile()
+
+
+@pytest.fixture(scope="session")
+def estimate_plans():
+    return {
+        "Postgres": synthetic.postgres_estimate_plan(),
+        "MySQL": synthetic.mysql_estimate_plan(),
+        "DuckDB": synthetic.duckdb_estimate_plan(),
+    }
+
+
+@pytest.fixture(scope="session")
+def filters():
+    return synthetic.FILTERS
+
+
+@pytest.fixture(scope="session")
+def result_records():
+    return synthetic.result_records()
+
+
+@pytest.fixture(scope="session")
+def runtime_frame(result_records):
+    from app.ui.analyze.helpers import load_runtime_from_json
+    return load_runtime_from_json(result_records, "o_totalprice")
@@ -0,0 +1,113 @@
+"""
+Scheduler, parse stage and result storage under load from simulated engines.
+
+Every engine is replaced by app/simulated_client, so no database has to be reachable and millions of
+queries can be pushed through dispatch, parsing and storage. Latency, failure rate and connection limits
+come from the simulation section of settings.yaml and can be overridden here.
+
+Run from the repository root:
+    python -m benchmarks.simulated_scale --sweeps 300 --points 3500 --latency-ms 0.5
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import List
+
+from app.backend_service import BackendService
+from app.helpers import extract_variables
+from app.types import BenchmarkQuery
+from benchmarks.throughput import QUERIES, STAGES, config, percentile, rss_bytes, sweep_ranges
+
+ENGINES = ["MySQL", "Postgres", "DuckDB"]
+
+
+async def run(engines: List[str], sweeps: int, points: int, mode: str) -> dict:
+    backend_service = BackendService(executor_mode="local")
+    await backend_service.initialize_queue_worker()
+    simulated_engines = backend_service.queue_worker.simulated_engines
+
+    rss_before = rss_bytes()
+    start_ns = time.perf_counter_ns()
+    sweep_ids = []
+    names = list(QUERIES)
+    for i in range(sweeps):
+        name = names[i % len(names)]
+        template, parameters = QUERIES[name]
+        benchmark_query = BenchmarkQuery(template, extract_variables(template), engines[i % len(engines)], "tpch",
+                                         name)
+        sweep_ids.append(await backend_service.schedule_query_exectution(
+            benchmark_query, sweep_ranges(parameters, points), mode=mode))
+    sweep_states = [backend_service.sweeps[sweep_id] for sweep_id in sweep_ids]
+    await asyncio.gather(*(sweep.done.wait() for sweep in sweep_states))
+    elapsed = (time.perf_counter_ns() - start_ns) / 1e9
+    rss_after = rss_bytes()
+
+    stage_values = {stage: [] for stage in STAGES}
+    stored = 0
+    for sweep in sweep_states:
+        if sweep.result_index is None:
+            print(f"Sweep {sweep.sweep_id} failed:", sweep.error)
+            continue
+        results = backend_service.result_storage.parsed_result_list[sweep.result_index]
+        stored += len(results)
+        for stage in STAGES:
+            stage_values[stage].extend(timing[stage] / 1e6 for timing in results.column('timing'))
+    backend_service.parse_stage.shutdown()
+
+    executed = sum(engine.queries for engine in simulated_engines.values())
+    return {
+        'engines': engines,
+        'executed': executed,
+        'failed': sum(engine.failures for engine in simulated_engines.values()),
+        'stored': stored,
+        'seconds': elapsed,
+        'queries_per_second': executed / elapsed if elapsed else 0.0,
+        'stages_ms': {stage: {'p50': percentile(values, 50), 'p99': percentile(values, 99)}
+                      for stage, values in stage_values.items()},
+        'rss_growth_mb': (rss_after - rss_before) / 1024 / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--engines", nargs="+", default=ENGINES, choices=ENGINES)
+    parser.add_argument("--sweeps", type=int, default=30, help="Sweeps, spread round robin over the engines")
+    parser.add_argument("--points", type=int, default=1000, help="Queries per sweep (approximately)")
+    parser.add_argument("--mode", default="analyze", help="Sweep mode, see backend_service.SWEEP_MODES")
+    parser.add_argument("--latency-ms", type=float, help="Median simulated latency of every engine")
+    parser.add_argument("--failure-rate", type=float, help="Failure rate of every engine")
+    parser.add_argument("--max-connections", type=int, help="Connection limit of every engine")
+    parser.add_argument("--workers", type=int, default=config.executor.workers)
+    parser.add_argument("--parse-workers", type=int, default=config.parsing.workers)
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    config.simulation.enabled = True
+    config.database.mysql.enabled = "MySQL" in args.engines
+    config.database.postgres.enabled = "Postgres" in args.engines
+    config.database.duckdb.enabled = "DuckDB" in args.engines
+    config.executor.workers = args.workers
+    config.executor.duckdb_concurrency = args.workers
+    config.parsing.workers = args.parse_workers
+    for params in config.simulation.engines.values():
+        if args.latency_ms is not None:
+            params.latency_ms = args.latency_ms
+        if args.failure_rate is not None:
+            params.failure_rate = args.failure_rate
+        if args.max_connections is not None:
+            params.max_connections = args.max_connections
+
+    result = asyncio.run(run(args.engines, args.sweeps, args.points, args.mode))
+    print(f"{result['executed']} queries ({result['failed']} failed, {result['stored']} stored) in "
+          f"{result['seconds']:.1f} s, {result['queries_per_second']:.0f} q/s, "
+          f"RSS +{result['rss_growth_mb']:.1f} MB")
+    for stage, values in result['stages_ms'].items():
+        print(f"  {stage[:-3]:>12}  p50 {values['p50']:9.3f} ms  p99 {values['p99']:9.3f} ms")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""
+Synthetic but realistically shaped inputs for the benchmarks.
+
+Plans are generated as left deep join trees over TPC-H tables with filters on the sweep variables,
+in the output format of each engine (Postgres EXPLAIN ANALYZE text, MySQL EXPLAIN ANALYZE tree,
+DuckDB JSON profile and the JSON EXPLAIN formats of estimate sweeps). Everything is seeded.
+"""
+import json
+import random
+from typing import List
+
+TABLES = ["lineitem", "orders", "customer", "part", "partsupp", "supplier", "nation", "region"]
+FILTERS = ["o_totalprice", "l_quantity", "c_acctbal", "p_size", "s_acctbal"]
+# Text plans repeat join subtrees of this depth, real plans are wide rather than hundreds of levels deep
+MAX_DEPTH = 12
+
+
+def _rows(rng: random.Random) -> int:
+    return int(rng.lognormvariate(8, 2))
+
+
+def postgres_plan(joins: int = 200, seed: int = 0) -> str:
+    """
+    EXPLAIN (ANALYZE, BUFFERS) text of join trees with a filtered scan below every join
+    """
+    rng = random.Random(seed)
+    lines = []
+
+    def node(depth: int, label: str, loops: int = 1):
+        indent = "  " * (3 * depth) if depth else ""
+        arrow = "->  " if depth else ""
+        est, act = _rows(rng), _rows(rng)
+        start = rng.uniform(0, 10)
+        lines.append(f"{indent}{arrow}{label}  (cost={start:.2f}..{start + rng.uniform(1, 1e5):.2f} "
+                     f"rows={est} width={rng.randint(4, 120)}) "
+                     f"(actual time={start:.3f}..{start + rng.uniform(0, 500):.3f} rows={act} loops={loops})")
+        return indent + ("      " if depth else "  ")
+
+    for join in range(joins):
+        depth = join % MAX_DEPTH
+        detail = node(depth, rng.choice(["Hash Join", "Nested Loop", "Merge Join"]))
+        lines.append(f"{detail}Hash Cond: ({TABLES[depth % 8]}.k = {TABLES[(depth + 1) % 8]}.k)")
+        lines.append(f"{detail}Buffers: shared hit={rng.randint(0, 10 ** 6)} read={rng.randint(0, 10 ** 5)}")
+        scan_detail = node(depth + 1, f"Seq Scan on {TABLES[depth % 8]}", loops=rng.randint(1, 4))
+        column = FILTERS[join % len(FILTERS)]
+        lines.append(f"{scan_detail}Filter: ({column} < '{rng.randint(1, 10 ** 5)}'::numeric)")
+        lines.append(f"{scan_detail}Rows Removed by Filter: {_rows(rng)}")
+        lines.append(f"{scan_detail}Buffers: shared hit={rng.randint(0, 10 ** 5)} read={rng.randint(0, 10 ** 4)}")
+    lines.append("Planning:")
+    lines.append("  Buffers: shared hit=120")
+    lines.append(f"Planning Time: {rng.uniform(0, 5):.3f} ms")
+    lines.append(f"Execution Time: {rng.uniform(10, 10 ** 5):.3f} ms")
+    return "\n".join(lines)
+
+
+def mysql_plan(joins: int = 200, seed: int = 0) -> str:
+    """
+    EXPLAIN ANALYZE trees of MySQL with a filter and a table scan below every join
+    """
+    rng = random.Random(seed)
+    lines = []
+
+    def node(depth: int, label: str):
+        start = rng.uniform(0, 10)
+        lines.append(f"{'    ' * depth}-> {label}  (cost={rng.uniform(1, 1e6):.4g} rows={_rows(rng)}) "
+                     f"(actual time={start:.3f}..{start + rng.uniform(0, 500):.3f} rows={_rows(rng)} "
+                     f"loops={rng.randint(1, 4)})")
+
+    for join in range(joins):
+        depth = join % MAX_DEPTH
+        node(2 * depth, "Nested loop inner join")
+        column = FILTERS[join % len(FILTERS)]
+        node(2 * depth + 1, f"Filter: ({TABLES[depth % 8]}.{column} < {rng.randint(1, 10 ** 5)})")
+        node(2 * depth + 2, f"Table scan on {TABLES[depth % 8]}")
+    return "\n".join(lines)
+
+
+def _duckdb_operator(rng: random.Random, depth: int, joins: int) -> dict:
+    table = TABLES[depth % 8]
+    scan = {
+        "operator_name": "TABLE_SCAN",
+        "operator_cardinality": _rows(rng),
+        "operator_rows_scanned": _rows(rng),
+        "operator_timing": rng.uniform(0, 1),
+        "extra_info": {
+            "Table": table,
+            "Filters": f"{FILTERS[depth % len(FILTERS)]}<{rng.randint(1, 10 ** 5)}",
+            "Estimated Cardinality": str(_rows(rng)),
+        },
+        "children": [],
+    }
+    children = [scan]
+    if depth + 1 < joins:
+        children.insert(0, _duckdb_operator(rng, depth + 1, joins))
+    return {
+        "operator_name": "HASH_JOIN",
+        "operator_cardinality": _rows(rng),
+        "operator_timing": rng.uniform(0, 1),
+        "extra_info": {"Join Type": "INNER", "Conditions": f"{table}.k = k",
+                       "Estimated Cardinality": str(_rows(rng))},
+        "children": children,
+    }
+
+
+def duckdb_profile(joins: int = 200, seed: int = 0) -> str:
+    """
+    JSON profile of DuckDB (enable_profiling = 'json')
+    """
+    rng = random.Random(seed)
+    return json.dumps({
+        "latency": rng.uniform(0, 10),
+        "total_bytes_read": rng.randint(0, 10 ** 9),
+        "cumulative_rows_scanned": rng.randint(0, 10 ** 8),
+        "children": [_duckdb_operator(rng, 0, joins)],
+    })
+
+
+def postgres_estimate_plan(joins: int = 200, seed: int = 0) -> str:
+    """
+    EXPLAIN (FORMAT JSON) of Postgres
+    """
+    rng = random.Random(seed)
+
+    def node(depth: int) -> dict:
+        scan = {"Node Type": "Seq Scan", "Relation Name": TABLES[depth % 8], "Total Cost": rng.uniform(1, 1e5),
+                "Plan Rows": _rows(rng), "Filter": f"({FILTERS[depth % len(FILTERS)]} < {rng.randint(1, 10 ** 5)})"}
+        plans = [scan] if depth + 1 >= joins else [node(depth + 1), scan]
+        return {"Node Type": "Hash Join", "Join Type": "Inner", "Total Cost": rng.uniform(1, 1e6),
+                "Plan Rows": _rows(rng), "Plans": plans}
+
+    return json.dumps([{"Plan": node(0)}])
+
+
+def mysql_estimate_plan(joins: int = 200, seed: int = 0) -> str:
+    """
+    EXPLAIN FORMAT=JSON of MySQL in explain_json_format_version=2
+    """
+    rng = random.Random(seed)
+
+    def node(depth: int) -> dict:
+        scan = {"operation": f"Filter: {FILTERS[depth % len(FILTERS)]} < {rng.randint(1, 10 ** 5)}",
+                "condition": f"({TABLES[depth % 8]}.{FILTERS[depth % len(FILTERS)]} < {rng.randint(1, 10 ** 5)})",
+                "estimated_rows": _rows(rng), "estimated_total_cost": rng.uniform(1, 1e5),
+                "inputs": [{"operation": f"Table scan on {TABLES[depth % 8]}", "table_name": TABLES[depth % 8],
+                            "estimated_rows": _rows(rng), "estimated_total_cost": rng.uniform(1, 1e5)}]}
+        inputs = [scan] if depth + 1 >= joins else [node(depth + 1), scan]
+        return {"operation": "Inner hash join", "estimated_rows": _rows(rng),
+                "estimated_total_cost": rng.uniform(1, 1e6), "inputs": inputs}
+
+    return json.dumps(node(0))
+
+
+def duckdb_estimate_plan(joins: int = 200, seed: int = 0) -> str:
+    """
+    EXPLAIN (FORMAT JSON) of DuckDB
+    """
+    rng = random.Random(seed)
+
+    def node(depth: int) -> dict:
+        scan = {"name": "SEQ_SCAN ", "children": [],
+                "extra_info": {"Table": TABLES[depth % 8],
+                               "Filters": f"{FILTERS[depth % len(FILTERS)]}<{rng.randint(1, 10 ** 5)}",
+                               "Estimated Cardinality": str(_rows(rng))}}
+        children = [scan] if depth + 1 >= joins else [node(depth + 1), scan]
+        return {"name": "HASH_JOIN", "children": children,
+                "extra_info": {"Join Type": "INNER", "Estimated Cardinality": str(_rows(rng))}}
+
+    return json.dumps([node(0)])
+
+
+def result_records(count: int = 100_000, seed: int = 0) -> List[dict]:
+    """
+    Result dicts as _process_result produces them for a two parameter sweep over all engines
+    """
+    rng = random.Random(seed)
+    servers = ["Postgres", "MySQL", "DuckDB"]
+    records = []
+    for i in range(count):
+        price = i % 2000
+        quantity = (i // 2000) % 50
+        records.append({
+            'server': servers[i % 3],
+            'database': "tpch_1",
+            'query': "q6",
+            'mode': "analyze",
+            'runtime': rng.lognormvariate(0, 1) * (1 + price / 200),
+            'filter_1': "o_totalprice", 'val_1': price, 'rows_1': rng.randint(0, 10 ** 6),
+            'filter_2': "l_quantity", 'val_2': quantity, 'rows_2': rng.randint(0, 10 ** 6),
+            'filter_3': "", 'val_3': "", 'rows_3': "",
+            'plan_fingerprint': f"{price // 500:016x}",
+        })
+    return records
+
+
+def grid_ranges(points_per_variable: int = 50, variables: int = 3) -> List[dict]:
+    """
+    build_all_queries ranges for a full factorial grid, points_per_variable ** variables queries
+    """
+    return [{'name': f"v{n}", 'range': (1, points_per_variable, 1), 'type': "INT" if n % 2 else "FLOAT"}
+            for n in range(variables)]
+
+
+def grid_template(variables: int = 3) -> str:
+    conditions = " AND ".join(f"c{n} < {{{{v{n}:{'INT' if n % 2 else 'FLOAT'}}}}}" for n in range(variables))
+    return f"SELECT count(*) FROM lineitem WHERE {conditions}"
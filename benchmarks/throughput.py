@@ -0,0 +1,184 @@
+"""
+End-to-end executor throughput on a local DuckDB TPC-H database.
+
+Generates a small TPC-H database with DuckDB's dbgen (no external services), then runs the same set of
+sweeps through BackendService once per concurrency setting and reports queries per second, latency
+percentiles of every stage (queue wait, pool acquire, execute, fetch, parse, store) and process memory growth.
+Concurrent batches each have their own DuckDB connection and run their statements in worker threads.
+
+Run from the repository root:
+    python -m benchmarks.throughput --scale-factor 0.01 --concurrency 1 2 4 --sweeps 8 --points 25
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import tempfile
+import time
+from typing import Dict, List
+
+import duckdb
+
+from app.backend_service import BackendService
+from app.config import load_config
+from app.helpers import extract_variables
+from app.types import BenchmarkQuery
+
+config = load_config()
+
+# Parameterized TPC-H style queries with the range each parameter is swept over
+QUERIES = {
+    "q6_quantity": (
+        "SELECT sum(l_extendedprice * l_discount) FROM lineitem "
+        "WHERE l_quantity < {{quantity:INT}} AND l_discount BETWEEN 0.05 AND 0.07",
+        {"quantity": (1, 50)},
+    ),
+    "orders_price": (
+        "SELECT o_orderpriority, count(*) FROM orders WHERE o_totalprice < {{price:INT}} GROUP BY o_orderpriority",
+        {"price": (1000, 500000)},
+    ),
+    "customer_orders": (
+        "SELECT count(*) FROM orders JOIN customer ON o_custkey = c_custkey "
+        "WHERE c_acctbal < {{balance:INT}} AND o_totalprice < {{price:INT}}",
+        {"balance": (-999, 9999), "price": (1000, 500000)},
+    ),
+}
+STAGES = ("queue_wait_ns", "acquire_ns", "execute_ns", "fetch_ns", "parse_ns", "store_ns")
+
+
+def generate_database(path: str, scale_factor: float):
+    """
+    Create the TPC-H tables with dbgen, an existing database file is reused
+    """
+    con = duckdb.connect(path)
+    try:
+        tables = {row[0] for row in con.execute("SHOW TABLES").fetchall()}
+        if "lineitem" in tables:
+            return
+        print(f"Generating TPC-H sf={scale_factor} into {path}")
+        con.execute("INSTALL tpch")
+        con.execute("LOAD tpch")
+        con.execute(f"CALL dbgen(sf={scale_factor})")
+    finally:
+        con.close()
+
+
+def sweep_ranges(parameters: Dict[str, tuple], points: int) -> List[dict]:
+    """
+    build_all_queries ranges with about `points` queries per sweep, spread over the parameters
+    """
+    per_parameter = max(1, round(points ** (1 / len(parameters))))
+    return [{'name': name, 'range': (start, end, max(1, (end - start) // per_parameter)), 'type': "INT"}
+            for name, (start, end) in parameters.items()]
+
+
+def rss_bytes() -> int:
+    """
+    Current resident set size, peak RSS where /proc is not available
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))]
+
+
+async def run_setting(concurrency: int, sweeps: int, points: int, mode: str) -> dict:
+    """
+    Run all sweeps with the given number of concurrently executing batches and collect the numbers
+    """
+    config.executor.workers = concurrency
+    config.executor.duckdb_concurrency = concurrency
+    backend_service = BackendService(executor_mode="local")
+    await backend_service.initialize_queue_worker()
+
+    rss_before = rss_bytes()
+    start_ns = time.perf_counter_ns()
+    sweep_ids = []
+    names = list(QUERIES)
+    for i in range(sweeps):
+        name = names[i % len(names)]
+        template, parameters = QUERIES[name]
+        benchmark_query = BenchmarkQuery(template, extract_variables(template), "DuckDB", "tpch", name)
+        sweep_ids.append(await backend_service.schedule_query_exectution(
+            benchmark_query, sweep_ranges(parameters, points), mode=mode))
+    sweep_states = [backend_service.sweeps[sweep_id] for sweep_id in sweep_ids]
+    await asyncio.gather(*(sweep.done.wait() for sweep in sweep_states))
+    elapsed = (time.perf_counter_ns() - start_ns) / 1e9
+    rss_after = rss_bytes()
+
+    stage_values = {stage: [] for stage in STAGES}
+    queries = 0
+    for sweep in sweep_states:
+        if sweep.result_index is None:
+            print(f"Sweep {sweep.sweep_id} failed:", sweep.error)
+            continue
+        for formatted_result in backend_service.result_storage.get_parsed_results(sweep.result_index):
+            queries += 1
+            for stage in STAGES:
+                stage_values[stage].append(formatted_result['timing'][stage] / 1e6)
+    backend_service.parse_stage.shutdown()
+
+    return {
+        'concurrency': concurrency,
+        'queries': queries,
+        'seconds': elapsed,
+        'queries_per_second': queries / elapsed if elapsed else 0.0,
+        'stages_ms': {stage: {'p50': percentile(values, 50), 'p90': percentile(values, 90),
+                              'p99': percentile(values, 99)} for stage, values in stage_values.items()},
+        'rss_growth_mb': (rss_after - rss_before) / 1024 / 1024,
+    }
+
+
+def print_report(results: List[dict]):
+    header = f"{'conc':>4} {'queries':>7} {'q/s':>8} {'rss MB':>7}  " + \
+             "  ".join(f"{stage[:-3]:>16}" for stage in STAGES)
+    print(header)
+    print(" " * 31 + "  ".join(f"{'p50/p99 ms':>16}" for _ in STAGES))
+    for r in results:
+        stages = "  ".join(f"{r['stages_ms'][stage]['p50']:>7.2f}/{r['stages_ms'][stage]['p99']:<8.2f}"
+                           for stage in STAGES)
+        print(f"{r['concurrency']:>4} {r['queries']:>7} {r['queries_per_second']:>8.1f} "
+              f"{r['rss_growth_mb']:>7.1f}  {stages}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale-factor", type=float, default=0.01)
+    parser.add_argument("--database", default=os.path.join(tempfile.gettempdir(), "query_executer_tpch.duckdb"),
+                        help="DuckDB file, generated when it has no TPC-H tables yet")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4],
+                        help="Concurrently executing batches, one run per value")
+    parser.add_argument("--sweeps", type=int, default=8, help="Sweeps (batches) per run")
+    parser.add_argument("--points", type=int, default=25, help="Queries per sweep (approximately)")
+    parser.add_argument("--mode", default="analyze", help="Sweep mode, see backend_service.SWEEP_MODES")
+    parser.add_argument("--parse-workers", type=int, default=config.parsing.workers)
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    generate_database(args.database, args.scale_factor)
+    # DuckDB only, nothing else has to be reachable
+    config.database.duckdb.enabled = True
+    config.database.duckdb.path = args.database
+    config.database.mysql.enabled = False
+    config.database.postgres.enabled = False
+    config.parsing.workers = args.parse_workers
+
+    results = [asyncio.run(run_setting(concurrency, args.sweeps, args.points, args.mode))
+               for concurrency in args.concurrency]
+    print_report(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
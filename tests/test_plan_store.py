@@ -0,0 +1,13 @@
+from app.plan_store import PlanStore
+
+
+def test_round_trip_non_ascii_plan():
+    store = PlanStore()
+    plans = [
+        "Seq Scan x=١٢ rows=5",
+        "Filter: (name = 'café') rows=42 time=0.013..1.250",
+        "Index Scan on l_1 (actual rows=７ loops=1)",
+    ]
+    handles = [store.put(plan) for plan in plans]
+    assert [store.get(handle) for handle in handles] == plans
+    assert store.raw_bytes == sum(len(plan.encode("utf-8")) for plan in plans)